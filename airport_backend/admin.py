@@ -6,6 +6,7 @@ from airport_backend.models import (Crew,
                                     Airport,
                                     Route,
                                     Flight,
+                                    FlightSchedule,
                                     Ticket)
 
 admin.site.register(Crew)
@@ -15,4 +16,5 @@ admin.site.register(Airplane)
 admin.site.register(AirplaneType)
 admin.site.register(Route)
 admin.site.register(Flight)
+admin.site.register(FlightSchedule)
 admin.site.register(Ticket)
\ No newline at end of file
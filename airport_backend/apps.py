@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class AirportBackendConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'airport_backend'
+
+    def ready(self):
+        from airport_backend import checks, query_budget, signals  # noqa: F401
@@ -0,0 +1,178 @@
+import asyncio
+import time
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+
+import psycopg
+from django.conf import settings
+from django.db import connections
+
+from airport_backend.query_budget import query_counter
+
+
+class AsyncConnectionPool:
+    """A small pool of psycopg ``AsyncConnection``s for one event loop.
+
+    Connections use the same parameters as Django's ``default`` database,
+    autocommit and client-side binding, so SQL compiled from a queryset runs
+    unchanged. They are opened on demand up to ``size`` and pinged with a
+    cheap query before being handed out again after ``max_idle`` seconds.
+    """
+
+    def __init__(self, alias="default", size=10, max_idle=30):
+        self.alias = alias
+        self.size = size
+        self.max_idle = max_idle
+        self._semaphore = asyncio.Semaphore(size)
+        self._idle = []
+
+    async def _connect(self):
+        wrapper = connections[self.alias]
+        params = wrapper.get_connection_params()
+        params["cursor_factory"] = psycopg.AsyncClientCursor
+        connection = await psycopg.AsyncConnection.connect(autocommit=True,
+                                                           **params)
+        await connection.execute(
+            "SELECT set_config('TimeZone', %s, false)",
+            [wrapper.timezone_name]
+        )
+        return connection
+
+    async def _healthy(self, connection, idle_since):
+        if connection.closed or connection.broken:
+            return False
+        if time.monotonic() - idle_since < self.max_idle:
+            return True
+        try:
+            await connection.execute("SELECT 1")
+        except psycopg.Error:
+            await connection.close()
+            return False
+        return True
+
+    @asynccontextmanager
+    async def connection(self):
+        async with self._semaphore:
+            connection = None
+            while self._idle and connection is None:
+                candidate, idle_since = self._idle.pop()
+                if await self._healthy(candidate, idle_since):
+                    connection = candidate
+            if connection is None:
+                connection = await self._connect()
+            try:
+                yield connection
+            finally:
+                if connection.closed or connection.broken:
+                    await connection.close()
+                else:
+                    self._idle.append((connection, time.monotonic()))
+
+    async def close(self):
+        idle, self._idle = self._idle, []
+        for connection, _ in idle:
+            await connection.close()
+
+
+# Pools of event loops that live as long as the process, opened by
+# ``open_pool`` from the ASGI lifespan (see ``airport_service/asgi.py``).
+_pools = {}
+_request_pool = ContextVar("async_db_request_pool", default=None)
+
+
+def _new_pool():
+    return AsyncConnectionPool(
+        size=settings.ASYNC_DATABASE["POOL_SIZE"],
+        max_idle=settings.ASYNC_DATABASE["MAX_IDLE"],
+    )
+
+
+async def open_pool():
+    """Open the pool of the running loop, which must outlive the requests
+    served on it: an ASGI server's loop, at lifespan startup."""
+    loop = asyncio.get_running_loop()
+    if loop not in _pools:
+        _pools[loop] = _new_pool()
+    return _pools[loop]
+
+
+async def close_pool():
+    pool = _pools.pop(asyncio.get_running_loop(), None)
+    if pool is not None:
+        await pool.close()
+
+
+def get_pool():
+    pool = _pools.get(asyncio.get_running_loop()) or _request_pool.get()
+    if pool is None:
+        raise RuntimeError("No async database pool: wrap the code in "
+                           "pool_scope() or open_pool() at startup.")
+    return pool
+
+
+@asynccontextmanager
+async def pool_scope():
+    """Async connections for one request (or stream).
+
+    Uses the loop's pool when ``open_pool`` opened one. Otherwise, as under
+    WSGI where every async view runs on a new event loop, the scope gets a
+    pool of its own and closes its connections on exit, so nothing is left
+    open behind a loop that is gone.
+    """
+    if (asyncio.get_running_loop() in _pools
+            or _request_pool.get() is not None):
+        yield
+        return
+    pool = _new_pool()
+    token = _request_pool.set(pool)
+    try:
+        yield
+    finally:
+        try:
+            _request_pool.reset(token)
+        except ValueError:
+            # A stream left unfinished is closed by its loop, in another
+            # context, which has nothing to restore.
+            pass
+        await pool.close()
+
+
+async def lifespan(receive, send):
+    """ASGI lifespan protocol: the pool of the server's loop is opened at
+    startup and closed at shutdown."""
+    while True:
+        message = await receive()
+        if message["type"] == "lifespan.startup":
+            await open_pool()
+            await send({"type": "lifespan.startup.complete"})
+        elif message["type"] == "lifespan.shutdown":
+            await close_pool()
+            await send({"type": "lifespan.shutdown.complete"})
+            return
+
+
+async def execute(sql, params=None):
+    """Run ``sql`` on a pooled async connection and return all rows."""
+    counter = query_counter.get()
+    started = time.perf_counter()
+    try:
+        async with get_pool().connection() as connection:
+            cursor = await connection.execute(sql, params)
+            return await cursor.fetchall()
+    finally:
+        if counter is not None:
+            counter.queries += 1
+            counter.duration += time.perf_counter() - started
+
+
+async def fetch(queryset):
+    """Run ``queryset`` (usually a ``values_list``) on an async connection
+    and return its rows as tuples."""
+    return await execute(*queryset.query.sql_with_params())
+
+
+async def fetch_values(queryset):
+    """Run a ``values()`` queryset and return its rows as dicts."""
+    query = queryset.query
+    names = [*query.extra_select, *query.values_select, *query.annotation_select]
+    return [dict(zip(names, row)) for row in await fetch(queryset)]
@@ -0,0 +1,316 @@
+import asyncio
+import threading
+import time
+from functools import wraps
+from math import ceil
+
+from asgiref.sync import sync_to_async
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
+from django.http import (HttpResponse,
+                         HttpResponseNotAllowed,
+                         StreamingHttpResponse)
+from rest_framework import status
+from rest_framework.exceptions import APIException
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+from rest_framework.exceptions import NotFound
+from rest_framework.views import APIView
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken, TokenError
+from rest_framework_simplejwt.settings import api_settings as jwt_settings
+
+from airport_backend.async_db import execute, fetch, fetch_values, pool_scope
+from airport_backend.boards import aget_board, board_diff, get_board
+from airport_backend.models import Flight, Ticket
+from airport_backend.pagination import FlightKeysetPagination
+from airport_backend.permission import IsAdminOrIfAuthenticatedReadOnly
+from airport_backend.query_budget import Budget
+from airport_backend.seat_map import SeatBitmap
+from airport_backend.serializers import (FlightListSerializer,
+                                         FlightSearchSerializer)
+from user.authentication import (PRINCIPAL_CLAIMS,
+                                 Principal,
+                                 cached_principal,
+                                 principal_keys,
+                                 row_claims)
+
+
+def _response(data, status_code=status.HTTP_200_OK):
+    return HttpResponse(JSONRenderer().render(data),
+                        status=status_code,
+                        content_type="application/json")
+
+
+def _error(detail, status_code):
+    return _response({"detail": detail}, status_code)
+
+
+async def _authenticate(request):
+    """Validate the bearer token and find its principal like
+    ``CachedJWTAuthentication``, reading the user row on an async
+    connection when neither the claims nor the principal cache have it.
+    Returns the principal, or ``None`` and an error response."""
+    authentication = JWTAuthentication()
+    header = authentication.get_header(request)
+    raw_token = authentication.get_raw_token(header) if header else None
+    if raw_token is None:
+        return None, _error("Authentication credentials were not provided.",
+                            status.HTTP_401_UNAUTHORIZED)
+    try:
+        token = authentication.get_validated_token(raw_token)
+        user_id = token[jwt_settings.USER_ID_CLAIM]
+    except (InvalidToken, TokenError, KeyError):
+        return None, _error("Given token not valid for any token type",
+                            status.HTTP_401_UNAUTHORIZED)
+    changed, cached = principal_keys(user_id)
+    entries = await cache.aget_many([changed, cached])
+    principal = cached_principal(token,
+                                 entries.get(changed),
+                                 entries.get(cached))
+    if principal is not None:
+        return principal, None
+    users = await fetch(
+        get_user_model().objects
+        .filter(**{jwt_settings.USER_ID_FIELD: user_id, "is_active": True})
+        .values_list(*PRINCIPAL_CLAIMS)
+    )
+    if not users:
+        return None, _error("User not found", status.HTTP_401_UNAUTHORIZED)
+    claims = row_claims(user_id, users[0])
+    await cache.aset(cached, claims, timeout=settings.AUTH_PRINCIPAL_CACHE_TTL)
+    return Principal(claims), None
+
+
+class AsyncViewChecks(APIView):
+    """Stand-in for the sync twins of the async views, to run DRF's
+    permission and throttle checks with the same classes and rates."""
+    permission_classes = (IsAdminOrIfAuthenticatedReadOnly,)
+
+
+async def _check_access(request, principal):
+    """Returns an error response when the permission or throttle checks
+    fail, ``None`` otherwise."""
+    request = Request(request)
+    request.user = principal
+    view = AsyncViewChecks()
+    view.request = request
+    try:
+        # Throttles may count in the database.
+        await sync_to_async(view.check_permissions)(request)
+        await sync_to_async(view.check_throttles)(request)
+    except APIException as error:
+        response = _error(error.detail, error.status_code)
+        if getattr(error, "wait", None):
+            response["Retry-After"] = str(ceil(error.wait))
+        return response
+    return None
+
+
+def async_api_view(view):
+    """Serve ``view`` to authenticated ``GET`` requests that pass the checks
+    of the sync views, with async database connections for the request."""
+    @wraps(view)
+    async def wrapper(request, *args, **kwargs):
+        if request.method != "GET":
+            return HttpResponseNotAllowed(["GET"])
+        async with pool_scope():
+            principal, error = await _authenticate(request)
+            if error is None:
+                error = await _check_access(request, principal)
+            if error is not None:
+                return error
+            request.user = principal
+            return await view(request, *args, **kwargs)
+    return wrapper
+
+
+@async_api_view
+async def flight_list(request):
+    """Async twin of ``GET /flights/``: same filters, cursor pagination and
+    JSON as the sync list, served without holding a worker thread while
+    Postgres runs the search."""
+    request = Request(request)
+    search = FlightSearchSerializer(data=request.query_params)
+    if not search.is_valid():
+        return _response(search.errors, status.HTTP_400_BAD_REQUEST)
+    queryset = FlightListSerializer.project(
+        search.filter_queryset(Flight.objects.all())
+    )
+
+    paginator = FlightKeysetPagination()
+    try:
+        page = paginator.page_queryset(queryset, request)
+    except NotFound as error:
+        return _error(error.detail, status.HTTP_404_NOT_FOUND)
+    if paginator.with_total:
+        sql, params = queryset.order_by().query.sql_with_params()
+        plan = await execute(f"EXPLAIN (FORMAT JSON) {sql}", params)
+        paginator.count = paginator.plan_rows(plan[0][0])
+    flights = paginator.set_page(await fetch_values(page))
+    return _response(paginator.get_paginated_data(
+        FlightListSerializer(flights, many=True).data
+    ))
+
+
+@async_api_view
+async def flight_availability(request, pk):
+    """Seat availability of one flight from its stored seat map."""
+    rows = await fetch(
+        Flight.objects.filter(pk=pk).values_list(
+            "airplane__rows", "airplane__seats_in_row", "seat_map__bitmap"
+        )
+    )
+    if not rows:
+        return _error("Not found.", status.HTTP_404_NOT_FOUND)
+    plane_rows, seats_in_row, data = rows[0]
+    if data is not None and len(data) == SeatBitmap.size_for(plane_rows,
+                                                             seats_in_row):
+        bitmap = SeatBitmap(plane_rows, seats_in_row, data)
+    else:
+        bitmap = SeatBitmap.from_seats(
+            plane_rows,
+            seats_in_row,
+            await fetch(Ticket.objects.filter(flight_id=pk)
+                        .values_list("row", "seat"))
+        )
+    return _response({
+        "id": pk,
+        "tickets_available": plane_rows * seats_in_row - bitmap.count(),
+        "taken_seats": [{"row": row, "seat": seat}
+                        for row, seat in bitmap.taken_seats()],
+        "seat_map": bitmap.grid(),
+    })
+
+
+def _event(name, data, event_id=None):
+    lines = [f"event: {name}"]
+    if event_id:
+        lines.append(f"id: {event_id}")
+    lines.append(f"data: {JSONRenderer().render(data).decode()}")
+    return "\n".join(lines) + "\n\n"
+
+
+def _board_start(entry):
+    retry = settings.AIRPORT_BOARDS["CACHE_TTL"] * 1000
+    return [f"retry: {retry}\n", _event("board", entry["board"], entry["etag"])]
+
+
+def _board_update(airport_id, previous, entry):
+    """The event to send for a re-read board ``entry``, if any, and the
+    board to diff the next one against, ``None`` once the airport is gone."""
+    if entry["board"] is None:
+        return _event("gone", {"airport": airport_id}), None
+    if entry["etag"] == previous["etag"]:
+        return ": keepalive\n\n", previous
+    diff = board_diff(previous["board"], entry["board"])
+    return (_event("diff", diff, entry["etag"]) if diff else None), entry
+
+
+async def _board_events(airport_id, entry):
+    """The full board first, then a ``diff`` event whenever a rebuilt board
+    differs, polling the board cache every ``CACHE_TTL`` seconds; a comment
+    line keeps idle connections open."""
+    boards = settings.AIRPORT_BOARDS
+    for event in _board_start(entry):
+        yield event
+    deadline = asyncio.get_running_loop().time() + boards["STREAM_SECONDS"]
+    # The stream outlives the view, and its request's connections.
+    async with pool_scope():
+        while entry and asyncio.get_running_loop().time() < deadline:
+            await asyncio.sleep(boards["CACHE_TTL"])
+            event, entry = _board_update(airport_id,
+                                         entry,
+                                         await aget_board(airport_id))
+            if event:
+                yield event
+
+
+def _sync_board_events(airport_id, entry):
+    """``_board_events`` for WSGI servers, which would read a whole async
+    stream before sending any of it. Holds a worker thread for the whole
+    stream."""
+    boards = settings.AIRPORT_BOARDS
+    yield from _board_start(entry)
+    deadline = time.monotonic() + boards["STREAM_SECONDS"]
+    while entry and time.monotonic() < deadline:
+        time.sleep(boards["CACHE_TTL"])
+        event, entry = _board_update(airport_id, entry, get_board(airport_id))
+        if event:
+            yield event
+
+
+_wsgi_streams = 0
+_wsgi_streams_lock = threading.Lock()
+
+
+def _take_wsgi_stream():
+    global _wsgi_streams
+    with _wsgi_streams_lock:
+        if _wsgi_streams >= settings.AIRPORT_BOARDS["WSGI_STREAMS"]:
+            return False
+        _wsgi_streams += 1
+        return True
+
+
+def _release_wsgi_stream():
+    global _wsgi_streams
+    with _wsgi_streams_lock:
+        _wsgi_streams -= 1
+
+
+class WSGIBoardStream:
+    """``_sync_board_events`` holding one of the ``WSGI_STREAMS`` streams
+    of the worker until the server closes the response, read or not."""
+
+    def __init__(self, events):
+        self._events = events
+        self._closed = False
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        return next(self._events)
+
+    def close(self):
+        self._events.close()
+        if not self._closed:
+            self._closed = True
+            _release_wsgi_stream()
+
+
+@async_api_view
+async def airport_board_stream(request, pk):
+    """``GET /airports/{id}/board/`` as Server-Sent Events. Every stream of
+    an airport reads the same cached board, so any number of screens cost
+    one query per ``CACHE_TTL``.
+
+    Under WSGI each stream holds a thread, so a worker serves at most
+    ``WSGI_STREAMS`` of them and answers 503 beyond; clients can poll the
+    board instead.
+    """
+    entry = await aget_board(pk)
+    if entry["board"] is None:
+        return _error("Not found.", status.HTTP_404_NOT_FOUND)
+    if isinstance(request, ASGIRequest):
+        events = _board_events(pk, entry)
+    elif _take_wsgi_stream():
+        events = WSGIBoardStream(_sync_board_events(pk, entry))
+    else:
+        response = _error("Too many board streams, poll the board instead.",
+                          status.HTTP_503_SERVICE_UNAVAILABLE)
+        response["Retry-After"] = str(settings.AIRPORT_BOARDS["CACHE_TTL"])
+        return response
+    response = StreamingHttpResponse(events, content_type="text/event-stream")
+    response["Cache-Control"] = "no-cache"
+    # Tell nginx not to buffer the stream.
+    response["X-Accel-Buffering"] = "no"
+    return response
+
+
+flight_list.query_budgets = {"get": Budget(3, 100)}
+flight_availability.query_budgets = {"get": Budget(3, 50)}
+airport_board_stream.query_budgets = {"get": Budget(3, 50)}
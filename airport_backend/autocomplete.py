@@ -0,0 +1,212 @@
+import logging
+import re
+import threading
+import time
+import unicodedata
+from bisect import bisect_left
+
+from django.conf import settings
+from django.db import connections
+
+from airport_backend.models import Airport, City, Country
+from airport_backend.response_cache import model_versions
+
+
+logger = logging.getLogger(__name__)
+
+
+def normalize(text):
+    """Lower-case ``text`` without accents and punctuation: "São Paulo-
+    Guarulhos" becomes "sao paulo guarulhos"."""
+    text = unicodedata.normalize("NFKD", text or "")
+    text = "".join(char for char in text if not unicodedata.combining(char))
+    return re.sub(r"[\W_]+", " ", text.casefold()).strip()
+
+
+def suffixes(text):
+    """Every word of ``text`` but the first with the rest of the text, so
+    "kennedy int" finds "john f kennedy international"."""
+    words = text.split()
+    return [" ".join(words[position:]) for position in range(1, len(words))]
+
+
+class PrefixIndex:
+    """In-process sorted arrays of normalized terms for autocompletion.
+
+    Every entry is indexed under a few terms, each with a rank (say 0 for a
+    code, 1 for the name...). ``search`` bisects to the query in the array of
+    every rank, best rank first, and reads matches off in order until it has
+    ``limit`` of them, so it never scans more than it returns and never
+    touches the database.
+
+    The index is built in a background thread when the server starts (see
+    ``build_indexes``) and rebuilt, in the background again, whenever the
+    version of one of ``models``, bumped once a save or delete commits (see
+    ``signals.py``), has changed; checking the versions is a cache lookup.
+    Only one rebuild runs at a time, and searches keep reading the previous
+    arrays meanwhile. The index is also rebuilt every
+    ``AUTOCOMPLETE_INDEX["TTL"]`` seconds, to pick up writes that sent no
+    signal.
+    """
+    models = ()
+    fields = ()
+    ranks = 1
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries = ()
+        self._terms = tuple(() for _ in range(self.ranks))
+        self._versions = None
+        self._loaded_at = None
+        self._reloading = None
+
+    def rows(self):
+        """Entries as tuples of ``fields``, in the order ties are listed."""
+        raise NotImplementedError
+
+    def terms(self, row):
+        """``(rank, normalized term)`` pairs to index ``row`` under."""
+        raise NotImplementedError
+
+    def load(self):
+        # Versions are read before the rows, so a write landing during the
+        # load bumps them again and the next search reloads.
+        versions = model_versions(self.models)
+        entries = tuple(self.rows())
+        terms = [[] for _ in range(self.ranks)]
+        for position, row in enumerate(entries):
+            for rank, term in set(self.terms(row)):
+                if term:
+                    terms[rank].append((term, position))
+        for rank_terms in terms:
+            rank_terms.sort()
+        with self._lock:
+            self._entries = entries
+            self._terms = tuple(terms)
+            self._versions = versions
+            self._loaded_at = time.monotonic()
+
+    def _reload(self):
+        try:
+            self.load()
+        except Exception:
+            logger.exception("Building the %s failed", type(self).__name__)
+        finally:
+            connections.close_all()
+
+    def refresh(self):
+        """Start rebuilding the index in a background thread, unless a
+        rebuild is already running, and return that thread."""
+        with self._lock:
+            if self._reloading is None or not self._reloading.is_alive():
+                self._reloading = threading.Thread(
+                    target=self._reload,
+                    name=f"{type(self).__name__}-reload",
+                    daemon=True
+                )
+                self._reloading.start()
+            return self._reloading
+
+    def refresh_if_stale(self):
+        """Start a rebuild if the index is out of date and return the
+        thread running it, or ``None`` if the index is up to date."""
+        ttl = settings.AUTOCOMPLETE_INDEX["TTL"]
+        if (self._loaded_at is None
+                or model_versions(self.models) != self._versions
+                or time.monotonic() - self._loaded_at > ttl):
+            return self.refresh()
+        return None
+
+    def wait(self):
+        """Block until the running rebuild, if any, is done."""
+        reloading = self._reloading
+        if reloading is not None:
+            reloading.join()
+
+    def search(self, query, limit=10):
+        prefix = normalize(query)
+        if not prefix:
+            return []
+        reloading = self.refresh_if_stale()
+        if self._loaded_at is None:
+            # Nothing to serve yet: wait for the first build.
+            reloading.join()
+        entries, terms = self._entries, self._terms
+        found = []
+        seen = set()
+        for rank_terms in terms:
+            position = bisect_left(rank_terms, (prefix,))
+            while (len(found) < limit
+                   and position < len(rank_terms)
+                   and rank_terms[position][0].startswith(prefix)):
+                entry = rank_terms[position][1]
+                position += 1
+                if entry not in seen:
+                    seen.add(entry)
+                    found.append(entry)
+            if len(found) == limit:
+                break
+        return [dict(zip(self.fields, entries[entry])) for entry in found]
+
+
+class AirportIndex(PrefixIndex):
+    """Airports by code, then name, then words of the name, then city."""
+    models = (Airport, City, Country)
+    fields = ("id", "name", "code", "city_name", "country_name")
+    ranks = 4
+
+    def rows(self):
+        return (
+            Airport.objects
+            .order_by("name")
+            .values_list("id",
+                         "name",
+                         "code",
+                         "closest_big_city__name",
+                         "closest_big_city__country__name")
+            .iterator(chunk_size=5000)
+        )
+
+    def terms(self, row):
+        _, name, code, city_name, _ = row
+        name, city_name = normalize(name), normalize(city_name)
+        yield 0, normalize(code)
+        yield 1, name
+        for suffix in suffixes(name):
+            yield 2, suffix
+        yield 3, city_name
+        for suffix in suffixes(city_name):
+            yield 3, suffix
+
+
+class CityIndex(PrefixIndex):
+    """Cities by name, then words of the name, then country."""
+    models = (City, Country)
+    fields = ("id", "name", "country_name")
+    ranks = 3
+
+    def rows(self):
+        return (
+            City.objects
+            .order_by("name")
+            .values_list("id", "name", "country__name")
+            .iterator(chunk_size=5000)
+        )
+
+    def terms(self, row):
+        _, name, country_name = row
+        name = normalize(name)
+        yield 0, name
+        for suffix in suffixes(name):
+            yield 1, suffix
+        yield 2, normalize(country_name)
+
+
+airport_index = AirportIndex()
+city_index = CityIndex()
+
+
+def build_indexes():
+    """Start building the autocomplete indexes, when the server starts."""
+    for index in (airport_index, city_index):
+        index.refresh()
@@ -0,0 +1,29 @@
+from django.db import transaction
+from django.db.models import Min
+from django.utils import timezone
+
+
+def backfill_order_created_at(order_model, chunk_size=10000, log=None):
+    """Stamp orders created before ``Order.created_at`` existed.
+
+    Their real creation time is unknown, so they all get the earliest known
+    one (now when there is none): they sort as the oldest orders, in id
+    order. Rows are updated ``chunk_size`` at a time, one transaction each,
+    so the table is never locked for long. Takes the model as an argument to
+    run from migrations too.
+    """
+    legacy = order_model.objects.filter(created_at__isnull=True)
+    stamp = (order_model.objects.aggregate(first=Min("created_at"))["first"]
+             or timezone.now())
+    total = 0
+    while True:
+        with transaction.atomic():
+            ids = list(legacy.order_by("id")
+                       .values_list("id", flat=True)[:chunk_size])
+            if not ids:
+                return total
+            total += order_model.objects.filter(id__in=ids).update(
+                created_at=stamp
+            )
+        if log:
+            log(f"Stamped {total} orders")
@@ -0,0 +1,187 @@
+import json
+import math
+import time
+import tracemalloc
+from collections import namedtuple
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.db import connection, transaction
+from django.db.models import Max
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from airport_backend.models import Flight, Order, Ticket
+from airport_backend.seat_map import load_bitmap
+
+
+Scenario = namedtuple("Scenario", ("name", "method", "url", "data", "user"))
+
+METRICS = ("p50_ms", "p95_ms", "p99_ms", "queries", "peak_kib")
+
+
+def percentile(samples, percent):
+    """Nearest-rank percentile of an already sorted list."""
+    return samples[max(0, math.ceil(percent / 100 * len(samples)) - 1)]
+
+
+def _free_seat(flight):
+    bitmap = load_bitmap(flight)
+    for row in range(1, bitmap.rows + 1):
+        for seat in range(1, bitmap.seats_in_row + 1):
+            if not bitmap.is_taken(row, seat):
+                return {"flight": flight.id, "row": row, "seat": seat}
+    return None
+
+
+def build_scenarios():
+    """One scenario per list/retrieve/create action of the flight, order and
+    ticket endpoints, pointed at existing rows of the current database.
+
+    Tickets are only created through orders, so there is no tickets-create.
+    """
+    flight = (Flight.objects
+              .select_related("route", "airplane", "seat_map")
+              .order_by("-seats_sold", "id")
+              .first())
+    order = Order.objects.filter(tickets__isnull=False).order_by("id").first()
+    ticket = Ticket.objects.order_by("id").first()
+    if not (flight and order and ticket):
+        raise ValueError("Benchmarks need at least one flight, order and "
+                         "ticket; run generate_dataset first.")
+    admin = get_user_model()(email="benchmark@example.com", is_staff=True)
+    customer = order.user
+    latest = Flight.objects.aggregate(
+        departure=Max("departure_time"), arrival=Max("arrival_time")
+    )
+    free_flight = (Flight.objects
+                   .select_related("airplane", "seat_map")
+                   .order_by("seats_sold", "id")
+                   .first())
+    seat = _free_seat(free_flight)
+
+    flights_url = reverse("airport_backend:flight-list")
+    orders_url = reverse("airport_backend:order-list")
+    tickets_url = reverse("airport_backend:ticket-list")
+    scenarios = [
+        Scenario("flights-list", "get", flights_url, None, customer),
+        Scenario("flights-list-filtered", "get", flights_url,
+                 {"source": flight.route.source_id,
+                  "departure_time": flight.departure_time.date()},
+                 customer),
+        Scenario("flights-retrieve", "get",
+                 reverse("airport_backend:flight-detail", args=(flight.id,)),
+                 None, customer),
+        Scenario("flights-create", "post", flights_url,
+                 {"route": flight.route_id,
+                  "airplane": flight.airplane_id,
+                  "departure_time": latest["departure"] + timedelta(hours=1),
+                  "arrival_time": latest["arrival"] + timedelta(hours=1),
+                  "crew": []},
+                 admin),
+        Scenario("orders-list", "get", orders_url, None, customer),
+        Scenario("orders-retrieve", "get",
+                 reverse("airport_backend:order-detail", args=(order.id,)),
+                 None, customer),
+        Scenario("tickets-list", "get", tickets_url, None, admin),
+        Scenario("tickets-retrieve", "get",
+                 reverse("airport_backend:ticket-detail", args=(ticket.id,)),
+                 None, admin),
+    ]
+    if seat:
+        scenarios.append(Scenario("orders-create", "post", orders_url,
+                                  {"tickets": [seat]}, customer))
+    return scenarios
+
+
+class BenchmarkRunner:
+    """Time scenarios through the full Django/DRF request stack.
+
+    Every request runs in a transaction that is rolled back, so create
+    scenarios can be repeated without changing the dataset. Latencies come
+    from ``iterations`` timed runs; query counts and peak Python memory are
+    taken from one extra traced run, so tracing does not skew the timings.
+    """
+
+    def __init__(self, iterations=50, warmup=3, host="localhost"):
+        self.iterations = iterations
+        self.warmup = warmup
+        self.host = host
+
+    def _request(self, scenario):
+        client = APIClient(SERVER_NAME=self.host)
+        client.force_authenticate(scenario.user)
+        with transaction.atomic():
+            if scenario.method == "get":
+                response = client.get(scenario.url, scenario.data)
+            else:
+                response = client.post(scenario.url,
+                                       json.loads(json.dumps(
+                                           scenario.data, default=str
+                                       )),
+                                       format="json")
+            transaction.set_rollback(True)
+        if response.status_code >= 400:
+            raise RuntimeError(f"{scenario.name}: HTTP {response.status_code} "
+                               f"{response.content[:200]!r}")
+        return response
+
+    def run_scenario(self, scenario):
+        for _ in range(self.warmup):
+            self._request(scenario)
+        samples = []
+        for _ in range(self.iterations):
+            started = time.perf_counter()
+            self._request(scenario)
+            samples.append((time.perf_counter() - started) * 1000)
+        samples.sort()
+
+        tracemalloc.start()
+        try:
+            with CaptureQueriesContext(connection) as queries:
+                self._request(scenario)
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        return {
+            "p50_ms": round(percentile(samples, 50), 3),
+            "p95_ms": round(percentile(samples, 95), 3),
+            "p99_ms": round(percentile(samples, 99), 3),
+            # Savepoints of the rollback wrapper are not the view's queries.
+            "queries": sum(1 for query in queries.captured_queries
+                           if "SAVEPOINT" not in query["sql"]),
+            "peak_kib": round(peak / 1024, 1),
+        }
+
+    def run(self, scenarios):
+        return {scenario.name: self.run_scenario(scenario)
+                for scenario in scenarios}
+
+
+def compare(results, baseline, latency_tolerance=0.25, memory_tolerance=0.25,
+            latency_slack_ms=1.0):
+    """List the regressions of ``results`` against ``baseline``.
+
+    Latencies and memory may grow by the given fraction (latencies also by
+    ``latency_slack_ms``, to absorb noise on very fast endpoints); query
+    counts may not grow at all.
+    """
+    regressions = []
+    for name, metrics in results.items():
+        expected = baseline.get(name)
+        if expected is None:
+            continue
+        for metric in ("p50_ms", "p95_ms", "p99_ms"):
+            limit = expected[metric] * (1 + latency_tolerance) + latency_slack_ms
+            if metrics[metric] > limit:
+                regressions.append(f"{name} {metric}: {metrics[metric]} "
+                                   f"> {round(limit, 3)}")
+        if metrics["queries"] > expected["queries"]:
+            regressions.append(f"{name} queries: {metrics['queries']} "
+                               f"> {expected['queries']}")
+        limit = expected["peak_kib"] * (1 + memory_tolerance)
+        if metrics["peak_kib"] > limit:
+            regressions.append(f"{name} peak_kib: {metrics['peak_kib']} "
+                               f"> {round(limit, 1)}")
+    return regressions
@@ -0,0 +1,145 @@
+import hashlib
+import json
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import F, Q
+from django.utils import timezone
+
+from airport_backend.async_db import fetch, fetch_values
+from airport_backend.models import Airport, Flight
+from airport_backend.serializers import AirportBoardSerializer
+
+
+SECTIONS = ("departures", "arrivals")
+# Stale boards stay cached this many TTLs, served while one worker rebuilds.
+STALE_TTLS = 12
+
+
+def board_window(now=None):
+    now = now or timezone.now()
+    return (now - timedelta(minutes=settings.AIRPORT_BOARDS["PAST_MINUTES"]),
+            now + timedelta(minutes=settings.AIRPORT_BOARDS["AHEAD_MINUTES"]))
+
+
+def board_queryset(airport_id, start, end):
+    """Departures and arrivals of the airport in ``[start, end)`` as one
+    query, each side an index range scan per route: (route, departure_time)
+    for routes from the airport, (route, arrival_time) for routes to it."""
+    return Flight.objects.filter(
+        Q(route__source_id=airport_id,
+          departure_time__gte=start, departure_time__lt=end)
+        | Q(route__destination_id=airport_id,
+            arrival_time__gte=start, arrival_time__lt=end)
+    ).values(
+        "id",
+        "departure_time",
+        "arrival_time",
+        source_id=F("route__source_id"),
+        route_source=F("route__source__name"),
+        route_destination=F("route__destination__name"),
+        airplane_name=F("airplane__name"),
+    )
+
+
+def render_board(airport_id, start, end, rows):
+    departures = sorted(
+        (row for row in rows
+         if row["source_id"] == airport_id
+         and start <= row["departure_time"] < end),
+        key=lambda row: (row["departure_time"], row["id"])
+    )
+    arrivals = sorted(
+        (row for row in rows
+         if row["source_id"] != airport_id
+         and start <= row["arrival_time"] < end),
+        key=lambda row: (row["arrival_time"], row["id"])
+    )
+    return AirportBoardSerializer({
+        "airport": airport_id,
+        "window_start": start,
+        "window_end": end,
+        "departures": departures,
+        "arrivals": arrivals,
+    }).data
+
+
+def _entry(board):
+    """What is cached per airport: the board (``None`` when the airport
+    does not exist), its ETag and until when it is fresh."""
+    etag = None
+    if board is not None:
+        raw = json.dumps(board, sort_keys=True).encode()
+        etag = f'"{hashlib.md5(raw).hexdigest()}"'
+    return {"board": board,
+            "etag": etag,
+            "fresh_until": time.time() + settings.AIRPORT_BOARDS["CACHE_TTL"]}
+
+
+def _cache_key(airport_id):
+    return f"airport-board:{airport_id}"
+
+
+def _rebuild_key(airport_id):
+    return f"airport-board:{airport_id}:rebuild"
+
+
+def _timeouts():
+    ttl = settings.AIRPORT_BOARDS["CACHE_TTL"]
+    return ttl, ttl * STALE_TTLS
+
+
+def get_board(airport_id):
+    """The cached board entry of the airport, rebuilt by one worker at a
+    time once it is older than ``CACHE_TTL`` while the others keep serving
+    the stale one, so any number of clients cost one query per TTL. The
+    board lives in the default cache, shared by all workers (see
+    ``checks.py``)."""
+    ttl, timeout = _timeouts()
+    entry = cache.get(_cache_key(airport_id))
+    if entry is not None and (entry["fresh_until"] > time.time()
+                              or not cache.add(_rebuild_key(airport_id), 1, ttl)):
+        return entry
+    start, end = board_window()
+    rows = list(board_queryset(airport_id, start, end))
+    exists = bool(rows) or Airport.objects.filter(pk=airport_id).exists()
+    entry = _entry(render_board(airport_id, start, end, rows)
+                   if exists else None)
+    cache.set(_cache_key(airport_id), entry, timeout=timeout)
+    return entry
+
+
+async def aget_board(airport_id):
+    """``get_board`` for async views."""
+    ttl, timeout = _timeouts()
+    entry = await cache.aget(_cache_key(airport_id))
+    if entry is not None and (
+            entry["fresh_until"] > time.time()
+            or not await cache.aadd(_rebuild_key(airport_id), 1, ttl)):
+        return entry
+    start, end = board_window()
+    rows = await fetch_values(board_queryset(airport_id, start, end))
+    exists = bool(rows) or bool(
+        await fetch(Airport.objects.filter(pk=airport_id).values_list("pk"))
+    )
+    entry = _entry(render_board(airport_id, start, end, rows)
+                   if exists else None)
+    await cache.aset(_cache_key(airport_id), entry, timeout=timeout)
+    return entry
+
+
+def board_diff(previous, current):
+    """Flights added or changed (``updated``) and ids of the ones gone
+    (``removed``) per section; empty when nothing changed."""
+    diff = {}
+    for section in SECTIONS:
+        before = {flight["id"]: flight for flight in previous[section]}
+        after = {flight["id"]: flight for flight in current[section]}
+        updated = [flight for flight_id, flight in after.items()
+                   if before.get(flight_id) != flight]
+        removed = [flight_id for flight_id in before if flight_id not in after]
+        if updated or removed:
+            diff[section] = {"updated": updated, "removed": removed}
+    return diff
@@ -0,0 +1,27 @@
+from django.conf import settings
+from django.core.checks import Error, Tags, register
+
+
+# Cache backends whose entries only the process that wrote them can see.
+PER_PROCESS_CACHES = (
+    "django.core.cache.backends.locmem.LocMemCache",
+    "django.core.cache.backends.dummy.DummyCache",
+)
+
+
+@register(Tags.caches)
+def check_shared_cache(app_configs, **kwargs):
+    """Cached responses are retired by version keys, and boards and
+    throttle counters are counted, in the default cache: several workers on
+    a per-process cache would each serve stale data and enforce their own
+    limits."""
+    backend = settings.CACHES["default"]["BACKEND"]
+    if settings.WEB_CONCURRENCY > 1 and backend in PER_PROCESS_CACHES:
+        return [Error(
+            f"WEB_CONCURRENCY is {settings.WEB_CONCURRENCY} but the default "
+            f"cache ({backend}) is not shared between workers.",
+            hint="Set CACHE_BACKEND and CACHE_LOCATION to a shared cache "
+                 "such as Redis or memcached.",
+            id="airport_backend.E001",
+        )]
+    return []
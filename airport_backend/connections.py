@@ -0,0 +1,181 @@
+import threading
+import time
+from bisect import bisect_left, insort
+from collections import Counter, defaultdict, namedtuple
+from heapq import heappop, heappush
+from itertools import count
+
+from django.conf import settings
+from django.utils import timezone
+from airport_backend.models import Flight
+
+
+Leg = namedtuple("Leg", ("departure_time",
+                         "flight_id",
+                         "source_id",
+                         "destination_id",
+                         "arrival_time",
+                         "distance"))
+
+Itinerary = namedtuple("Itinerary", ("legs", "distance"))
+
+
+class ConnectionIndex:
+    """In-process adjacency index of upcoming flights.
+
+    For every airport it keeps the departing legs sorted by departure time,
+    so the next possible connections out of an airport are a bisect away.
+    The index is loaded lazily, kept in step with local Flight and Route
+    writes through signals, and fully reloaded every
+    ``CONNECTIONS_INDEX["TTL"]`` seconds to pick up other workers' writes.
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._departures = defaultdict(list)
+        self._legs = {}
+        self._loaded_at = None
+
+    @staticmethod
+    def _upcoming():
+        return (
+            Flight.objects
+            .filter(departure_time__gte=timezone.now())
+            .values_list("departure_time",
+                         "id",
+                         "route__source_id",
+                         "route__destination_id",
+                         "arrival_time",
+                         "route__distance")
+        )
+
+    def load(self):
+        departures = defaultdict(list)
+        legs = {}
+        for row in self._upcoming().order_by("departure_time").iterator(
+                chunk_size=5000):
+            leg = Leg(*row)
+            departures[leg.source_id].append(leg)
+            legs[leg.flight_id] = leg
+        with self._lock:
+            self._departures = departures
+            self._legs = legs
+            self._loaded_at = time.monotonic()
+
+    @property
+    def loaded(self):
+        return self._loaded_at is not None
+
+    def _ensure_loaded(self):
+        ttl = settings.CONNECTIONS_INDEX["TTL"]
+        if not self.loaded or time.monotonic() - self._loaded_at > ttl:
+            self.load()
+
+    def _remove(self, flight_id):
+        leg = self._legs.pop(flight_id, None)
+        if leg is None:
+            return
+        departures = self._departures[leg.source_id]
+        position = bisect_left(departures, leg)
+        if position < len(departures) and departures[position] == leg:
+            del departures[position]
+
+    def refresh(self, flight_ids):
+        """Re-read the given flights, e.g. after they or their route changed."""
+        if not self.loaded:
+            return
+        rows = self._upcoming().filter(id__in=flight_ids)
+        with self._lock:
+            for flight_id in flight_ids:
+                self._remove(flight_id)
+            for row in rows:
+                leg = Leg(*row)
+                insort(self._departures[leg.source_id], leg)
+                self._legs[leg.flight_id] = leg
+
+    def remove(self, flight_id):
+        with self._lock:
+            self._remove(flight_id)
+
+    def departures(self, airport_id, after, before):
+        departures = self._departures.get(airport_id, [])
+        start = bisect_left(departures, (after,))
+        end = bisect_left(departures, (before,))
+        return departures[start:end]
+
+    def search(self,
+               source_id,
+               destination_id,
+               departure_after,
+               departure_before,
+               max_legs,
+               min_connection,
+               max_connection,
+               max_distance=None,
+               limit=10):
+        """The ``limit`` itineraries arriving first, fewest legs and shortest
+        distance breaking ties.
+
+        Partial itineraries are expanded best-first by arrival time, which
+        only grows along an itinerary, so those reaching the destination
+        come out in order and the search stops at the ``limit``-th. Past
+        ``limit`` itineraries ending with the same flight, the others cannot
+        lead to a better result and are dropped; at most
+        ``CONNECTIONS_INDEX["MAX_EXPANDED_LEGS"]`` legs are looked at.
+        """
+        self._ensure_loaded()
+        budget = settings.CONNECTIONS_INDEX["MAX_EXPANDED_LEGS"]
+        found = []
+        queue = []
+        expanded = Counter()
+        order = count()
+
+        def push(path, distance):
+            heappush(queue, (path[-1].arrival_time,
+                             len(path),
+                             distance,
+                             next(order),
+                             path))
+
+        def candidates(legs, distance, visited, last_leg):
+            nonlocal budget
+            for leg in legs:
+                if budget <= 0:
+                    return
+                budget -= 1
+                if leg.destination_id in visited:
+                    continue
+                # The last leg has to land at the destination.
+                if last_leg and leg.destination_id != destination_id:
+                    continue
+                if (max_distance is not None
+                        and distance + leg.distance > max_distance):
+                    continue
+                yield leg
+
+        with self._lock:
+            for leg in candidates(self.departures(source_id,
+                                                  departure_after,
+                                                  departure_before),
+                                  0, {source_id}, max_legs == 1):
+                push((leg,), leg.distance)
+            while queue and len(found) < limit:
+                _, legs, distance, _, path = heappop(queue)
+                last = path[-1]
+                if last.destination_id == destination_id:
+                    found.append(Itinerary(path, distance))
+                    continue
+                if legs == max_legs or expanded[last.flight_id] == limit:
+                    continue
+                expanded[last.flight_id] += 1
+                visited = {source_id, *(leg.destination_id for leg in path)}
+                for leg in candidates(
+                        self.departures(last.destination_id,
+                                        last.arrival_time + min_connection,
+                                        last.arrival_time + max_connection),
+                        distance, visited, legs + 1 == max_legs):
+                    push(path + (leg,), distance + leg.distance)
+        return found
+
+
+connection_index = ConnectionIndex()
@@ -0,0 +1,232 @@
+import random
+from array import array
+from datetime import datetime, timedelta, timezone
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.db import transaction
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+from airport_backend.models import (Airplane,
+                                    AirplaneType,
+                                    Airport,
+                                    City,
+                                    Country,
+                                    Crew,
+                                    Flight,
+                                    FlightSeatMap,
+                                    Order,
+                                    Route,
+                                    Ticket)
+from airport_backend.order_history import refresh_order_summaries
+
+
+SCALES = {
+    "small": {
+        "countries": 20, "cities": 200, "airports": 300, "routes": 2_000,
+        "airplanes": 100, "crew": 500, "flights": 20_000,
+        "users": 1_000, "orders": 20_000, "tickets": 60_000,
+    },
+    "medium": {
+        "countries": 100, "cities": 1_500, "airports": 3_000,
+        "routes": 20_000, "airplanes": 500, "crew": 5_000,
+        "flights": 500_000, "users": 20_000, "orders": 300_000,
+        "tickets": 1_000_000,
+    },
+    "large": {
+        "countries": 200, "cities": 5_000, "airports": 8_000,
+        "routes": 60_000, "airplanes": 2_000, "crew": 20_000,
+        "flights": 3_000_000, "users": 200_000, "orders": 2_000_000,
+        "tickets": 8_000_000,
+    },
+}
+
+SYLLABLES = ("ka", "lo", "mi", "ra", "to", "ne", "vi", "sa", "du", "pe",
+             "an", "or", "el", "is", "ur", "be", "zo", "qu", "fi", "ta")
+AIRPLANE_TYPES = ("Regional", "Narrow-body", "Wide-body", "Turboprop")
+AIRPLANE_LAYOUTS = ((18, 4), (30, 6), (45, 9), (12, 4))
+CRUISE_SPEED_KMH = 800
+BENCHMARK_PASSWORD = "benchmark-password"
+
+
+class DatasetGenerator:
+    """Fill the database with seeded synthetic reference data, flights,
+    orders and tickets.
+
+    The same ``seed`` and counts always produce the same dataset on an empty
+    database. Rows are inserted with ``bulk_create`` in ``batch_size``
+    chunks, so the signals that maintain seat maps do not fire; seat
+    counters are recomputed from the tickets at the end instead, and order
+    summaries are written with every batch of orders.
+    """
+
+    def __init__(self, counts, seed=0, batch_size=5000, start=None,
+                 log=None):
+        self.counts = counts
+        self.seed = seed
+        self.random = random.Random(seed)
+        self.batch_size = batch_size
+        self.start = start or datetime(2030, 1, 1, tzinfo=timezone.utc)
+        self.log = log or (lambda message: None)
+
+    def name(self, index):
+        syllables = [self.random.choice(SYLLABLES)
+                     for _ in range(self.random.randint(2, 4))]
+        return f"{''.join(syllables).capitalize()} {self.seed}-{index}"
+
+    def _create(self, model, objects):
+        created = []
+        for start in range(0, len(objects), self.batch_size):
+            created += model.objects.bulk_create(
+                objects[start:start + self.batch_size]
+            )
+        self.log(f"{model.__name__}: {len(created)}")
+        return created
+
+    def generate(self):
+        with transaction.atomic():
+            self.reference_data()
+        self.flights()
+        self.orders()
+        self.recount_seats()
+
+    def reference_data(self):
+        counts = self.counts
+        countries = self._create(Country, [
+            Country(name=self.name(index))
+            for index in range(counts["countries"])
+        ])
+        cities = self._create(City, [
+            City(name=self.name(index),
+                 country=self.random.choice(countries))
+            for index in range(counts["cities"])
+        ])
+        airports = self._create(Airport, [
+            Airport(name=f"{self.name(index)} Airport",
+                    closest_big_city=self.random.choice(cities))
+            for index in range(counts["airports"])
+        ])
+        pairs = set()
+        while len(pairs) < min(counts["routes"],
+                               len(airports) * (len(airports) - 1)):
+            source, destination = self.random.sample(airports, 2)
+            pairs.add((source.id, destination.id))
+        self.routes = self._create(Route, [
+            Route(source_id=source,
+                  destination_id=destination,
+                  distance=self.random.randint(150, 9000))
+            for source, destination in sorted(pairs)
+        ])
+        airplane_types = self._create(AirplaneType, [
+            AirplaneType(name=f"{name} {self.seed}")
+            for name in AIRPLANE_TYPES
+        ])
+        airplanes = []
+        for index in range(counts["airplanes"]):
+            layout = self.random.randrange(len(AIRPLANE_LAYOUTS))
+            rows, seats_in_row = AIRPLANE_LAYOUTS[layout]
+            airplanes.append(Airplane(name=self.name(index),
+                                      rows=rows,
+                                      seats_in_row=seats_in_row,
+                                      airplane_type=airplane_types[layout]))
+        self.airplanes = self._create(Airplane, airplanes)
+        self.crew = self._create(Crew, [
+            Crew(first_name=self.name(index).split()[0],
+                 last_name=self.name(index).split()[0])
+            for index in range(counts["crew"])
+        ])
+
+    def flights(self):
+        """Departures are distinct seconds of a year, so no two flights
+        of a route share a ``departure_time`` and break the (route,
+        departure_time) unique constraint."""
+        total = self.counts["flights"]
+        horizon = max(365 * 24 * 3600, total * 2)
+        departures = sorted(self.random.sample(range(horizon), total))
+        self.flight_ids = array("q")
+        self.flight_airplanes = array("l")
+        crew = Flight.crew.through
+        for start in range(0, total, self.batch_size):
+            flights = []
+            for offset in departures[start:start + self.batch_size]:
+                route = self.random.choice(self.routes)
+                airplane = self.random.randrange(len(self.airplanes))
+                arrival = offset + 1800 + (
+                    route.distance * 3600 // CRUISE_SPEED_KMH
+                )
+                flights.append(Flight(
+                    route=route,
+                    airplane=self.airplanes[airplane],
+                    departure_time=self.start + timedelta(seconds=offset),
+                    arrival_time=self.start + timedelta(seconds=arrival),
+                ))
+                self.flight_airplanes.append(airplane)
+            with transaction.atomic():
+                flights = Flight.objects.bulk_create(flights)
+                crew.objects.bulk_create([
+                    crew(flight_id=flight.id, crew_id=member.id)
+                    for flight in flights
+                    for member in self.random.sample(
+                        self.crew, min(len(self.crew),
+                                       self.random.randint(2, 4))
+                    )
+                ])
+            self.flight_ids.extend(flight.id for flight in flights)
+        self.log(f"Flight: {len(self.flight_ids)}")
+
+    def orders(self):
+        user_model = get_user_model()
+        password = make_password(BENCHMARK_PASSWORD)
+        users = self._create(user_model, [
+            user_model(email=f"user{self.seed}-{index}@example.com",
+                       password=password)
+            for index in range(self.counts["users"])
+        ])
+        total = self.counts["orders"]
+        if not total or not self.flight_ids:
+            return
+        tickets_per_order = max(1, self.counts["tickets"] // total)
+        created = 0
+        for start in range(0, total, self.batch_size):
+            size = min(self.batch_size, total - start)
+            with transaction.atomic():
+                orders = Order.objects.bulk_create([
+                    Order(user=self.random.choice(users)) for _ in range(size)
+                ])
+                tickets = []
+                for order in orders:
+                    flight = self.random.randrange(len(self.flight_ids))
+                    airplane = self.airplanes[self.flight_airplanes[flight]]
+                    for _ in range(self.random.randint(1, 2 * tickets_per_order - 1)):
+                        tickets.append(Ticket(
+                            order=order,
+                            flight_id=self.flight_ids[flight],
+                            row=self.random.randint(1, airplane.rows),
+                            seat=self.random.randint(1, airplane.seats_in_row),
+                        ))
+                # Seats that are already sold are dropped by the unique
+                # constraint, like a losing concurrent booking would be.
+                Ticket.objects.bulk_create(tickets, ignore_conflicts=True)
+                refresh_order_summaries([order.id for order in orders])
+            created += len(orders)
+        self.log(f"Order: {created}")
+        self.log(f"Ticket: {Ticket.objects.filter(order__user__in=users).count()}")
+
+    def recount_seats(self):
+        if not self.flight_ids:
+            return
+        flights = Flight.objects.filter(
+            id__range=(min(self.flight_ids), max(self.flight_ids))
+        )
+        sold = (
+            Ticket.objects
+            .filter(flight=OuterRef("pk"))
+            .order_by()
+            .values("flight")
+            .annotate(count=Count("id"))
+            .values("count")
+        )
+        flights.update(seats_sold=Coalesce(Subquery(sold), 0))
+        # Seat maps are rebuilt from tickets the next time they are read.
+        FlightSeatMap.objects.filter(flight__in=flights).delete()
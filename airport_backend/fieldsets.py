@@ -0,0 +1,200 @@
+from django.core.exceptions import FieldDoesNotExist
+from drf_spectacular.types import OpenApiTypes
+from drf_spectacular.utils import OpenApiParameter
+from rest_framework import serializers
+from rest_framework.exceptions import ValidationError
+
+
+FIELDSET_PARAMETERS = [
+    OpenApiParameter(
+        "fields",
+        type=OpenApiTypes.STR,
+        description=(
+            "Comma-separated fields to return, dotted for fields of nested "
+            "objects (ex. ?fields=id,tickets.row,tickets.seat)"
+        ),
+    ),
+    OpenApiParameter(
+        "expand",
+        type=OpenApiTypes.STR,
+        description=(
+            "Comma-separated nested objects to include, dotted for deeper "
+            "ones; the others are returned as ids. Without it every nested "
+            "object is included (ex. ?expand=tickets.flight)"
+        ),
+    ),
+]
+
+
+def parse_paths(value):
+    """``"id,tickets.flight.id"`` -> ``{"id": {}, "tickets": {"flight":
+    {"id": {}}}}``, or ``None`` when the parameter is absent."""
+    if value is None:
+        return None
+    tree = {}
+    for path in value.split(","):
+        node = tree
+        for name in filter(None, (part.strip() for part in path.split("."))):
+            node = node.setdefault(name, {})
+    return tree
+
+
+def _nested(field):
+    if isinstance(field, serializers.ListSerializer):
+        return field.child
+    return field
+
+
+def _rebuild(field, fields, expand):
+    child = _nested(field)
+    kwargs = {**child._kwargs, "fields": fields, "expand": expand}
+    if isinstance(field, serializers.ListSerializer):
+        kwargs["many"] = True
+    return child.__class__(*child._args, **kwargs)
+
+
+def _collapse(field):
+    kwargs = {"source": field.source} if field.source else {}
+    return serializers.PrimaryKeyRelatedField(
+        read_only=True,
+        many=isinstance(field, serializers.ListSerializer),
+        **kwargs
+    )
+
+
+class SparseFieldsetsMixin:
+    """Serializer taking ``fields`` and ``expand`` trees from ``parse_paths``.
+
+    ``fields`` keeps only the named fields, all of them when ``None``; a
+    nested object named without sub-fields keeps all of its own. Nested
+    objects are included by default; once ``expand`` is given, only the ones
+    it names stay nested and the rest collapse to their primary keys.
+    """
+
+    def __init__(self, *args, fields=None, expand=None, **kwargs):
+        self.sparse_fields = fields
+        self.sparse_expand = expand
+        super().__init__(*args, **kwargs)
+
+    def get_fields(self):
+        fields = super().get_fields()
+        errors = {}
+        if self.sparse_fields is not None:
+            unknown = set(self.sparse_fields) - set(fields)
+            if unknown:
+                errors["fields"] = [f"Unknown field: {name}"
+                                    for name in sorted(unknown)]
+        if self.sparse_expand is not None:
+            unknown = set(self.sparse_expand) - {
+                name for name, field in fields.items()
+                if isinstance(_nested(field), serializers.BaseSerializer)
+            }
+            if unknown:
+                errors["expand"] = [f"Not an expandable field: {name}"
+                                    for name in sorted(unknown)]
+        if errors:
+            raise ValidationError(errors)
+
+        if self.sparse_fields is not None:
+            fields = {name: field for name, field in fields.items()
+                      if name in self.sparse_fields}
+        for name, field in fields.items():
+            if not isinstance(_nested(field), serializers.BaseSerializer):
+                continue
+            if self.sparse_expand is not None and name not in self.sparse_expand:
+                fields[name] = _collapse(field)
+            elif isinstance(_nested(field), SparseFieldsetsMixin):
+                fields[name] = _rebuild(
+                    field,
+                    (self.sparse_fields or {}).get(name) or None,
+                    None if self.sparse_expand is None
+                    else self.sparse_expand[name],
+                )
+        return fields
+
+
+def _relation_path(model, attrs):
+    """Walk ``attrs`` from ``model`` while they are relations; return the
+    relation names, whether any of them is to-many, and the last model."""
+    names, many = [], False
+    for attr in attrs:
+        try:
+            field = model._meta.get_field(attr)
+        except FieldDoesNotExist:
+            break
+        if not field.is_relation:
+            break
+        names.append(attr)
+        many = many or field.many_to_many or field.one_to_many
+        model = field.related_model
+    return names, many, model
+
+
+def related_lookups(serializer):
+    """Return the ``select_related`` and ``prefetch_related`` lookups the
+    fields of ``serializer`` read.
+
+    Relations are found from the field sources; to-one relations are joined
+    and anything under a to-many one is prefetched. ``Meta.related_fields``
+    maps a field to extra lookups its value reads (``__str__``, properties,
+    method fields).
+    """
+    select, prefetch = [], []
+
+    def collect(serializer, model, prefix, prefetching):
+        related_fields = getattr(serializer.Meta, "related_fields", {})
+        for name, field in serializer.fields.items():
+            if field.write_only:
+                continue
+            for lookup in related_fields.get(name, ()):
+                names, many, _ = _relation_path(model, lookup.split("__"))
+                if names:
+                    target = prefetch if prefetching or many else select
+                    target.append("__".join(prefix + names))
+            if field.source == "*":
+                continue
+            names, many, related_model = _relation_path(
+                model, field.source.split(".")
+            )
+            if not names:
+                continue
+            if (isinstance(field, serializers.PrimaryKeyRelatedField)
+                    and len(names) == 1):
+                # Read from the ``<name>_id`` column, nothing to join.
+                continue
+            many = prefetching or many
+            (prefetch if many else select).append("__".join(prefix + names))
+            nested = _nested(field)
+            if isinstance(nested, serializers.ModelSerializer):
+                collect(nested, related_model, prefix + names, many)
+
+    serializer = _nested(serializer)
+    collect(serializer, serializer.Meta.model, [], False)
+    return list(dict.fromkeys(select)), list(dict.fromkeys(prefetch))
+
+
+class SparseFieldsetsViewMixin:
+    """Pass ``?fields=`` and ``?expand=`` to the serializer of the
+    ``fieldsets_actions`` and derive the joins from what it will render."""
+    fieldsets_actions = ("list", "retrieve")
+
+    def get_fieldsets(self):
+        params = getattr(self.request, "query_params", {})
+        return parse_paths(params.get("fields")), parse_paths(params.get("expand"))
+
+    def get_serializer(self, *args, **kwargs):
+        if (self.action in self.fieldsets_actions
+                and issubclass(self.get_serializer_class(), SparseFieldsetsMixin)):
+            kwargs["fields"], kwargs["expand"] = self.get_fieldsets()
+        return super().get_serializer(*args, **kwargs)
+
+    def join_requested(self, queryset):
+        """Replace the joins of ``queryset`` with the ones the requested
+        fields read."""
+        select, prefetch = related_lookups(self.get_serializer())
+        queryset = queryset.select_related(None).prefetch_related(None)
+        if select:
+            queryset = queryset.select_related(*select)
+        if prefetch:
+            queryset = queryset.prefetch_related(*prefetch)
+        return queryset
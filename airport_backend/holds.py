@@ -0,0 +1,180 @@
+import threading
+import uuid
+from collections import namedtuple
+from datetime import timedelta
+from functools import reduce
+from operator import or_
+
+from django.conf import settings
+from django.db import transaction, IntegrityError
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.module_loading import import_string
+from airport_backend.models import SeatHold
+
+
+Hold = namedtuple("Hold", ("token", "expires_at", "seats"))
+
+
+class SeatsUnavailable(Exception):
+    def __init__(self, seats):
+        super().__init__(seats)
+        self.seats = seats
+
+
+class BaseHoldStore:
+    """Short-lived reservations of ``(flight_id, row, seat)`` triples.
+
+    ``hold`` either reserves all requested seats for the user or raises
+    ``SeatsUnavailable`` listing the ones somebody else is holding.
+    """
+
+    def hold(self, user_id, seats, ttl):
+        raise NotImplementedError
+
+    def get(self, token, user_id):
+        """Seats still held under ``token`` by ``user_id``."""
+        raise NotImplementedError
+
+    def conflicts(self, seats, user_id):
+        """Seats out of ``seats`` held by anybody but ``user_id``."""
+        raise NotImplementedError
+
+    def release(self, token):
+        raise NotImplementedError
+
+    def sweep(self):
+        """Drop expired holds and return how many were removed."""
+        raise NotImplementedError
+
+
+class LocMemHoldStore(BaseHoldStore):
+    """Process-local store, only suitable for a single worker."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._seats = {}
+        self._tokens = {}
+
+    def _holder(self, seat, now):
+        held = self._seats.get(seat)
+        if held is None or held[2] <= now:
+            return None
+        return held
+
+    def hold(self, user_id, seats, ttl):
+        now = timezone.now()
+        expires_at = now + ttl
+        token = uuid.uuid4()
+        with self._lock:
+            taken = [seat for seat in seats
+                     if (self._holder(seat, now) or (None, user_id))[1] != user_id]
+            if taken:
+                raise SeatsUnavailable(taken)
+            for seat in seats:
+                self._seats[seat] = (token, user_id, expires_at)
+            self._tokens[token] = (user_id, expires_at, list(seats))
+        return Hold(token, expires_at, list(seats))
+
+    def get(self, token, user_id):
+        now = timezone.now()
+        with self._lock:
+            held = self._tokens.get(token)
+            if held is None or held[0] != user_id or held[1] <= now:
+                return []
+            return [seat for seat in held[2]
+                    if self._seats.get(seat, (None,))[0] == token]
+
+    def conflicts(self, seats, user_id):
+        now = timezone.now()
+        with self._lock:
+            return [seat for seat in seats
+                    if (self._holder(seat, now) or (None, user_id))[1] != user_id]
+
+    def release(self, token):
+        with self._lock:
+            held = self._tokens.pop(token, None)
+            if held is None:
+                return
+            for seat in held[2]:
+                if self._seats.get(seat, (None,))[0] == token:
+                    del self._seats[seat]
+
+    def sweep(self):
+        now = timezone.now()
+        with self._lock:
+            expired = [token for token, held in self._tokens.items()
+                       if held[1] <= now]
+            for seat, held in list(self._seats.items()):
+                if held[2] <= now:
+                    del self._seats[seat]
+            for token in expired:
+                del self._tokens[token]
+        return len(expired)
+
+
+class DatabaseHoldStore(BaseHoldStore):
+    """Store shared by all workers; the unique (flight, row, seat) index on
+    ``SeatHold`` makes taking a hold atomic."""
+
+    @staticmethod
+    def _seats_filter(seats):
+        return reduce(or_, (Q(flight_id=flight_id, row=row, seat=seat)
+                            for flight_id, row, seat in seats))
+
+    def hold(self, user_id, seats, ttl):
+        now = timezone.now()
+        expires_at = now + ttl
+        token = uuid.uuid4()
+        try:
+            with transaction.atomic():
+                SeatHold.objects.filter(self._seats_filter(seats)).filter(
+                    Q(expires_at__lte=now) | Q(user_id=user_id)
+                ).delete()
+                SeatHold.objects.bulk_create([
+                    SeatHold(flight_id=flight_id, row=row, seat=seat,
+                             user_id=user_id, token=token,
+                             expires_at=expires_at)
+                    for flight_id, row, seat in seats
+                ])
+        except IntegrityError:
+            raise SeatsUnavailable(self.conflicts(seats, user_id))
+        return Hold(token, expires_at, list(seats))
+
+    def get(self, token, user_id):
+        return list(SeatHold.objects.filter(
+            token=token, user_id=user_id, expires_at__gt=timezone.now()
+        ).values_list("flight_id", "row", "seat"))
+
+    def conflicts(self, seats, user_id):
+        if not seats:
+            return []
+        return list(SeatHold.objects.filter(
+            self._seats_filter(seats), expires_at__gt=timezone.now()
+        ).exclude(user_id=user_id).values_list("flight_id", "row", "seat"))
+
+    def release(self, token):
+        SeatHold.objects.filter(token=token).delete()
+
+    def sweep(self):
+        deleted, _ = SeatHold.objects.filter(
+            expires_at__lte=timezone.now()
+        ).delete()
+        return deleted
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_hold_store():
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = import_string(settings.SEAT_HOLDS["BACKEND"])()
+    return _store
+
+
+def hold_ttl():
+    return timedelta(seconds=settings.SEAT_HOLDS["TTL"])
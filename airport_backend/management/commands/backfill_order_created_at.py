@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+from airport_backend.backfills import backfill_order_created_at
+from airport_backend.models import Order
+
+
+class Command(BaseCommand):
+    help = ("Stamp orders created before Order.created_at existed, in "
+            "batches. Run it between migrations 0023 and 0024 on large "
+            "tables so that 0024 has nothing left to update.")
+
+    def add_arguments(self, parser):
+        parser.add_argument("--chunk-size", type=int, default=10000)
+
+    def handle(self, *args, **options):
+        total = backfill_order_created_at(Order,
+                                          chunk_size=options["chunk_size"],
+                                          log=self.stdout.write)
+        self.stdout.write(self.style.SUCCESS(f"Stamped {total} orders"))
@@ -0,0 +1,69 @@
+import json
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+from airport_backend.benchmark import (METRICS,
+                                       BenchmarkRunner,
+                                       build_scenarios,
+                                       compare)
+
+
+class Command(BaseCommand):
+    help = ("Benchmark the flight, order and ticket endpoints against the "
+            "current database and compare the results with a baseline.")
+
+    def add_arguments(self, parser):
+        parser.add_argument("--iterations", type=int, default=50)
+        parser.add_argument("--warmup", type=int, default=3)
+        parser.add_argument("--host", default="localhost")
+        parser.add_argument("--only",
+                            nargs="*",
+                            help="scenario names to run, all by default")
+        parser.add_argument("--baseline", default="benchmarks/baseline.json")
+        parser.add_argument("--save-baseline",
+                            action="store_true",
+                            help="store the results as the new baseline")
+        parser.add_argument("--output", help="also write the results here")
+        parser.add_argument("--latency-tolerance", type=float, default=0.25)
+        parser.add_argument("--memory-tolerance", type=float, default=0.25)
+
+    def handle(self, *args, **options):
+        try:
+            scenarios = build_scenarios()
+        except ValueError as error:
+            raise CommandError(error)
+        if options["only"]:
+            scenarios = [scenario for scenario in scenarios
+                         if scenario.name in options["only"]]
+        runner = BenchmarkRunner(iterations=options["iterations"],
+                                 warmup=options["warmup"],
+                                 host=options["host"])
+        results = runner.run(scenarios)
+
+        self.stdout.write(f"{'scenario':<24}"
+                          + "".join(f"{metric:>12}" for metric in METRICS))
+        for name, metrics in results.items():
+            self.stdout.write(f"{name:<24}" + "".join(
+                f"{metrics[metric]:>12}" for metric in METRICS
+            ))
+        if options["output"]:
+            Path(options["output"]).write_text(json.dumps(results, indent=2))
+
+        baseline = Path(options["baseline"])
+        if options["save_baseline"]:
+            baseline.parent.mkdir(parents=True, exist_ok=True)
+            baseline.write_text(json.dumps(results, indent=2))
+            self.stdout.write(f"Baseline saved to {baseline}")
+            return
+        if not baseline.exists():
+            self.stdout.write(f"No baseline at {baseline}; "
+                              f"run with --save-baseline to create one")
+            return
+        regressions = compare(results,
+                              json.loads(baseline.read_text()),
+                              latency_tolerance=options["latency_tolerance"],
+                              memory_tolerance=options["memory_tolerance"])
+        if regressions:
+            raise CommandError("Performance regressions:\n"
+                               + "\n".join(regressions))
+        self.stdout.write(self.style.SUCCESS("No regressions"))
@@ -0,0 +1,29 @@
+from django.core.management.base import BaseCommand
+from django.core.files.storage import default_storage
+from airport_backend.models import Airplane, City, Crew
+from airport_backend.thumbnails import (record_thumbnails,
+                                        render_thumbnails,
+                                        thumbnail_targets)
+
+
+class Command(BaseCommand):
+    help = "Render thumbnails for every crew, airplane and city image."
+
+    def handle(self, *args, **options):
+        rendered = 0
+        for model in (Crew, Airplane, City):
+            images = (
+                model.objects
+                .exclude(image="")
+                .exclude(image__isnull=True)
+                .values_list("pk", "image")
+            )
+            for pk, name in images.iterator():
+                if not default_storage.exists(name):
+                    self.stdout.write(f"Missing {name}, skipped")
+                    continue
+                render_thumbnails(default_storage.path(name),
+                                  thumbnail_targets(name))
+                record_thumbnails(model, pk, name)
+                rendered += 1
+        self.stdout.write(self.style.SUCCESS(f"Rendered {rendered} images"))
@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand
+from airport_backend.dataset import SCALES, DatasetGenerator
+
+
+class Command(BaseCommand):
+    help = ("Fill the database with a seeded synthetic dataset for load "
+            "testing and benchmarks.")
+
+    def add_arguments(self, parser):
+        parser.add_argument("--scale", choices=SCALES, default="small")
+        parser.add_argument("--seed", type=int, default=0)
+        parser.add_argument("--batch-size", type=int, default=5000)
+        for name in SCALES["small"]:
+            parser.add_argument(f"--{name}",
+                                type=int,
+                                help=f"override the number of {name}")
+
+    def handle(self, *args, **options):
+        counts = {
+            name: default if options[name] is None else options[name]
+            for name, default in SCALES[options["scale"]].items()
+        }
+        DatasetGenerator(counts,
+                         seed=options["seed"],
+                         batch_size=options["batch_size"],
+                         log=self.stdout.write).generate()
+        self.stdout.write(self.style.SUCCESS("Dataset generated"))
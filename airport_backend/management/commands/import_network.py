@@ -0,0 +1,333 @@
+import csv
+import json
+import math
+from itertools import islice
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from airport_backend.models import (Airplane,
+                                    Airport,
+                                    City,
+                                    Country,
+                                    Flight,
+                                    Route)
+from airport_backend.response_cache import bump_model_version
+
+
+OPENFLIGHTS_AIRPORT_FIELDS = ("openflights_id", "name", "city", "country",
+                              "code", "icao", "latitude", "longitude")
+OPENFLIGHTS_ROUTE_FIELDS = ("airline", "airline_id", "source", "source_id",
+                            "destination", "destination_id", "codeshare",
+                            "stops", "equipment")
+OPENFLIGHTS_NULL = "\\N"
+NAME_LENGTH = 100
+# The flight_route_departure_unique constraint.
+FLIGHT_CONFLICT = "ON CONFLICT (route_id, departure_time) DO NOTHING"
+EARTH_RADIUS_KM = 6371
+
+
+def read_records(path, fieldnames=None):
+    """Stream dicts from a CSV file (with a header row, or ``fieldnames`` for
+    headerless OpenFlights ``.dat`` files), JSON Lines or a JSON array."""
+    if path.endswith((".jsonl", ".ndjson")):
+        with open(path, encoding="utf-8") as source:
+            for line in source:
+                if line.strip():
+                    yield json.loads(line)
+    elif path.endswith(".json"):
+        with open(path, encoding="utf-8") as source:
+            yield from json.load(source)
+    else:
+        with open(path, newline="", encoding="utf-8") as source:
+            yield from csv.DictReader(source, fieldnames=fieldnames)
+
+
+def batches(records, size):
+    records = iter(records)
+    while batch := list(islice(records, size)):
+        yield batch
+
+
+def text(value, length=NAME_LENGTH):
+    if value is None:
+        return None
+    value = str(value).strip()
+    if not value or value == OPENFLIGHTS_NULL:
+        return None
+    return value[:length]
+
+
+def distance_km(source, destination):
+    lat1, lon1, lat2, lon2 = map(math.radians, (*source, *destination))
+    a = (math.sin((lat2 - lat1) / 2) ** 2
+         + math.cos(lat1) * math.cos(lat2) * math.sin((lon2 - lon1) / 2) ** 2)
+    return round(2 * EARTH_RADIUS_KM * math.asin(math.sqrt(a)))
+
+
+class Command(BaseCommand):
+    help = ("Bulk import airports (with their cities and countries), routes "
+            "and flight schedules from CSV, JSON or JSON Lines files.")
+
+    def add_arguments(self, parser):
+        parser.add_argument("--airports",
+                            help="name, city, country, code, latitude, "
+                                 "longitude")
+        parser.add_argument("--routes",
+                            help="source, destination (airport codes) and "
+                                 "an optional distance")
+        parser.add_argument("--schedules",
+                            help="source, destination, airplane, "
+                                 "departure_time, arrival_time")
+        parser.add_argument("--openflights",
+                            action="store_true",
+                            help="airports and routes files use the "
+                                 "headerless OpenFlights layout")
+        parser.add_argument("--batch-size", type=int, default=5000)
+        parser.add_argument("--no-copy",
+                            action="store_true",
+                            help="insert flights with multi-row INSERTs "
+                                 "instead of Postgres COPY")
+
+    def handle(self, *args, **options):
+        if not any(options[name] for name in ("airports", "routes", "schedules")):
+            raise CommandError("Nothing to import: pass --airports, "
+                               "--routes and/or --schedules")
+        self.batch_size = options["batch_size"]
+        self.countries = dict(Country.objects.values_list("name", "id"))
+        self.cities = dict(City.objects.values_list("name", "id"))
+        self.airports = dict(
+            Airport.objects.exclude(code=None).values_list("code", "id")
+        )
+        self.coordinates = {}
+
+        if options["airports"]:
+            self.import_airports(options["airports"], options["openflights"])
+            for model in (Country, City, Airport):
+                bump_model_version(model)
+        if options["routes"]:
+            self.import_routes(options["routes"], options["openflights"])
+            bump_model_version(Route)
+        if options["schedules"]:
+            use_copy = (not options["no_copy"]
+                        and connection.vendor == "postgresql")
+            self.import_schedules(options["schedules"], use_copy)
+
+    def import_airports(self, path, openflights):
+        fields = OPENFLIGHTS_AIRPORT_FIELDS if openflights else None
+        imported = skipped = 0
+        for batch in batches(read_records(path, fields), self.batch_size):
+            airports = {}
+            for record in batch:
+                name = text(record.get("name"))
+                city = text(record.get("city"))
+                country = text(record.get("country"))
+                if not (name and city and country):
+                    skipped += 1
+                    continue
+                code = text(record.get("code"), 4)
+                code = code.upper() if code else None
+                airports[name] = (city, country, code)
+                try:
+                    self.coordinates[code] = (float(record["latitude"]),
+                                              float(record["longitude"]))
+                except (KeyError, TypeError, ValueError):
+                    pass
+            with transaction.atomic():
+                self._save_airports(airports)
+            imported += len(airports)
+        self.stdout.write(f"Airports: {imported} imported, {skipped} skipped")
+
+    def _save_airports(self, airports):
+        countries = {country for _, country, _ in airports.values()} - set(self.countries)
+        Country.objects.bulk_create(
+            [Country(name=name) for name in countries],
+            ignore_conflicts=True
+        )
+        self.countries.update(
+            Country.objects.filter(name__in=countries).values_list("name", "id")
+        )
+
+        cities = {city: country for city, country, _ in airports.values()}
+        City.objects.bulk_create(
+            [City(name=name, country_id=self.countries[country])
+             for name, country in cities.items()],
+            update_conflicts=True,
+            unique_fields=["name"],
+            update_fields=["country"]
+        )
+        self.cities.update(
+            City.objects.filter(name__in=cities).values_list("name", "id")
+        )
+
+        existing = dict(
+            Airport.objects.filter(name__in=airports).values_list("name", "id")
+        )
+        seen_codes = set()
+        objects = []
+        for name, (city, _, code) in airports.items():
+            owner = self.airports.get(code)
+            if code in seen_codes or (owner and owner != existing.get(name)):
+                # Codes are unique; keep the airport that claimed it first.
+                code = None
+            seen_codes.add(code)
+            objects.append(Airport(name=name,
+                                   closest_big_city_id=self.cities[city],
+                                   code=code))
+        Airport.objects.bulk_create(
+            objects,
+            update_conflicts=True,
+            unique_fields=["name"],
+            update_fields=["closest_big_city", "code"]
+        )
+        self.airports.update(
+            Airport.objects
+            .filter(name__in=airports)
+            .exclude(code=None)
+            .values_list("code", "id")
+        )
+
+    def import_routes(self, path, openflights):
+        fields = OPENFLIGHTS_ROUTE_FIELDS if openflights else None
+        routes = {
+            (source, destination): (route_id, distance)
+            for route_id, source, destination, distance in
+            Route.objects.values_list("id", "source_id",
+                                      "destination_id", "distance")
+        }
+        created = updated = skipped = 0
+        for batch in batches(read_records(path, fields), self.batch_size):
+            new_routes = {}
+            changed = {}
+            for record in batch:
+                source = (text(record.get("source"), 4) or "").upper()
+                destination = (text(record.get("destination"), 4) or "").upper()
+                pair = (self.airports.get(source),
+                        self.airports.get(destination))
+                if None in pair or pair[0] == pair[1]:
+                    skipped += 1
+                    continue
+                distance = text(record.get("distance"))
+                if distance is not None:
+                    try:
+                        distance = int(float(distance))
+                    except (ValueError, OverflowError):
+                        self.stderr.write(f"Route {source}-{destination}: "
+                                          f"invalid distance {distance!r}")
+                        skipped += 1
+                        continue
+                elif {source, destination} <= set(self.coordinates):
+                    distance = distance_km(self.coordinates[source],
+                                           self.coordinates[destination])
+                else:
+                    skipped += 1
+                    continue
+                if pair not in routes:
+                    new_routes[pair] = distance
+                elif routes[pair][1] != distance:
+                    changed[pair] = distance
+            with transaction.atomic():
+                objects = Route.objects.bulk_create([
+                    Route(source_id=source_id,
+                          destination_id=destination_id,
+                          distance=distance)
+                    for (source_id, destination_id), distance in new_routes.items()
+                ])
+                Route.objects.bulk_update(
+                    [Route(id=routes[pair][0], distance=distance)
+                     for pair, distance in changed.items()],
+                    ["distance"]
+                )
+            for route in objects:
+                routes[(route.source_id, route.destination_id)] = (
+                    route.id, route.distance
+                )
+            for pair, distance in changed.items():
+                routes[pair] = (routes[pair][0], distance)
+            created += len(new_routes)
+            updated += len(changed)
+        self.stdout.write(f"Routes: {created} created, {updated} updated, "
+                          f"{skipped} skipped")
+
+    def import_schedules(self, path, use_copy):
+        routes = {
+            (source, destination): route_id
+            for route_id, source, destination in
+            Route.objects.values_list("id", "source_id", "destination_id")
+        }
+        airplanes = {}
+        for airplane_id, name in Airplane.objects.order_by("-id").values_list(
+                "id", "name"):
+            airplanes[name] = airplane_id
+        codes = self.airports
+        default_timezone = timezone.get_default_timezone()
+        inserted = skipped = 0
+        for batch in batches(read_records(path), self.batch_size):
+            flights = []
+            for record in batch:
+                route_id = routes.get((
+                    codes.get((text(record.get("source"), 4) or "").upper()),
+                    codes.get((text(record.get("destination"), 4) or "").upper()),
+                ))
+                airplane_id = airplanes.get(text(record.get("airplane")))
+                try:
+                    departure = parse_datetime(record["departure_time"])
+                    arrival = parse_datetime(record["arrival_time"])
+                except (KeyError, TypeError, ValueError):
+                    departure = arrival = None
+                if not (route_id and airplane_id and departure and arrival):
+                    skipped += 1
+                    continue
+                if timezone.is_naive(departure):
+                    departure = timezone.make_aware(departure, default_timezone)
+                if timezone.is_naive(arrival):
+                    arrival = timezone.make_aware(arrival, default_timezone)
+                flights.append((route_id, airplane_id, departure, arrival))
+            if use_copy:
+                inserted += self._copy_flights(flights)
+            else:
+                inserted += self._insert_flights(flights)
+        self.stdout.write(f"Flights: {inserted} inserted, {skipped} skipped")
+
+    @staticmethod
+    def _insert_flights(flights):
+        """Insert a batch with one multi-row ``INSERT``, skipping flights
+        whose route already departs at that time; return how many were
+        inserted."""
+        if not flights:
+            return 0
+        values = ", ".join(["(%s, %s, %s, %s, 0)"] * len(flights))
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'INSERT INTO "{Flight._meta.db_table}" '
+                "(route_id, airplane_id, departure_time, arrival_time, "
+                f"seats_sold) VALUES {values} {FLIGHT_CONFLICT}",
+                [value for flight in flights for value in flight]
+            )
+            return cursor.rowcount
+
+    @staticmethod
+    def _copy_flights(flights):
+        """COPY a batch into a temporary table, then move it over skipping
+        flights whose route already departs at that time, so re-running an
+        import is idempotent; return how many were inserted."""
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.execute(
+                "CREATE TEMPORARY TABLE flight_import ("
+                "route_id bigint, airplane_id bigint, "
+                "departure_time timestamptz, arrival_time timestamptz)"
+            )
+            with cursor.cursor.copy("COPY flight_import FROM STDIN") as copy:
+                for flight in flights:
+                    copy.write_row(flight)
+            cursor.execute(
+                f'INSERT INTO "{Flight._meta.db_table}" '
+                "(route_id, airplane_id, departure_time, arrival_time, "
+                "seats_sold) "
+                "SELECT route_id, airplane_id, departure_time, arrival_time, 0 "
+                f"FROM flight_import {FLIGHT_CONFLICT}"
+            )
+            inserted = cursor.rowcount
+            cursor.execute("DROP TABLE flight_import")
+        return inserted
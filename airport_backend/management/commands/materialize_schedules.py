@@ -0,0 +1,22 @@
+import time
+from django.core.management.base import BaseCommand
+from airport_backend.schedules import materialize_schedules
+
+
+class Command(BaseCommand):
+    help = ("Create flights from flight schedules over the next --days days, "
+            "once or every --interval seconds.")
+
+    def add_arguments(self, parser):
+        parser.add_argument("--days", type=int)
+        parser.add_argument("--interval", type=int, default=0)
+
+    def handle(self, *args, **options):
+        while True:
+            result = materialize_schedules(days=options["days"])
+            self.stdout.write(f"Created {result.created} flights "
+                              f"({result.existing} already existed, "
+                              f"{result.conflicts} conflicting time slots)")
+            if not options["interval"]:
+                break
+            time.sleep(options["interval"])
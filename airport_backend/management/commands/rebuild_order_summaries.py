@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand
+from airport_backend.models import Order
+from airport_backend.order_history import refresh_order_summaries
+
+
+class Command(BaseCommand):
+    help = ("Rebuild the order history summaries, of all orders or only of "
+            "the ones that have none (--missing).")
+
+    def add_arguments(self, parser):
+        parser.add_argument("--missing", action="store_true")
+        parser.add_argument("--chunk-size", type=int, default=1000)
+
+    def handle(self, *args, **options):
+        orders = Order.objects.order_by("id")
+        if options["missing"]:
+            orders = orders.filter(summary__isnull=True)
+        order_ids = list(orders.values_list("id", flat=True)
+                         .iterator(chunk_size=options["chunk_size"]))
+        refresh_order_summaries(order_ids, chunk_size=options["chunk_size"])
+        self.stdout.write(self.style.SUCCESS(
+            f"Rebuilt {len(order_ids)} order summaries"
+        ))
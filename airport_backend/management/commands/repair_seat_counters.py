@@ -0,0 +1,52 @@
+from django.core.management.base import BaseCommand
+from django.db.models import (Count,
+                              F,
+                              Func,
+                              IntegerField,
+                              OuterRef,
+                              Q,
+                              Subquery)
+from django.db.models.functions import Coalesce
+from airport_backend.models import Flight, Ticket
+from airport_backend.seat_map import rebuild_seat_map
+
+
+class Command(BaseCommand):
+    help = ("Find flights whose seats_sold or seat map disagree with their "
+            "tickets and rebuild them.")
+
+    def add_arguments(self, parser):
+        parser.add_argument("--dry-run", action="store_true")
+
+    def handle(self, *args, **options):
+        sold = (
+            Ticket.objects
+            .filter(flight=OuterRef("pk"))
+            .order_by()
+            .values("flight")
+            .annotate(count=Count("id"))
+            .values("count")
+        )
+        drifted = (
+            Flight.objects
+            .annotate(
+                tickets=Coalesce(Subquery(sold), 0),
+                mapped=Coalesce(
+                    Func(F("seat_map__bitmap"),
+                         function="bit_count",
+                         output_field=IntegerField()),
+                    0
+                ),
+            )
+            .filter(~Q(seats_sold=F("tickets")) | ~Q(mapped=F("tickets")))
+            .values_list("id", flat=True)
+        )
+        flight_ids = list(drifted.iterator(chunk_size=2000))
+        self.stdout.write(f"{len(flight_ids)} flights drifted")
+        if options["dry_run"]:
+            return
+        for flight_id in flight_ids:
+            rebuild_seat_map(flight_id)
+        self.stdout.write(self.style.SUCCESS(
+            f"Rebuilt {len(flight_ids)} flights"
+        ))
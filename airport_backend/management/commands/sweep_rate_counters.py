@@ -0,0 +1,19 @@
+import time
+from django.core.management.base import BaseCommand
+from airport_backend.throttling import get_rate_store
+
+
+class Command(BaseCommand):
+    help = "Delete rate-limit counters of ended windows, once or every --interval seconds."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--interval", type=int, default=0)
+
+    def handle(self, *args, **options):
+        store = get_rate_store()
+        while True:
+            swept = store.sweep()
+            self.stdout.write(f"Swept {swept} expired rate counters")
+            if not options["interval"]:
+                break
+            time.sleep(options["interval"])
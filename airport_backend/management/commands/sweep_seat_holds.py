@@ -0,0 +1,19 @@
+import time
+from django.core.management.base import BaseCommand
+from airport_backend.holds import get_hold_store
+
+
+class Command(BaseCommand):
+    help = "Delete expired seat holds, once or every --interval seconds."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--interval", type=int, default=0)
+
+    def handle(self, *args, **options):
+        store = get_hold_store()
+        while True:
+            swept = store.sweep()
+            self.stdout.write(f"Swept {swept} expired seat holds")
+            if not options["interval"]:
+                break
+            time.sleep(options["interval"])
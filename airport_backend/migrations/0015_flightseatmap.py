@@ -0,0 +1,40 @@
+# Generated by Django 4.2.30 on 2026-10-18 17:55
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def build_seat_maps(apps, schema_editor):
+    from airport_backend.seat_map import SeatBitmap
+
+    Flight = apps.get_model("airport_backend", "Flight")
+    FlightSeatMap = apps.get_model("airport_backend", "FlightSeatMap")
+    Ticket = apps.get_model("airport_backend", "Ticket")
+
+    seat_maps = []
+    for flight in Flight.objects.select_related("airplane").iterator():
+        bitmap = SeatBitmap.from_seats(
+            flight.airplane.rows,
+            flight.airplane.seats_in_row,
+            Ticket.objects.filter(flight=flight).values_list("row", "seat")
+        )
+        seat_maps.append(FlightSeatMap(flight=flight, bitmap=bytes(bitmap.data)))
+    FlightSeatMap.objects.bulk_create(seat_maps, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('airport_backend', '0014_alter_flight_crew'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='FlightSeatMap',
+            fields=[
+                ('flight', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='seat_map', serialize=False, to='airport_backend.flight')),
+                ('bitmap', models.BinaryField(default=b'')),
+            ],
+        ),
+        migrations.RunPython(build_seat_maps, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.30 on 2026-10-18 18:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('airport_backend', '0018_flight_search_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='airport',
+            name='code',
+            field=models.CharField(blank=True, max_length=4, null=True, unique=True),
+        ),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 4.2.30 on 2026-10-18 18:12
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('airport_backend', '0019_airport_code'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='FlightSchedule',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('days_of_week', models.CharField(help_text='ISO weekdays the flight operates on, e.g. 135 for Monday, Wednesday and Friday', max_length=7)),
+                ('departure_time', models.TimeField(help_text='Local departure time')),
+                ('duration', models.DurationField()),
+                ('timezone', models.CharField(default='UTC', max_length=64)),
+                ('valid_from', models.DateField()),
+                ('valid_until', models.DateField()),
+                ('airplane', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='schedules', to='airport_backend.airplane')),
+                ('crew', models.ManyToManyField(blank=True, related_name='schedules', to='airport_backend.crew')),
+                ('route', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='schedules', to='airport_backend.route')),
+            ],
+        ),
+        migrations.AddField(
+            model_name='flight',
+            name='schedule',
+            field=models.ForeignKey(blank=True, editable=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='flights', to='airport_backend.flightschedule'),
+        ),
+    ]
@@ -0,0 +1,26 @@
+# Generated by Django 4.2.30 on 2026-10-18 18:33
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('airport_backend', '0020_flightschedule'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RateCounter',
+            fields=[
+                ('key', models.CharField(max_length=255, primary_key=True, serialize=False)),
+                ('hits', models.PositiveIntegerField(default=0)),
+                ('expires_at', models.BigIntegerField()),
+            ],
+        ),
+        # Counters are throwaway: skip the WAL.
+        migrations.RunSQL(
+            "ALTER TABLE airport_backend_ratecounter SET UNLOGGED",
+            "ALTER TABLE airport_backend_ratecounter SET LOGGED",
+        ),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 4.2.30 on 2026-10-18 18:44
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('airport_backend', '0022_ordersummary'),
+    ]
+
+    operations = [
+        # Without a default, so the column is added without rewriting the
+        # table; existing orders are stamped by backfill_order_created_at.
+        migrations.AddField(
+            model_name='order',
+            name='created_at',
+            field=models.DateTimeField(editable=False, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='order',
+            index=models.Index(fields=['user', 'created_at', 'id'], name='order_user_created_idx'),
+        ),
+    ]
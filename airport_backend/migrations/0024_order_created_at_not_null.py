@@ -0,0 +1,27 @@
+# Generated by Django 4.2.30 on 2026-10-18 18:44
+
+from django.db import migrations, models
+import django.utils.timezone
+
+from airport_backend.backfills import backfill_order_created_at
+
+
+def stamp_legacy_orders(apps, schema_editor):
+    # Nothing left when backfill_order_created_at was run after 0023.
+    backfill_order_created_at(apps.get_model("airport_backend", "Order"))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('airport_backend', '0023_order_created_at'),
+    ]
+
+    operations = [
+        migrations.RunPython(stamp_legacy_orders, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='order',
+            name='created_at',
+            field=models.DateTimeField(default=django.utils.timezone.now, editable=False),
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 4.2.30 on 2026-10-18 18:46
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('airport_backend', '0024_order_created_at_not_null'),
+    ]
+
+    operations = [
+        migrations.AddConstraint(
+            model_name='ticket',
+            constraint=models.UniqueConstraint(fields=('flight', 'row', 'seat'), name='ticket_flight_row_seat_unique'),
+        ),
+        migrations.AlterUniqueTogether(
+            name='ticket',
+            unique_together=set(),
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 4.2.30 on 2026-10-18 18:49
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('airport_backend', '0025_ticket_flight_row_seat_unique'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='flight',
+            index=models.Index(fields=['route', 'arrival_time'], name='flight_route_arrival_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='route',
+            index=models.Index(fields=['destination'], name='route_destination_idx'),
+        ),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 4.2.30 on 2026-10-18 19:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('airport_backend', '0026_airport_board_indexes'),
+    ]
+
+    operations = [
+        migrations.AddConstraint(
+            model_name='flight',
+            constraint=models.UniqueConstraint(fields=('route', 'departure_time'), name='flight_route_departure_unique'),
+        ),
+        migrations.RemoveIndex(
+            model_name='flight',
+            name='flight_route_departure_idx',
+        ),
+        migrations.AlterField(
+            model_name='flight',
+            name='arrival_time',
+            field=models.DateTimeField(db_index=True),
+        ),
+        migrations.AlterField(
+            model_name='flight',
+            name='departure_time',
+            field=models.DateTimeField(db_index=True),
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 4.2.30 on 2026-10-18 19:48
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('airport_backend', '0027_flight_route_departure_unique'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='airplane',
+            name='thumbnail_sizes',
+            field=models.JSONField(blank=True, default=list, editable=False),
+        ),
+        migrations.AddField(
+            model_name='city',
+            name='thumbnail_sizes',
+            field=models.JSONField(blank=True, default=list, editable=False),
+        ),
+        migrations.AddField(
+            model_name='crew',
+            name='thumbnail_sizes',
+            field=models.JSONField(blank=True, default=list, editable=False),
+        ),
+    ]
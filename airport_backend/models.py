@@ -1,13 +1,19 @@
 from django.db import models
-from datetime import datetime
+from datetime import timedelta
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
 from airport_service import settings
 from airport_backend.utils import create_custom_path
 from django.core.exceptions import ValidationError
+from django.utils.timezone import now
 
 class Crew(models.Model):
     first_name = models.CharField(max_length=100)
     last_name = models.CharField(max_length=100)
     image = models.ImageField(null=True, upload_to=create_custom_path)
+    # Sizes of the thumbnails rendered for the current image.
+    thumbnail_sizes = models.JSONField(default=list,
+                                       blank=True,
+                                       editable=False)
 
     @property
     def full_name(self):
@@ -34,6 +40,10 @@ class Airplane(models.Model):
         related_name="airplane_type"
     )
     image = models.ImageField(null=True, upload_to=create_custom_path)
+    # Sizes of the thumbnails rendered for the current image.
+    thumbnail_sizes = models.JSONField(default=list,
+                                       blank=True,
+                                       editable=False)
 
     @property
     def total_seats(self):
@@ -60,6 +70,10 @@ class City(models.Model):
         related_name="city_country"
     )
     image = models.ImageField(null=True, upload_to=create_custom_path)
+    # Sizes of the thumbnails rendered for the current image.
+    thumbnail_sizes = models.JSONField(default=list,
+                                       blank=True,
+                                       editable=False)
 
     def __str__(self):
         return f"{self.name}, {self.country}"
@@ -73,6 +87,10 @@ class Airport(models.Model):
         related_name="airport_city",
         default="0"
     )
+    code = models.CharField(max_length=4,
+                            unique=True,
+                            null=True,
+                            blank=True)
 
     def __str__(self):
         return f"Airport: {self.name}, {self.closest_big_city.name}"
@@ -91,10 +109,65 @@ class Route(models.Model):
     )
     distance = models.IntegerField(blank=False, null=False)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=("source", "destination"),
+                         name="route_source_destination_idx"),
+            # Arrival boards look routes up by destination.
+            models.Index(fields=("destination",),
+                         name="route_destination_idx"),
+        ]
+
     def __str__(self):
         return f"{self.source} - {self.destination}"
 
 
+class FlightSchedule(models.Model):
+    route = models.ForeignKey(
+        Route,
+        on_delete=models.CASCADE,
+        related_name="schedules"
+    )
+    airplane = models.ForeignKey(
+        Airplane,
+        on_delete=models.CASCADE,
+        related_name="schedules"
+    )
+    crew = models.ManyToManyField(Crew, blank=True, related_name="schedules")
+    days_of_week = models.CharField(
+        max_length=7,
+        help_text="ISO weekdays the flight operates on, e.g. 135 for "
+                  "Monday, Wednesday and Friday"
+    )
+    departure_time = models.TimeField(help_text="Local departure time")
+    duration = models.DurationField()
+    timezone = models.CharField(max_length=64, default=settings.TIME_ZONE)
+    valid_from = models.DateField()
+    valid_until = models.DateField()
+
+    def operates_on(self, day):
+        return str(day.isoweekday()) in self.days_of_week
+
+    def clean(self):
+        errors = {}
+        if not self.days_of_week or set(self.days_of_week) - set("1234567"):
+            errors["days_of_week"] = "use ISO weekday digits 1-7, e.g. 135"
+        if self.valid_until < self.valid_from:
+            errors["valid_until"] = "must not be before valid_from"
+        if self.duration <= timedelta(0):
+            errors["duration"] = "must be positive"
+        try:
+            ZoneInfo(self.timezone)
+        except (ValueError, ZoneInfoNotFoundError):
+            errors["timezone"] = "unknown time zone"
+        if errors:
+            raise ValidationError(errors)
+
+    def __str__(self):
+        return (f"Schedule: {self.route}. Days: {self.days_of_week}. "
+                f"Departure: {self.departure_time} {self.timezone}")
+
+
 class Flight(models.Model):
     route = models.ForeignKey(
         Route,
@@ -106,9 +179,44 @@ class Flight(models.Model):
         on_delete=models.CASCADE,
         related_name="flight_airplane"
     )
+    schedule = models.ForeignKey(
+        FlightSchedule,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        editable=False,
+        related_name="flights"
+    )
     crew = models.ManyToManyField(Crew, blank=True, related_name="flights_orders")
-    departure_time = models.DateTimeField(unique=True)
-    arrival_time = models.DateTimeField(unique=True)
+    departure_time = models.DateTimeField(db_index=True)
+    arrival_time = models.DateTimeField(db_index=True)
+    seats_sold = models.PositiveIntegerField(default=0, editable=False)
+
+    class Meta:
+        constraints = [
+            # A flight is its route and departure; any number of flights of
+            # other routes may share the second.
+            models.UniqueConstraint(fields=("route", "departure_time"),
+                                    name="flight_route_departure_unique"),
+        ]
+        indexes = [
+            models.Index(fields=("route", "arrival_time"),
+                         name="flight_route_arrival_idx"),
+        ]
+
+    def save(self, *args, **kwargs):
+        # seats_sold is owned by the seat map writers, which update it under
+        # a row lock; a plain save of a stale instance must not overwrite it.
+        if not self._state.adding and kwargs.get("update_fields") is None:
+            kwargs["update_fields"] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key and field.name != "seats_sold"
+            ]
+        super().save(*args, **kwargs)
+
+    @property
+    def tickets_available(self):
+        return self.airplane.total_seats - self.seats_sold
 
     def __str__(self):
         return (f"Flight: {self.route}. Plane: {self.airplane}. "
@@ -116,17 +224,75 @@ class Flight(models.Model):
                 f"Departure time: {self.departure_time}. Arrival time: {self.arrival_time}")
 
 
+class FlightSeatMap(models.Model):
+    flight = models.OneToOneField(
+        Flight,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name="seat_map"
+    )
+    bitmap = models.BinaryField(default=b"")
+
+    def __str__(self):
+        return f"Seat map of flight {self.flight_id}"
+
+
+class SeatHold(models.Model):
+    flight = models.ForeignKey(
+        Flight,
+        on_delete=models.CASCADE,
+        related_name="seat_holds"
+    )
+    row = models.IntegerField()
+    seat = models.IntegerField()
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="seat_holds"
+    )
+    token = models.UUIDField(db_index=True)
+    expires_at = models.DateTimeField(db_index=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=("flight", "row", "seat"),
+                                    name="unique_seat_hold")
+        ]
+
+    def __str__(self):
+        return (f"Hold - Row: {self.row}. Seat: {self.seat}. "
+                f"Flight: {self.flight_id}. Until: {self.expires_at}")
+
+
+class RateCounter(models.Model):
+    """Fixed-window request counter of ``DatabaseRateStore``, one row per
+    throttle key. The table is UNLOGGED: losing it in a crash only resets
+    the limits."""
+    key = models.CharField(max_length=255, primary_key=True)
+    hits = models.PositiveIntegerField(default=0)
+    # Unix time the current window ends.
+    expires_at = models.BigIntegerField()
+
+    def __str__(self):
+        return f"{self.key}: {self.hits} until {self.expires_at}"
+
+
 class Order(models.Model):
     user = models.ForeignKey(
         settings.AUTH_USER_MODEL,
         on_delete=models.CASCADE,
         related_name = "order"
     )
+    created_at = models.DateTimeField(default=now, editable=False)
+
+    class Meta:
+        indexes = [
+            # Newest-first history of a user is a backward scan; id breaks
+            # ties for keyset pagination.
+            models.Index(fields=["user", "created_at", "id"],
+                         name="order_user_created_idx"),
+        ]
 
-    @property
-    def created_at(self):
-        return datetime.now()
-    
     def __str__(self):
         return f"Time: {self.created_at}"
 
@@ -147,7 +313,10 @@ class Ticket(models.Model):
     )
 
     class Meta:
-        unique_together = ("seat", "row")
+        constraints = [
+            models.UniqueConstraint(fields=["flight", "row", "seat"],
+                                    name="ticket_flight_row_seat_unique"),
+        ]
         ordering = ("row", "seat",)
 
     def __str__(self):
@@ -175,4 +344,19 @@ class Ticket(models.Model):
                              ValidationError)
         Ticket.validate_row(self.row,
                             self.flight.airplane.rows,
-                            ValidationError)
\ No newline at end of file
+                            ValidationError)
+
+class OrderSummary(models.Model):
+    """Order history read model: the order's tickets rendered with their
+    flights, so listing orders needs no joins to flights, routes, airplanes
+    or crews. Maintained by ``airport_backend.order_history``."""
+    order = models.OneToOneField(
+        Order,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name="summary"
+    )
+    tickets = models.JSONField(default=list)
+
+    def __str__(self):
+        return f"Summary of order {self.order_id}"
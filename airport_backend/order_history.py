@@ -0,0 +1,110 @@
+from django.db.models import F, Q
+
+from airport_backend.models import Flight, Order, OrderSummary, Ticket
+from airport_backend.serializers import FlightListSerializer
+
+
+# Seat inventory changes with every booking, so it is read live instead of
+# being stored in the summaries.
+LIVE_FLIGHT_FIELDS = ("tickets_available",)
+TICKET_FIELDS = ("id", "seat", "row")
+
+
+def build_summaries(order_ids):
+    """Render the tickets of ``order_ids`` the way ``TicketListSerializer``
+    does, without the live flight fields, as ``{order_id: tickets}``."""
+    tickets = list(
+        Ticket.objects
+        .filter(order_id__in=order_ids)
+        .order_by("order_id", "row", "seat", "id")
+        .values("order_id", "flight_id", *TICKET_FIELDS)
+    )
+    fields = {name: {} for name in FlightListSerializer.Meta.fields
+              if name not in LIVE_FLIGHT_FIELDS}
+    flights = {
+        flight["id"]: flight for flight in FlightListSerializer(
+            FlightListSerializer.project(
+                Flight.objects.filter(
+                    id__in={ticket["flight_id"] for ticket in tickets}
+                ),
+                fields
+            ),
+            many=True,
+            fields=fields
+        ).data
+    }
+    summaries = {order_id: [] for order_id in order_ids}
+    for ticket in tickets:
+        summaries[ticket["order_id"]].append({
+            **{name: ticket[name] for name in TICKET_FIELDS},
+            "flight": flights[ticket["flight_id"]],
+        })
+    return summaries
+
+
+def refresh_order_summaries(order_ids, chunk_size=1000):
+    """Rewrite the summaries of the orders in ``order_ids`` that still
+    exist."""
+    order_ids = sorted(set(order_ids))
+    for start in range(0, len(order_ids), chunk_size):
+        existing = list(Order.objects.filter(
+            id__in=order_ids[start:start + chunk_size]
+        ).values_list("id", flat=True))
+        if not existing:
+            continue
+        OrderSummary.objects.bulk_create(
+            [OrderSummary(order_id=order_id, tickets=tickets)
+             for order_id, tickets in build_summaries(existing).items()],
+            update_conflicts=True,
+            unique_fields=["order"],
+            update_fields=["tickets"]
+        )
+
+
+def write_order_summary(order):
+    """Store the summary of a newly created order."""
+    OrderSummary.objects.create(order=order,
+                                tickets=build_summaries([order.id])[order.id])
+
+
+def refresh_flight_summaries(flight_ids):
+    """Rewrite the summaries of every order with a ticket on ``flight_ids``
+    after the flights, or what they show, changed."""
+    order_ids = (
+        Ticket.objects
+        .filter(flight_id__in=list(flight_ids))
+        .order_by()
+        .values_list("order_id", flat=True)
+        .distinct()
+    )
+    refresh_order_summaries(order_ids.iterator(chunk_size=2000))
+
+
+def flights_of_airports(airport_ids):
+    return Flight.objects.filter(
+        Q(route__source_id__in=airport_ids)
+        | Q(route__destination_id__in=airport_ids)
+    ).values_list("id", flat=True)
+
+
+def with_history(queryset):
+    """Annotate orders with their summary, which
+    ``TicketHistoryListSerializer`` renders instead of loading the tickets.
+    Orders without a summary (``history`` is ``None``) fall back to their
+    tickets until the signal or ``rebuild_order_summaries`` writes it."""
+    return queryset.annotate(history=F("summary__tickets"))
+
+
+def attach_tickets_left(orders):
+    """Read the seats left on every flight in the summaries of ``orders``
+    in one query, and attach them as ``history_tickets_left``."""
+    flight_ids = {ticket["flight"]["id"] for order in orders
+                  for ticket in getattr(order, "history", None) or ()}
+    left = dict(
+        Flight.objects
+        .filter(id__in=flight_ids)
+        .values_list("id", F("airplane__rows") * F("airplane__seats_in_row")
+                     - F("seats_sold"))
+    ) if flight_ids else {}
+    for order in orders:
+        order.history_tickets_left = left
@@ -1,4 +1,15 @@
-from rest_framework.pagination import PageNumberPagination
+import json
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from collections import OrderedDict
+from operator import attrgetter
+
+from django.core.exceptions import ValidationError
+from django.db import connections
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
 
 
 class SmallClassesPagination(PageNumberPagination):
@@ -7,9 +18,229 @@ class SmallClassesPagination(PageNumberPagination):
     max_page_size = 100
 
 
-class HugeClassesPagination(PageNumberPagination):
-    page_size = 2
+class KeysetPagination(BasePagination):
+    """Cursor pagination that seeks on the ``ordering`` columns.
+
+    Unlike page numbers it never runs ``COUNT(*)`` or ``OFFSET``: every page
+    is ``WHERE (ordering) > (last row) ORDER BY ordering LIMIT page_size``,
+    so it costs the same at any depth as long as ``ordering`` is indexed and
+    ends with a unique column; ``-field`` orders a column descending.
+    ``?with_total=true`` adds the planner's row estimate as an approximate
+    ``count``.
+    """
+    ordering = ("id",)
+    page_size = 10
     page_size_query_param = "page_size"
+    max_page_size = 100
+    cursor_query_param = "cursor"
+    total_query_param = "with_total"
+    invalid_cursor_message = "Invalid cursor"
+
+    def paginate_queryset(self, queryset, request, view=None):
+        page = self.page_queryset(queryset, request)
+        if self.with_total:
+            self.count = self.estimate_count(queryset)
+        return self.set_page(list(page))
+
+    def page_queryset(self, queryset, request):
+        """Return the rows of the requested page, plus one to tell whether
+        there is another; the caller evaluates it and hands the rows (model
+        instances or dicts) to ``set_page``."""
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        self.page_size = self.get_page_size(request)
+        self.count = None
+        self.with_total = (
+            request.query_params.get(self.total_query_param) in ("1", "true")
+        )
+        self.position, self.reverse = self.decode_cursor(request,
+                                                         queryset.model)
+        queryset = queryset.order_by(
+            *[self._flip(field) if self.reverse else field
+              for field in self.ordering]
+        )
+        if self.position is not None:
+            queryset = queryset.filter(self.seek(self.position, self.reverse))
+        return queryset[:self.page_size + 1]
+
+    def set_page(self, results):
+        has_more = len(results) > self.page_size
+        results = results[:self.page_size]
+        if self.reverse:
+            results.reverse()
+            self.has_next = self.position is not None
+            self.has_previous = has_more
+        else:
+            self.has_next = has_more
+            self.has_previous = self.position is not None
+        self.page = results
+        return results
+
+    def get_page_size(self, request):
+        try:
+            page_size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        if page_size <= 0:
+            return self.page_size
+        return min(page_size, self.max_page_size)
+
+    @staticmethod
+    def _flip(field):
+        return field[1:] if field.startswith("-") else f"-{field}"
+
+    def seek(self, position, reverse):
+        names = [field.lstrip("-") for field in self.ordering]
+        condition = Q()
+        for index, field in enumerate(self.ordering):
+            descending = field.startswith("-")
+            lookup = "lt" if reverse != descending else "gt"
+            step = Q(**{f"{names[index]}__{lookup}": position[index]})
+            for previous, value in zip(names[:index], position):
+                step &= Q(**{previous: value})
+            condition |= step
+        return condition
+
+    def position_of(self, instance):
+        position = []
+        for field in (field.lstrip("-") for field in self.ordering):
+            if isinstance(instance, dict):
+                value = instance[field]
+            else:
+                value = attrgetter(field.replace("__", "."))(instance)
+            position.append(value.isoformat() if hasattr(value, "isoformat")
+                            else value)
+        return position
+
+    @staticmethod
+    def _model_field(model, path):
+        *relations, name = path.split("__")
+        for relation in relations:
+            model = model._meta.get_field(relation).related_model
+        return model._meta.get_field(name)
+
+    def decode_cursor(self, request, model):
+        """The position and direction of ``?cursor=``, each position value
+        converted by its ordering field: a cursor is client input, so a
+        value of the wrong type is an invalid cursor, not a server error."""
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None, False
+        try:
+            cursor = json.loads(urlsafe_b64decode(encoded.encode("ascii")))
+            position, reverse = cursor["p"], bool(cursor["r"])
+        except (TypeError, ValueError, KeyError, UnicodeEncodeError):
+            raise NotFound(self.invalid_cursor_message)
+        if not isinstance(position, list) or len(position) != len(self.ordering):
+            raise NotFound(self.invalid_cursor_message)
+        try:
+            position = [
+                self._model_field(model, field.lstrip("-")).to_python(value)
+                for field, value in zip(self.ordering, position)
+            ]
+        except (TypeError, ValueError, ValidationError):
+            raise NotFound(self.invalid_cursor_message)
+        if None in position:
+            raise NotFound(self.invalid_cursor_message)
+        return position, reverse
+
+    def encode_cursor(self, position, reverse):
+        cursor = json.dumps({"p": position, "r": int(reverse)},
+                            separators=(",", ":"))
+        encoded = urlsafe_b64encode(cursor.encode("ascii")).decode("ascii")
+        return replace_query_param(self.base_url,
+                                   self.cursor_query_param,
+                                   encoded)
+
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+        return self.encode_cursor(self.position_of(self.page[-1]), False)
+
+    def get_previous_link(self):
+        if not self.has_previous:
+            return None
+        if not self.page:
+            return remove_query_param(self.base_url, self.cursor_query_param)
+        return self.encode_cursor(self.position_of(self.page[0]), True)
+
+    @staticmethod
+    def plan_rows(plan):
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        return int(plan[0]["Plan"]["Plan Rows"])
+
+    @classmethod
+    def estimate_count(cls, queryset):
+        connection = connections[queryset.db]
+        if connection.vendor != "postgresql":
+            return queryset.count()
+        return cls.plan_rows(queryset.order_by().explain(format="json"))
+
+    def get_paginated_data(self, data):
+        response = OrderedDict([
+            ("next", self.get_next_link()),
+            ("previous", self.get_previous_link()),
+        ])
+        if self.count is not None:
+            response["count"] = self.count
+        response["results"] = data
+        return response
+
+    def get_paginated_response(self, data):
+        return Response(self.get_paginated_data(data))
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            "type": "object",
+            "required": ["results"],
+            "properties": {
+                "next": {"type": "string", "nullable": True, "format": "uri"},
+                "previous": {"type": "string", "nullable": True, "format": "uri"},
+                "count": {
+                    "type": "integer",
+                    "description": (f"Approximate total, only with "
+                                    f"?{self.total_query_param}=true"),
+                },
+                "results": schema,
+            },
+        }
+
+    def get_schema_operation_parameters(self, view):
+        return [
+            {
+                "name": self.cursor_query_param,
+                "required": False,
+                "in": "query",
+                "description": "The pagination cursor value.",
+                "schema": {"type": "string"},
+            },
+            {
+                "name": self.page_size_query_param,
+                "required": False,
+                "in": "query",
+                "description": "Number of results to return per page.",
+                "schema": {"type": "integer"},
+            },
+            {
+                "name": self.total_query_param,
+                "required": False,
+                "in": "query",
+                "description": "Include an approximate total count.",
+                "schema": {"type": "boolean"},
+            },
+        ]
+
+
+class FlightKeysetPagination(KeysetPagination):
+    ordering = ("departure_time", "id")
+    page_size = 2
     max_page_size = 10
 
 
+class IdKeysetPagination(KeysetPagination):
+    ordering = ("id",)
+
+
+class NewestFirstKeysetPagination(KeysetPagination):
+    ordering = ("-created_at", "-id")
@@ -0,0 +1,127 @@
+import threading
+import time
+
+from django.core.exceptions import ImproperlyConfigured
+from django.db.backends.base.base import NO_DB_ALIAS
+from django.db.backends.postgresql import base
+from psycopg import IsolationLevel
+from psycopg_pool import ConnectionPool
+
+from airport_backend.pooled_postgresql.creation import DatabaseCreation
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    """PostgreSQL backend taking its connections from a psycopg
+    ``ConnectionPool``, one per alias and worker process.
+
+    ``OPTIONS["pool"]`` holds the ``ConnectionPool`` arguments (``min_size``,
+    ``max_size``, ``timeout``, ``max_idle``...). With ``CONN_HEALTH_CHECKS``
+    the pool pings a connection before handing it out. Closing the Django
+    connection, which happens at the end of every request, returns it to the
+    pool instead of disconnecting.
+    """
+    creation_class = DatabaseCreation
+    _connection_pools = {}
+    _checkouts = {}
+    _checkouts_lock = threading.Lock()
+
+    @property
+    def pool(self):
+        options = self.settings_dict["OPTIONS"].get("pool")
+        if self.alias == NO_DB_ALIAS or not options:
+            return None
+        if self.alias not in self._connection_pools:
+            if self.settings_dict["CONN_MAX_AGE"]:
+                raise ImproperlyConfigured(
+                    "A pooled database needs CONN_MAX_AGE = 0."
+                )
+            options = dict(options)
+            options["min_size"] = min(options.get("min_size", 1),
+                                      options.get("max_size") or 1)
+            check = (ConnectionPool.check_connection
+                     if self.settings_dict["CONN_HEALTH_CHECKS"] else None)
+            pool = ConnectionPool(
+                kwargs={**self.get_connection_params(), "autocommit": True},
+                open=False,
+                check=check,
+                name=self.alias,
+                **options
+            )
+            # Threads racing here each build a pool; the first one wins and
+            # the others were never opened.
+            self._connection_pools.setdefault(self.alias, pool)
+        return self._connection_pools[self.alias]
+
+    def get_connection_params(self):
+        params = super().get_connection_params()
+        params.pop("pool", None)
+        return params
+
+    def get_new_connection(self, conn_params):
+        pool = self.pool
+        if pool is None:
+            return super().get_new_connection(conn_params)
+        isolation_level = self.settings_dict["OPTIONS"].get("isolation_level")
+        try:
+            self.isolation_level = IsolationLevel(
+                isolation_level if isolation_level is not None
+                else IsolationLevel.READ_COMMITTED
+            )
+        except ValueError:
+            raise ImproperlyConfigured(
+                f"Invalid transaction isolation level {isolation_level} "
+                f"specified. Use one of the psycopg.IsolationLevel values."
+            )
+        pool.open()
+        started = time.perf_counter()
+        connection = pool.getconn()
+        self._record_checkout((time.perf_counter() - started) * 1000)
+        if isolation_level is not None:
+            connection.isolation_level = self.isolation_level
+        return connection
+
+    def _record_checkout(self, elapsed_ms):
+        with self._checkouts_lock:
+            count, total, longest = self._checkouts.get(self.alias, (0, 0.0, 0.0))
+            self._checkouts[self.alias] = (count + 1,
+                                           total + elapsed_ms,
+                                           max(longest, elapsed_ms))
+
+    def _close(self):
+        pool = self.pool
+        if self.connection is None or pool is None:
+            return super()._close()
+        with self.wrap_database_errors:
+            pool.putconn(self.connection)
+        self.connection = None
+
+    def close_pool(self):
+        pool = self._connection_pools.pop(self.alias, None)
+        if pool is not None:
+            pool.close()
+
+    def pool_stats(self):
+        """Connections in use, idle and waited for, and how long getting one
+        took, for this worker's pool."""
+        pool = self.pool
+        if pool is None:
+            return None
+        stats = pool.get_stats()
+        with self._checkouts_lock:
+            count, total, longest = self._checkouts.get(self.alias, (0, 0.0, 0.0))
+        size = stats.get("pool_size", 0)
+        available = stats.get("pool_available", 0)
+        return {
+            "min_size": pool.min_size,
+            "max_size": pool.max_size,
+            "size": size,
+            "in_use": size - available,
+            "idle": available,
+            "waiting": stats.get("requests_waiting", 0),
+            "checkouts": count,
+            "checkout_ms_avg": round(total / count, 3) if count else 0.0,
+            "checkout_ms_max": round(longest, 3),
+            "timeouts": stats.get("requests_errors", 0),
+            "connections_lost": stats.get("connections_lost", 0),
+            "bad_returns": stats.get("returns_bad", 0),
+        }
@@ -0,0 +1,19 @@
+from django.db.backends.postgresql import creation
+
+
+class DatabaseCreation(creation.DatabaseCreation):
+    """Closes the pool around creating and destroying the test database: it
+    holds connections to the database it was opened on, which would keep
+    pointing at the real database and block ``DROP DATABASE``."""
+
+    def _close_pool(self):
+        self.connection.close()
+        self.connection.close_pool()
+
+    def create_test_db(self, *args, **kwargs):
+        self._close_pool()
+        return super().create_test_db(*args, **kwargs)
+
+    def destroy_test_db(self, *args, **kwargs):
+        self._close_pool()
+        return super().destroy_test_db(*args, **kwargs)
@@ -0,0 +1,151 @@
+import logging
+import random
+import time
+from collections import namedtuple
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+
+
+logger = logging.getLogger(__name__)
+
+# The counter of the request being measured. Context variables follow the
+# request into sync_to_async threads, so one counter sees every query
+# whichever thread or connection runs it.
+query_counter = ContextVar("query_counter", default=None)
+
+Budget = namedtuple("Budget", ("queries", "db_ms"), defaults=(None,))
+
+
+class QueryBudgetExceeded(Exception):
+    pass
+
+
+class QueryCounter:
+    """``execute_wrapper`` counting queries and the time spent running them."""
+
+    def __init__(self):
+        self.queries = 0
+        self.duration = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries += 1
+            self.duration += time.perf_counter() - started
+
+    @property
+    def db_ms(self):
+        return self.duration * 1000
+
+
+def count_queries(execute, sql, params, many, context):
+    counter = query_counter.get()
+    if counter is None:
+        return execute(sql, params, many, context)
+    return counter(execute, sql, params, many, context)
+
+
+@receiver(connection_created)
+def install_query_counter(sender, connection, **kwargs):
+    if count_queries not in connection.execute_wrappers:
+        connection.execute_wrappers.append(count_queries)
+
+
+def view_budget(request):
+    """Return ``(name, budget)`` of the view that handled ``request``.
+
+    Viewsets declare ``query_budgets`` keyed by action; plain API views and
+    function views key them by lowercase HTTP method. Views without one get
+    the default budget.
+    """
+    default = Budget(**settings.QUERY_BUDGETS["DEFAULT"])
+    match = getattr(request, "resolver_match", None)
+    view = getattr(match, "func", None)
+    view_class = getattr(view, "cls", None) or getattr(view, "view_class", None)
+    method = request.method.lower()
+    if view_class is None:
+        budgets = getattr(view, "query_budgets", None) or {}
+        return (getattr(match, "view_name", request.path),
+                budgets.get(method, default))
+    action = (getattr(view, "actions", None) or {}).get(method, method)
+    budgets = getattr(view_class, "query_budgets", None) or {}
+    return f"{view_class.__name__}.{action}", budgets.get(action, default)
+
+
+class QueryBudgetMiddleware:
+    """Count the queries and database time of every sampled request and
+    compare them with the budget of the view that served it.
+
+    Queries are counted by an execute wrapper installed on every database
+    connection, so it does not need ``DEBUG``; queries of async views are
+    counted by ``async_db.fetch``. Over-budget requests are logged; with ``RAISE``
+    (meant for the test suite) exceeding the query count raises instead,
+    while DB time is only logged because it depends on the machine.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    @staticmethod
+    def sampled(config):
+        return config["ENABLED"] and random.random() < config["SAMPLE_RATE"]
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        config = settings.QUERY_BUDGETS
+        if not self.sampled(config):
+            return self.get_response(request)
+        counter = QueryCounter()
+        token = query_counter.set(counter)
+        try:
+            response = self.get_response(request)
+        finally:
+            query_counter.reset(token)
+        return self.finish(request, response, counter, config)
+
+    async def __acall__(self, request):
+        config = settings.QUERY_BUDGETS
+        if not self.sampled(config):
+            return await self.get_response(request)
+        counter = QueryCounter()
+        token = query_counter.set(counter)
+        try:
+            response = await self.get_response(request)
+        finally:
+            query_counter.reset(token)
+        return self.finish(request, response, counter, config)
+
+    def finish(self, request, response, counter, config):
+        self.check(request, counter, config)
+        if config["SERVER_TIMING"]:
+            response["Server-Timing"] = (
+                f'db;dur={counter.db_ms:.1f};desc="{counter.queries} queries"'
+            )
+        return response
+
+    @staticmethod
+    def check(request, counter, config):
+        name, budget = view_budget(request)
+        over_queries = counter.queries > budget.queries
+        over_time = budget.db_ms is not None and counter.db_ms > budget.db_ms
+        if not (over_queries or over_time):
+            logger.debug("%s: %d queries, %.1f ms",
+                         name, counter.queries, counter.db_ms)
+            return
+        message = (f"{name} over budget: {counter.queries} queries "
+                   f"(budget {budget.queries}), {counter.db_ms:.1f} ms "
+                   f"(budget {budget.db_ms} ms)")
+        if over_queries and config["RAISE"]:
+            raise QueryBudgetExceeded(message)
+        logger.warning(message)
@@ -0,0 +1,78 @@
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.cache import parse_etags
+from rest_framework import status
+from rest_framework.response import Response
+
+
+def _version_key(model):
+    return f"model-version:{model._meta.label_lower}"
+
+
+def _fresh_version():
+    # Versions restart from the clock, so an evicted counter never brings
+    # back a version that old cached responses were stored under.
+    return time.time_ns()
+
+
+def model_versions(models):
+    keys = [_version_key(model) for model in models]
+    versions = cache.get_many(keys)
+    for key in keys:
+        if key not in versions:
+            cache.add(key, _fresh_version(), timeout=None)
+            versions[key] = cache.get(key)
+    return [versions[key] for key in keys]
+
+
+def bump_model_version(sender, **kwargs):
+    key = _version_key(sender)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, _fresh_version(), timeout=None)
+
+
+class VersionedCacheMixin:
+    """Caches list/retrieve payloads under the versions of ``cache_models``.
+
+    Any save or delete of one of those models bumps its version (see
+    ``signals.py``), which retires every cached payload built from it. The
+    cache key doubles as the ``ETag``, so ``If-None-Match`` is answered with
+    304 from the version lookup alone. Versions and payloads live in the
+    default cache, which ``checks.py`` requires to be shared when several
+    workers serve the app.
+    """
+    cache_models = ()
+
+    def _cache_key(self, request):
+        versions = model_versions(self.cache_models)
+        raw = (f"{self.basename}:{self.action}:{versions}:"
+               f"{request.get_host()}{request.get_full_path()}")
+        return hashlib.md5(raw.encode()).hexdigest()
+
+    def _cached_response(self, handler, request, *args, **kwargs):
+        key = self._cache_key(request)
+        etag = f'"{key}"'
+        if etag in parse_etags(request.headers.get("If-None-Match", "")):
+            return Response(status=status.HTTP_304_NOT_MODIFIED,
+                            headers={"ETag": etag})
+        data = cache.get(f"response:{key}")
+        if data is None:
+            response = handler(request, *args, **kwargs)
+            if response.status_code != status.HTTP_200_OK:
+                return response
+            data = response.data
+            cache.set(f"response:{key}", data,
+                      timeout=settings.REFERENCE_CACHE_TIMEOUT)
+        return Response(data, headers={"ETag": etag})
+
+    def list(self, request, *args, **kwargs):
+        return self._cached_response(super().list, request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self._cached_response(super().retrieve,
+                                     request, *args, **kwargs)
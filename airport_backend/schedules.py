@@ -0,0 +1,139 @@
+from collections import namedtuple
+from datetime import datetime, timedelta
+from functools import partial
+from zoneinfo import ZoneInfo
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.utils import timezone
+
+from airport_backend.connections import connection_index
+from airport_backend.models import Flight, FlightSchedule
+
+
+Materialized = namedtuple("Materialized", ("created", "existing", "conflicts"))
+
+
+def scheduled_departures(schedule, start, end):
+    """Yield ``(departure, arrival)`` of ``schedule`` for local dates in
+    ``[start, end)``."""
+    zone = ZoneInfo(schedule.timezone)
+    day = max(start, schedule.valid_from)
+    end = min(end, schedule.valid_until + timedelta(days=1))
+    while day < end:
+        if schedule.operates_on(day):
+            departure = datetime.combine(day, schedule.departure_time, zone)
+            yield departure, departure + schedule.duration
+        day += timedelta(days=1)
+
+
+def insert_flights(flights):
+    """Insert unsaved ``flights`` whose route does not depart at that time
+    yet and return the saved ones. A single ``INSERT ... ON CONFLICT DO
+    NOTHING`` on the (route, departure_time) constraint, so concurrent runs
+    skip each other's flights instead of failing."""
+    if not flights:
+        return []
+    meta = Flight._meta
+    quote = connection.ops.quote_name
+    names = ("route", "departure_time", "airplane", "schedule",
+             "arrival_time", "seats_sold")
+    columns = [meta.get_field(name).column for name in names]
+    values = ", ".join([f"({', '.join(['%s'] * len(columns))})"] * len(flights))
+    params = []
+    for flight in flights:
+        params += [flight.route_id, flight.departure_time, flight.airplane_id,
+                   flight.schedule_id, flight.arrival_time, flight.seats_sold]
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"INSERT INTO {quote(meta.db_table)} "
+            f"({', '.join(map(quote, columns))}) VALUES {values} "
+            f"ON CONFLICT ({', '.join(map(quote, columns[:2]))}) DO NOTHING "
+            f"RETURNING {quote(meta.pk.column)}, "
+            f"{', '.join(map(quote, columns[:2]))}",
+            params
+        )
+        inserted = {(route_id, departure): pk
+                    for pk, route_id, departure in cursor.fetchall()}
+    saved = []
+    for flight in flights:
+        pk = inserted.get((flight.route_id, flight.departure_time))
+        if pk is not None:
+            flight.pk = pk
+            flight._state.adding = False
+            flight._state.db = connection.alias
+            saved.append(flight)
+    return saved
+
+
+def materialize_schedules(days=None, start=None, schedules=None):
+    """Create the flights (and crew rows) of every schedule departing within
+    the next ``days`` days.
+
+    Flights a schedule already produced are left untouched, so running this
+    daily keeps a rolling horizon filled. A route departs at most once at a
+    given time; departures its route already has from another schedule or
+    flight are counted as conflicts and skipped. Flights a concurrent run
+    inserted first are counted as existing.
+    """
+    days = settings.FLIGHT_SCHEDULES["HORIZON_DAYS"] if days is None else days
+    start = start or timezone.localdate()
+    end = start + timedelta(days=days)
+    if schedules is None:
+        schedules = FlightSchedule.objects.all()
+    schedules = list(
+        schedules
+        .filter(valid_from__lt=end, valid_until__gte=start)
+        .prefetch_related("crew")
+    )
+    candidates = [
+        (schedule, departure, arrival)
+        for schedule in schedules
+        for departure, arrival in scheduled_departures(schedule, start, end)
+    ]
+    if not candidates:
+        return Materialized(0, 0, 0)
+
+    taken = {}
+    for route_id, departure, schedule_id in Flight.objects.filter(
+        route_id__in={schedule.route_id for schedule in schedules},
+        departure_time__range=(
+            min(departure for _, departure, _ in candidates),
+            max(departure for _, departure, _ in candidates)
+        ),
+    ).values_list("route_id", "departure_time", "schedule_id"):
+        taken[(route_id, departure)] = schedule_id
+
+    flights = []
+    skipped = conflicts = 0
+    for schedule, departure, arrival in candidates:
+        slot = (schedule.route_id, departure)
+        if slot not in taken:
+            taken[slot] = schedule.id
+            flights.append(Flight(route_id=schedule.route_id,
+                                  airplane_id=schedule.airplane_id,
+                                  schedule=schedule,
+                                  departure_time=departure,
+                                  arrival_time=arrival))
+        elif taken[slot] == schedule.id:
+            skipped += 1
+        else:
+            conflicts += 1
+
+    batch_size = settings.FLIGHT_SCHEDULES["BATCH_SIZE"]
+    crew = Flight.crew.through
+    created = []
+    with transaction.atomic():
+        for position in range(0, len(flights), batch_size):
+            created += insert_flights(flights[position:position + batch_size])
+        crew.objects.bulk_create(
+            [crew(flight_id=flight.id, crew_id=member.id)
+             for flight in created
+             for member in flight.schedule.crew.all()],
+            batch_size=batch_size
+        )
+        if created and connection_index.loaded:
+            transaction.on_commit(partial(connection_index.refresh,
+                                          [flight.id for flight in created]))
+    skipped += len(flights) - len(created)
+    return Materialized(len(created), skipped, conflicts)
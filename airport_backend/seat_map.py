@@ -0,0 +1,243 @@
+from django.db import connection, transaction
+from airport_backend.models import Airplane, Flight, FlightSeatMap, Ticket
+
+
+class SeatBitmap:
+    """Bit-packed rows x seats_in_row occupancy map of a flight.
+
+    Seats are stored row-major, one bit per seat, least significant bit
+    first inside every byte (the same layout Postgres ``get_bit`` uses).
+    """
+
+    def __init__(self, rows, seats_in_row, data=None):
+        self.rows = rows
+        self.seats_in_row = seats_in_row
+        if data is None:
+            data = bytes(self.size_for(rows, seats_in_row))
+        self.data = bytearray(data)
+
+    @staticmethod
+    def size_for(rows, seats_in_row):
+        return (rows * seats_in_row + 7) // 8
+
+    @classmethod
+    def from_seats(cls, rows, seats_in_row, seats):
+        bitmap = cls(rows, seats_in_row)
+        for row, seat in seats:
+            if bitmap.contains(row, seat):
+                bitmap.take(row, seat)
+        return bitmap
+
+    def contains(self, row, seat):
+        return 1 <= row <= self.rows and 1 <= seat <= self.seats_in_row
+
+    def _position(self, row, seat):
+        if not self.contains(row, seat):
+            raise ValueError(f"Seat {row}/{seat} is outside of "
+                             f"{self.rows}x{self.seats_in_row} cabin")
+        index = (row - 1) * self.seats_in_row + (seat - 1)
+        return index >> 3, 1 << (index & 7)
+
+    def is_taken(self, row, seat):
+        byte, mask = self._position(row, seat)
+        return bool(self.data[byte] & mask)
+
+    def take(self, row, seat):
+        byte, mask = self._position(row, seat)
+        self.data[byte] |= mask
+
+    def release(self, row, seat):
+        byte, mask = self._position(row, seat)
+        self.data[byte] &= ~mask
+
+    def count(self):
+        return int.from_bytes(self.data, "little").bit_count()
+
+    def taken_seats(self):
+        seats = []
+        for byte, value in enumerate(self.data):
+            if not value:
+                continue
+            for bit in range(8):
+                if value & (1 << bit):
+                    index = byte * 8 + bit
+                    seats.append((index // self.seats_in_row + 1,
+                                  index % self.seats_in_row + 1))
+        return seats
+
+    def grid(self):
+        return [
+            [int(self.is_taken(row, seat))
+             for seat in range(1, self.seats_in_row + 1)]
+            for row in range(1, self.rows + 1)
+        ]
+
+
+def _build_bitmap(flight, data):
+    airplane = flight.airplane
+    if data is not None and len(data) == SeatBitmap.size_for(
+            airplane.rows, airplane.seats_in_row):
+        return SeatBitmap(airplane.rows, airplane.seats_in_row, data)
+    return SeatBitmap.from_seats(
+        airplane.rows,
+        airplane.seats_in_row,
+        Ticket.objects.filter(flight=flight).values_list("row", "seat")
+    )
+
+
+def load_bitmap(flight):
+    """Return the flight's bitmap, rebuilding it from tickets if the stored
+    one is missing or no longer matches the airplane layout."""
+    try:
+        data = flight.seat_map.bitmap
+    except FlightSeatMap.DoesNotExist:
+        data = None
+    return _build_bitmap(flight, data)
+
+
+def _lock_flight(flight_id):
+    # The flight row is the lock every writer of its seat map queues on;
+    # the map itself is read afterwards so it reflects committed writes.
+    return (
+        Flight.objects
+        .select_for_update(of=("self",))
+        .select_related("airplane")
+        .filter(pk=flight_id)
+        .first()
+    )
+
+
+def _save_bitmap(flight_id, bitmap, exists):
+    if exists:
+        FlightSeatMap.objects.filter(flight_id=flight_id).update(
+            bitmap=bytes(bitmap.data)
+        )
+    else:
+        FlightSeatMap.objects.create(flight_id=flight_id,
+                                     bitmap=bytes(bitmap.data))
+    Flight.objects.filter(pk=flight_id).update(seats_sold=bitmap.count())
+
+
+def _update_seats(flight_id, seats, taken):
+    with transaction.atomic(savepoint=False):
+        flight = _lock_flight(flight_id)
+        if flight is None:
+            return
+        stored = FlightSeatMap.objects.filter(flight_id=flight_id).first()
+        if stored is None and not taken:
+            # A missing map is rebuilt from tickets on demand, and the flight
+            # may be in the middle of a cascade delete, so only recount.
+            Flight.objects.filter(pk=flight_id).update(
+                seats_sold=Ticket.objects.filter(flight_id=flight_id).count()
+            )
+            return
+        bitmap = _build_bitmap(flight, stored.bitmap if stored else None)
+        for row, seat in seats:
+            if not bitmap.contains(row, seat):
+                continue
+            if taken:
+                bitmap.take(row, seat)
+            else:
+                bitmap.release(row, seat)
+        _save_bitmap(flight_id, bitmap, exists=stored is not None)
+
+
+def occupy_seats(flight_id, seats):
+    _update_seats(flight_id, seats, taken=True)
+
+
+def release_seats(flight_id, seats):
+    _update_seats(flight_id, seats, taken=False)
+
+
+def insert_tickets(tickets):
+    """Insert unsaved ``tickets`` whose seats are still free and return the
+    saved ones; the others lost their seat to an existing ticket. A single
+    ``INSERT ... ON CONFLICT DO NOTHING`` on the (flight, row, seat) unique
+    index, so nothing has to be read or locked first."""
+    if not tickets:
+        return []
+    meta = Ticket._meta
+    quote = connection.ops.quote_name
+    columns = [meta.get_field(name).column
+               for name in ("flight", "row", "seat", "order")]
+    values = ", ".join(["(%s, %s, %s, %s)"] * len(tickets))
+    params = []
+    # Concurrent orders claim shared seats in the same order, so they wait
+    # on each other instead of deadlocking.
+    for ticket in sorted(tickets, key=lambda t: (t.flight_id, t.row, t.seat)):
+        params += [ticket.flight_id, ticket.row, ticket.seat, ticket.order_id]
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"INSERT INTO {quote(meta.db_table)} "
+            f"({', '.join(map(quote, columns))}) VALUES {values} "
+            f"ON CONFLICT ({', '.join(map(quote, columns[:3]))}) DO NOTHING "
+            f"RETURNING {quote(meta.pk.column)}, "
+            f"{', '.join(map(quote, columns[:3]))}",
+            params
+        )
+        inserted = {(flight_id, row, seat): pk
+                    for pk, flight_id, row, seat in cursor.fetchall()}
+    saved = []
+    for ticket in tickets:
+        pk = inserted.get((ticket.flight_id, ticket.row, ticket.seat))
+        if pk is not None:
+            ticket.pk = pk
+            ticket._state.adding = False
+            ticket._state.db = connection.alias
+            saved.append(ticket)
+    return saved
+
+
+def occupy_booked_seats(flight_id, seats):
+    """Mark seats of tickets just inserted for ``flight_id`` as taken.
+
+    The ticket unique index already decided who owns the seats, so instead
+    of locking the flight and rewriting its map this sets the bits in place
+    and adds them to ``seats_sold`` in one statement; concurrent bookings of
+    the flight only wait on each other for the row updates until commit.
+    Falls back to ``occupy_seats`` when the stored map is missing or has the
+    wrong size.
+    """
+    seat_map_table = connection.ops.quote_name(FlightSeatMap._meta.db_table)
+    flight_table = connection.ops.quote_name(Flight._meta.db_table)
+    airplane_table = connection.ops.quote_name(Airplane._meta.db_table)
+    bitmap = "bitmap"
+    params = []
+    for row, seat in seats:
+        bitmap = (f"set_bit({bitmap}, "
+                  f"(%s - 1) * layout.seats_in_row + %s - 1, 1)")
+        params += [row, seat]
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"WITH layout AS ("
+            f"SELECT airplane.rows, airplane.seats_in_row "
+            f"FROM {flight_table} flight "
+            f"JOIN {airplane_table} airplane "
+            f"ON airplane.id = flight.airplane_id WHERE flight.id = %s"
+            f"), seat_map AS ("
+            f"UPDATE {seat_map_table} SET bitmap = {bitmap} FROM layout "
+            f"WHERE flight_id = %s AND octet_length(bitmap) = "
+            f"(layout.rows * layout.seats_in_row + 7) / 8 "
+            f"RETURNING 1"
+            f") UPDATE {flight_table} SET seats_sold = seats_sold + %s "
+            f"WHERE id = %s RETURNING (SELECT count(*) FROM seat_map)",
+            [flight_id, *params, flight_id, len(seats), flight_id]
+        )
+        updated = cursor.fetchone()
+    if updated is not None and not updated[0]:
+        occupy_seats(flight_id, seats)
+
+
+def rebuild_seat_map(flight_id):
+    """Recompute a flight's seat map and seats_sold from its tickets."""
+    with transaction.atomic():
+        flight = _lock_flight(flight_id)
+        if flight is None:
+            return
+        bitmap = _build_bitmap(flight, None)
+        _save_bitmap(
+            flight_id,
+            bitmap,
+            exists=FlightSeatMap.objects.filter(flight_id=flight_id).exists()
+        )
@@ -5,12 +5,30 @@ from airport_backend.models import (Crew,
                     Airport,
                     Route,
                     Flight,
+                    FlightSchedule,
                     Order,
                     Ticket,
                     Country,
                     City)
+from airport_backend.fieldsets import SparseFieldsetsMixin
+from airport_backend.seat_map import (insert_tickets,
+                                      load_bitmap,
+                                      occupy_booked_seats)
+from airport_backend.holds import get_hold_store, hold_ttl, SeatsUnavailable
+from airport_backend.thumbnails import thumbnail_urls
 from user.serializers import UserSerializer
-from django.db import transaction
+from django.db import transaction, IntegrityError
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.contrib.postgres.expressions import ArraySubquery
+from django.db.models import F, OuterRef, Value
+from django.db.models.functions import Concat
+from collections import Counter, defaultdict
+import zoneinfo
+from datetime import datetime, time, timedelta
+from django.utils import timezone
+from functools import partial
+from drf_spectacular.types import OpenApiTypes
+from drf_spectacular.utils import extend_schema_field
 
 
 class CrewSerializer(serializers.ModelSerializer):
@@ -20,10 +38,24 @@ class CrewSerializer(serializers.ModelSerializer):
         read_only_fields=("id", "image")
 
 
+@extend_schema_field(OpenApiTypes.OBJECT)
+class ThumbnailsField(serializers.ReadOnlyField):
+    """URLs of the image renditions, keyed by size and then format."""
+
+    def __init__(self, **kwargs):
+        kwargs.setdefault("source", "*")
+        super().__init__(**kwargs)
+
+    def to_representation(self, value):
+        return thumbnail_urls(value, self.context.get("request"))
+
+
 class CrewListSerializer(CrewSerializer):
+    thumbnails = ThumbnailsField()
+
     class Meta: 
         model = Crew
-        fields = ("full_name", "image")
+        fields = ("full_name", "image", "thumbnails")
         read_only_field=("id", "image")
 
 
@@ -49,6 +81,7 @@ class AirplaneSerializer(serializers.ModelSerializer):
 class AirplaneListSerializer(serializers.ModelSerializer):
     type = serializers.CharField(source="airplane_type.name", read_only=True)
     total_seats = serializers.ReadOnlyField()
+    thumbnails = ThumbnailsField()
 
     class Meta:
         model = Airplane
@@ -58,7 +91,8 @@ class AirplaneListSerializer(serializers.ModelSerializer):
                   "seats_in_row",
                   "type",
                   "total_seats",
-                  "image",)
+                  "image",
+                  "thumbnails",)
 
 
 class AirplaneRetrieveSerializer(AirplaneSerializer):
@@ -92,10 +126,11 @@ class CitySerializer(serializers.ModelSerializer):
 
 class CityListSerializer(CitySerializer):
     country_name = serializers.CharField(source="country.name", read_only=True)
+    thumbnails = ThumbnailsField()
 
     class Meta:
         model = City
-        fields = ("id", "name", "country_name", "image")
+        fields = ("id", "name", "country_name", "image", "thumbnails")
 
 
 class CityRetreiveSerializer(CitySerializer):
@@ -113,20 +148,39 @@ class AirportListSerializer(AirportSerializer):
 
     class Meta:
         model = Airport
-        fields = ("id", "name", "city_name",)
+        fields = ("id", "name", "code", "city_name",)
 
 
 class AirportRetreiveSerializer(AirportSerializer):
     closest_big_city = CitySerializer(many=False, read_only=True)
 
 
-class RouteSerializer(serializers.ModelSerializer):
+class AutocompleteSearchSerializer(serializers.Serializer):
+    q = serializers.CharField(max_length=100)
+    limit = serializers.IntegerField(default=10, min_value=1, max_value=50)
+
+
+class AirportAutocompleteSerializer(serializers.Serializer):
+    id = serializers.IntegerField()
+    name = serializers.CharField()
+    code = serializers.CharField(allow_null=True)
+    city_name = serializers.CharField()
+    country_name = serializers.CharField()
+
+
+class CityAutocompleteSerializer(serializers.Serializer):
+    id = serializers.IntegerField()
+    name = serializers.CharField()
+    country_name = serializers.CharField()
+
+
+class RouteSerializer(SparseFieldsetsMixin, serializers.ModelSerializer):
     class Meta:
         model = Route 
         fields = "__all__"
 
 
-class RouteListSerializer(serializers.ModelSerializer):
+class RouteListSerializer(SparseFieldsetsMixin, serializers.ModelSerializer):
     source_name = serializers.CharField(source="source.name", read_only=True)
     source_city = serializers.CharField(source="source.closest_big_city", read_only=True)
     dest_name = serializers.CharField(source="destination.name", read_only=True)
@@ -140,6 +194,11 @@ class RouteListSerializer(serializers.ModelSerializer):
                   "dest_city",
                   "distance"
                   )
+        # City.__str__ includes the country.
+        related_fields = {
+            "source_city": ("source__closest_big_city__country",),
+            "dest_city": ("destination__closest_big_city__country",),
+        }
 
 
 class RouteRetrieveSerializer(RouteSerializer):
@@ -158,7 +217,64 @@ class FlightSerializer(serializers.ModelSerializer):
                   "crew")
 
 
-class FlightListSerializer(serializers.ModelSerializer):
+class FlightScheduleSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = FlightSchedule
+        fields = ("id",
+                  "route",
+                  "airplane",
+                  "days_of_week",
+                  "departure_time",
+                  "duration",
+                  "timezone",
+                  "valid_from",
+                  "valid_until",
+                  "crew")
+
+    def validate(self, attrs):
+        attrs = super().validate(attrs)
+        schedule = FlightSchedule()
+        for field in ("days_of_week", "duration", "timezone",
+                      "valid_from", "valid_until"):
+            setattr(schedule, field, attrs.get(
+                field, getattr(self.instance, field, getattr(schedule, field))
+            ))
+        try:
+            schedule.clean()
+        except DjangoValidationError as error:
+            raise serializers.ValidationError(error.message_dict)
+        return attrs
+
+
+class FlightScheduleListSerializer(FlightScheduleSerializer):
+    route_source = serializers.CharField(source="route.source.name", read_only=True)
+    route_destination = serializers.CharField(source="route.destination.name", read_only=True)
+    airplane_name = serializers.CharField(source="airplane.name", read_only=True)
+    crew = serializers.SlugRelatedField(many=True,
+                                        read_only=True,
+                                        slug_field="full_name")
+
+    class Meta:
+        model = FlightSchedule
+        fields = ("id",
+                  "route_source",
+                  "route_destination",
+                  "airplane_name",
+                  "days_of_week",
+                  "departure_time",
+                  "duration",
+                  "timezone",
+                  "valid_from",
+                  "valid_until",
+                  "crew")
+
+
+class MaterializeSchedulesSerializer(serializers.Serializer):
+    days = serializers.IntegerField(required=False, min_value=1, max_value=400)
+    start = serializers.DateField(required=False)
+
+
+class FlightListSerializer(SparseFieldsetsMixin, serializers.ModelSerializer):
     route_source = serializers.CharField(source="route.source.name", read_only=True)
     route_destination = serializers.CharField(source="route.destination.name", read_only=True)
     route_distance = serializers.IntegerField(source="route.distance", read_only=True)
@@ -180,18 +296,70 @@ class FlightListSerializer(serializers.ModelSerializer):
                   "arrival_time",
                   "crew",
                   "tickets_available")
+        related_fields = {"tickets_available": ("airplane",)}
+
+    # Output key -> column of the rows returned by ``project``.
+    PROJECTION = {
+        "id": "id",
+        "route_source": "route_source",
+        "route_destination": "route_destination",
+        "route_distance": "route_distance",
+        "airplane_type_name": "airplane_type_name",
+        "airplane_name": "airplane_name",
+        "departure_time": "departure_time",
+        "arrival_time": "arrival_time",
+        "crew": "crew_names",
+        "tickets_available": "tickets_left",
+    }
+
+    @classmethod
+    def project(cls, queryset, fields=None):
+        """``values()`` rows with the listed columns (or only ``fields``),
+        crew names aggregated by Postgres, which ``to_representation``
+        renders without building any model instance. ``id`` and
+        ``departure_time`` are always selected for keyset pagination."""
+        crew = (
+            Flight.crew.through.objects
+            .filter(flight_id=OuterRef("pk"))
+            .order_by("id")
+            .values(name=Concat("crew__first_name",
+                                Value(" "),
+                                "crew__last_name"))
+        )
+        expressions = {
+            "route_source": F("route__source__name"),
+            "route_destination": F("route__destination__name"),
+            "route_distance": F("route__distance"),
+            "airplane_type_name": F("airplane__airplane_type__name"),
+            "airplane_name": F("airplane__name"),
+            "crew_names": ArraySubquery(crew),
+            "tickets_left": (F("airplane__rows") * F("airplane__seats_in_row")
+                             - F("seats_sold")),
+        }
+        columns = [column for name, column in cls.PROJECTION.items()
+                   if fields is None or name in fields]
+        return queryset.select_related(None).prefetch_related(None).annotate(
+            **{column: expressions[column] for column in columns
+               if column in expressions}
+        ).values(*dict.fromkeys(("id", "departure_time", *columns)))
+
+    def to_representation(self, instance):
+        if not isinstance(instance, dict):
+            return super().to_representation(instance)
+        data = {name: instance[self.PROJECTION[name]] for name in self.fields}
+        for name in ("departure_time", "arrival_time"):
+            if name in data:
+                data[name] = self.fields[name].to_representation(data[name])
+        return data
 
 
-class FlightRetrieveSerialzier(FlightSerializer):
+class FlightRetrieveSerialzier(SparseFieldsetsMixin, FlightSerializer):
     route = RouteListSerializer(many=False, read_only=True)
     airplane = AirplaneListSerializer(many=False, read_only=True)
     crew = CrewSerializer(many=True, read_only = True)
-    taken_seats = serializers.SlugRelatedField(
-        many=True,
-        read_only=True,
-        slug_field="seat",
-        source="ticket_flight"
-    )
+    taken_seats = serializers.SerializerMethodField()
+    seat_map = serializers.SerializerMethodField()
+
     class Meta:
         model = Flight
         fields = ("id",
@@ -200,10 +368,188 @@ class FlightRetrieveSerialzier(FlightSerializer):
                   "departure_time",
                   "arrival_time",
                   "crew",
-                  "taken_seats")
+                  "taken_seats",
+                  "seat_map")
+        related_fields = {"taken_seats": ("airplane", "seat_map"),
+                          "seat_map": ("airplane", "seat_map")}
+
+    @staticmethod
+    def _bitmap(obj):
+        if not hasattr(obj, "_seat_bitmap"):
+            obj._seat_bitmap = load_bitmap(obj)
+        return obj._seat_bitmap
+
+    def get_taken_seats(self, obj):
+        return [{"row": row, "seat": seat}
+                for row, seat in self._bitmap(obj).taken_seats()]
+
+    def get_seat_map(self, obj):
+        return self._bitmap(obj).grid()
+
+
+class IdListField(serializers.CharField):
+    """Comma separated ids, e.g. ``?source=1,2``."""
+
+    def to_internal_value(self, data):
+        data = super().to_internal_value(data)
+        try:
+            return [int(item) for item in data.split(",")]
+        except ValueError:
+            raise serializers.ValidationError(
+                "Must be a comma separated list of ids."
+            )
+
+
+class FlightSearchSerializer(serializers.Serializer):
+    """Validates flight list filters and compiles them into range lookups.
+
+    Calendar days (``departure_time``/``arrival_time``) are turned into
+    ``[midnight, next midnight)`` ranges in ``tz``, so the filters are plain
+    comparisons that can use the departure/arrival indexes instead of
+    casting every row with ``__date``.
+    """
+    source = IdListField(required=False)
+    destination = IdListField(required=False)
+    departure_time = serializers.DateField(required=False)
+    arrival_time = serializers.DateField(required=False)
+    departure_after = serializers.DateTimeField(required=False)
+    departure_before = serializers.DateTimeField(required=False)
+    arrival_after = serializers.DateTimeField(required=False)
+    arrival_before = serializers.DateTimeField(required=False)
+    tz = serializers.CharField(required=False)
+
+    def _timezone(self, data):
+        name = data.get("tz")
+        if not name:
+            return timezone.get_current_timezone()
+        try:
+            return zoneinfo.ZoneInfo(name)
+        except (zoneinfo.ZoneInfoNotFoundError, ValueError):
+            raise serializers.ValidationError({"tz": ["Unknown time zone."]})
+
+    def to_internal_value(self, data):
+        tz = self._timezone(data)
+        # Naive ?departure_after=2025-08-10T08:00 is read in the given zone.
+        with timezone.override(tz):
+            attrs = super().to_internal_value(data)
+        attrs["tz"] = tz
+        return attrs
+
+    def validate(self, attrs):
+        tz = attrs["tz"]
+        for prefix in ("departure", "arrival"):
+            start = attrs.pop(f"{prefix}_after", None)
+            end = attrs.pop(f"{prefix}_before", None)
+            day = attrs.pop(f"{prefix}_time", None)
+            if day:
+                day_start = datetime.combine(day, time.min, tzinfo=tz)
+                day_end = datetime.combine(day + timedelta(days=1),
+                                           time.min,
+                                           tzinfo=tz)
+                start = max(start, day_start) if start else day_start
+                end = min(end, day_end) if end else day_end
+            if start and end and end <= start:
+                raise serializers.ValidationError(
+                    f"{prefix} window is empty"
+                )
+            attrs[prefix] = (start, end)
+        return attrs
+
+    def filter_queryset(self, queryset):
+        filters = {}
+        if "source" in self.validated_data:
+            filters["route__source_id__in"] = self.validated_data["source"]
+        if "destination" in self.validated_data:
+            filters["route__destination_id__in"] = (
+                self.validated_data["destination"]
+            )
+        for prefix in ("departure", "arrival"):
+            start, end = self.validated_data[prefix]
+            if start:
+                filters[f"{prefix}_time__gte"] = start
+            if end:
+                filters[f"{prefix}_time__lt"] = end
+        return queryset.filter(**filters)
+
+
+class BoardFlightSerializer(serializers.Serializer):
+    id = serializers.IntegerField()
+    route_source = serializers.CharField()
+    route_destination = serializers.CharField()
+    departure_time = serializers.DateTimeField()
+    arrival_time = serializers.DateTimeField()
+    airplane_name = serializers.CharField()
+
+
+class AirportBoardSerializer(serializers.Serializer):
+    airport = serializers.IntegerField()
+    window_start = serializers.DateTimeField()
+    window_end = serializers.DateTimeField()
+    departures = BoardFlightSerializer(many=True)
+    arrivals = BoardFlightSerializer(many=True)
+
+
+class OrderSearchSerializer(serializers.Serializer):
+    """Validates the order list time window, ``[since, until)``."""
+    since = serializers.DateTimeField(required=False)
+    until = serializers.DateTimeField(required=False)
 
+    def validate(self, attrs):
+        since, until = attrs.get("since"), attrs.get("until")
+        if since and until and until <= since:
+            raise serializers.ValidationError("until must be after since")
+        return attrs
+
+    def filter_queryset(self, queryset):
+        filters = {}
+        if "since" in self.validated_data:
+            filters["created_at__gte"] = self.validated_data["since"]
+        if "until" in self.validated_data:
+            filters["created_at__lt"] = self.validated_data["until"]
+        return queryset.filter(**filters)
+
+
+class ConnectionSearchSerializer(serializers.Serializer):
+    source = serializers.IntegerField()
+    destination = serializers.IntegerField()
+    departure_after = serializers.DateTimeField(required=False)
+    departure_before = serializers.DateTimeField(required=False)
+    max_legs = serializers.IntegerField(default=2, min_value=1, max_value=4)
+    min_connection = serializers.IntegerField(default=45, min_value=0)
+    max_connection = serializers.IntegerField(default=720, min_value=1)
+    max_distance = serializers.IntegerField(required=False, min_value=1)
+    limit = serializers.IntegerField(default=10, min_value=1, max_value=50)
 
-class TicketSerializer(serializers.ModelSerializer):
+    def validate(self, attrs):
+        attrs = super().validate(attrs)
+        if attrs["source"] == attrs["destination"]:
+            raise serializers.ValidationError(
+                "source and destination must differ"
+            )
+        attrs.setdefault("departure_after", timezone.now())
+        attrs.setdefault("departure_before",
+                         attrs["departure_after"] + timedelta(days=1))
+        if attrs["departure_before"] <= attrs["departure_after"]:
+            raise serializers.ValidationError(
+                "departure_before must be later than departure_after"
+            )
+        if attrs["max_connection"] <= attrs["min_connection"]:
+            raise serializers.ValidationError(
+                "max_connection must be greater than min_connection"
+            )
+        attrs["min_connection"] = timedelta(minutes=attrs["min_connection"])
+        attrs["max_connection"] = timedelta(minutes=attrs["max_connection"])
+        return attrs
+
+
+class ConnectionSerializer(serializers.Serializer):
+    departure_time = serializers.DateTimeField()
+    arrival_time = serializers.DateTimeField()
+    total_distance = serializers.IntegerField()
+    legs = FlightListSerializer(many=True)
+
+
+class TicketSerializer(SparseFieldsetsMixin, serializers.ModelSerializer):
     def validate(self, attrs):
         data = super(TicketSerializer, self).validate(attrs)
         Ticket.validate_seat(
@@ -227,27 +573,231 @@ class TicketListSerializer(TicketSerializer):
     flight = FlightListSerializer(read_only = True)
 
 
+class TicketHistoryListSerializer(serializers.ListSerializer):
+    """Renders an order's tickets from its ``OrderSummary`` when the order
+    was loaded with ``order_history.with_history``, adding the live seat
+    counts read by ``order_history.attach_tickets_left``, and from the
+    tickets themselves otherwise."""
+
+    def get_attribute(self, instance):
+        history = getattr(instance, "history", None)
+        if history is None:
+            return super().get_attribute(instance)
+        left = getattr(instance, "history_tickets_left", {})
+        return [
+            {**ticket, "flight": {
+                **ticket["flight"],
+                "tickets_available": left.get(ticket["flight"]["id"]),
+            }}
+            for ticket in history
+        ]
+
+    def to_representation(self, data):
+        if isinstance(data, list) and all(isinstance(ticket, dict)
+                                          for ticket in data):
+            return data
+        return super().to_representation(data)
+
+
+class OrderTicketHistorySerializer(TicketListSerializer):
+    class Meta(TicketListSerializer.Meta):
+        list_serializer_class = TicketHistoryListSerializer
+
+
+class PrefetchedFlightField(serializers.PrimaryKeyRelatedField):
+    """Resolves flights from the batch loaded by OrderTicketListSerializer
+    instead of querying them one ticket at a time."""
+
+    def to_internal_value(self, data):
+        flights = self.context.get("prefetched_flights")
+        if flights is None:
+            return super().to_internal_value(data)
+        if isinstance(data, bool):
+            self.fail("incorrect_type", data_type=type(data).__name__)
+        try:
+            flight = flights.get(int(data))
+        except (TypeError, ValueError):
+            self.fail("incorrect_type", data_type=type(data).__name__)
+        if flight is None:
+            self.fail("does_not_exist", pk_value=data)
+        return flight
+
+
+class OrderTicketListSerializer(serializers.ListSerializer):
+    def to_internal_value(self, data):
+        if isinstance(data, list):
+            flight_ids = set()
+            for item in data:
+                try:
+                    flight_ids.add(int(item["flight"]))
+                except (TypeError, ValueError, KeyError):
+                    continue
+            self.context["prefetched_flights"] = (
+                Flight.objects.select_related("airplane").in_bulk(flight_ids)
+            )
+        return super().to_internal_value(data)
+
+    def validate(self, attrs):
+        seats = Counter(
+            (ticket["flight"].id, ticket["row"], ticket["seat"])
+            for ticket in attrs
+        )
+        duplicates = [seat for seat, count in seats.items() if count > 1]
+        if duplicates:
+            raise serializers.ValidationError([
+                f"Seat {row}/{seat} on flight {flight_id} is ordered twice"
+                for flight_id, row, seat in duplicates
+            ])
+        # Seats sold to others are found by the insert, see
+        # OrderSerializer.create.
+        return attrs
+
+
+class OrderTicketSerializer(TicketSerializer):
+    flight = PrefetchedFlightField(queryset=Flight.objects.all())
+
+    class Meta(TicketSerializer.Meta):
+        list_serializer_class = OrderTicketListSerializer
+        # Seat conflicts are checked for the whole order in one query.
+        validators = []
+
+
+class SeatSerializer(serializers.Serializer):
+    row = serializers.IntegerField()
+    seat = serializers.IntegerField()
+
+
+class SeatHoldSerializer(serializers.Serializer):
+    seats = SeatSerializer(many=True, allow_empty=False)
+    hold = serializers.UUIDField(read_only=True)
+    expires_at = serializers.DateTimeField(read_only=True)
+
+    def validate_seats(self, seats):
+        flight = self.context["flight"]
+        for seat in seats:
+            Ticket.validate_seat(seat["seat"],
+                                 flight.airplane.seats_in_row,
+                                 serializers.ValidationError)
+            Ticket.validate_row(seat["row"],
+                                flight.airplane.rows,
+                                serializers.ValidationError)
+        bitmap = load_bitmap(flight)
+        sold = [seat for seat in seats
+                if bitmap.is_taken(seat["row"], seat["seat"])]
+        if sold:
+            raise serializers.ValidationError([
+                f"Seat {seat['row']}/{seat['seat']} is already taken"
+                for seat in sold
+            ])
+        return seats
 
-class OrderSerializer(serializers.ModelSerializer):
-    tickets = TicketSerializer(many=True, read_only=False, allow_empty=False)
-    created_at = serializers.ReadOnlyField()
+    def create(self, validated_data):
+        flight = self.context["flight"]
+        seats = sorted({(flight.id, seat["row"], seat["seat"])
+                        for seat in validated_data["seats"]})
+        try:
+            hold = get_hold_store().hold(self.context["request"].user.id,
+                                         seats,
+                                         hold_ttl())
+        except SeatsUnavailable as error:
+            raise serializers.ValidationError({"seats": [
+                f"Seat {row}/{seat} is held by another customer"
+                for _, row, seat in error.seats
+            ]})
+        return {
+            "hold": hold.token,
+            "expires_at": hold.expires_at,
+            "seats": [{"row": row, "seat": seat} for _, row, seat in hold.seats],
+        }
+
+
+class OrderSerializer(SparseFieldsetsMixin, serializers.ModelSerializer):
+    tickets = OrderTicketSerializer(many=True,
+                                    read_only=False,
+                                    allow_empty=False,
+                                    required=False)
+    hold = serializers.UUIDField(write_only=True, required=False)
+    created_at = serializers.DateTimeField(read_only=True)
 
     class Meta:
         model = Order
-        fields = ["id", "created_at", "tickets"]
+        fields = ["id", "created_at", "tickets", "hold"]
+
+    def validate(self, attrs):
+        attrs = super().validate(attrs)
+        store = get_hold_store()
+        user_id = self.context["request"].user.id
+        hold = attrs.get("hold")
+        if hold and "tickets" in attrs:
+            raise serializers.ValidationError(
+                "Provide either tickets or a hold, not both"
+            )
+        if hold:
+            seats = store.get(hold, user_id)
+            if not seats:
+                raise serializers.ValidationError(
+                    {"hold": ["Hold does not exist or has expired"]}
+                )
+            attrs["tickets"] = [
+                {"flight_id": flight_id, "row": row, "seat": seat}
+                for flight_id, row, seat in seats
+            ]
+            return attrs
+        if "tickets" not in attrs:
+            raise serializers.ValidationError(
+                {"tickets": ["This field is required."]}
+            )
+        held = store.conflicts(
+            [(ticket["flight"].id, ticket["row"], ticket["seat"])
+             for ticket in attrs["tickets"]],
+            user_id
+        )
+        if held:
+            raise serializers.ValidationError({"tickets": [
+                f"Seat {row}/{seat} on flight {flight_id} "
+                f"is held by another customer"
+                for flight_id, row, seat in held
+            ]})
+        return attrs
     
     def create(self, validated_data):
-        with transaction.atomic():
-            tickets_data = validated_data.pop("tickets")
-            order = Order.objects.create(**validated_data)
-            for ticket_data in tickets_data:
-                Ticket.objects.create(order=order, **ticket_data)
-            return order
+        hold = validated_data.pop("hold", None)
+        try:
+            with transaction.atomic():
+                tickets_data = validated_data.pop("tickets")
+                order = Order.objects.create(**validated_data)
+                tickets = [Ticket(order=order, **ticket_data)
+                           for ticket_data in tickets_data]
+                saved = insert_tickets(tickets)
+                if len(saved) < len(tickets):
+                    raise serializers.ValidationError({"tickets": [
+                        f"Seat {ticket.row}/{ticket.seat} on flight "
+                        f"{ticket.flight_id} is already taken"
+                        for ticket in tickets if ticket.pk is None
+                    ]})
+                seats_by_flight = defaultdict(list)
+                for ticket in saved:
+                    seats_by_flight[ticket.flight_id].append(
+                        (ticket.row, ticket.seat)
+                    )
+                # The insert skips the Ticket signals, and updating flights
+                # in id order keeps concurrent orders from deadlocking.
+                for flight_id in sorted(seats_by_flight):
+                    occupy_booked_seats(flight_id, seats_by_flight[flight_id])
+                if hold:
+                    transaction.on_commit(
+                        partial(get_hold_store().release, hold)
+                    )
+                return order
+        except IntegrityError:
+            raise serializers.ValidationError(
+                {"tickets": ["Some of the flights have just been removed"]}
+            )
 
 
 class OrderListSerializer(OrderSerializer):
-    created_at = serializers.ReadOnlyField()
-    tickets = TicketListSerializer(read_only=True, many=True)
+    created_at = serializers.DateTimeField(read_only=True)
+    tickets = OrderTicketHistorySerializer(read_only=True, many=True)
 
     class Meta:
         model = Order
@@ -258,7 +808,7 @@ class OrderListSerializer(OrderSerializer):
 
 class OrderRetrieveSerializer(OrderSerializer):
     user = UserSerializer(many = False, read_only = True)
-    tickets = TicketListSerializer(read_only=True, many=True)
+    tickets = OrderTicketHistorySerializer(read_only=True, many=True)
 
     class Meta:
         model = Order
@@ -0,0 +1,143 @@
+from functools import partial
+from django.db import transaction
+from django.db.models.signals import (m2m_changed,
+                                      pre_save,
+                                      post_save,
+                                      post_delete)
+from django.dispatch import receiver
+from airport_backend.connections import connection_index
+from airport_backend.models import (Airplane,
+                                    AirplaneType,
+                                    Airport,
+                                    City,
+                                    Country,
+                                    Crew,
+                                    Flight,
+                                    Route,
+                                    Ticket)
+from airport_backend.order_history import (flights_of_airports,
+                                           refresh_flight_summaries,
+                                           refresh_order_summaries)
+from airport_backend.response_cache import bump_model_version
+from airport_backend.seat_map import occupy_seats, release_seats
+
+
+@receiver(pre_save, sender=Ticket)
+def remember_previous_seat(sender, instance, raw, **kwargs):
+    instance._previous_seat = None
+    if raw or instance.pk is None:
+        return
+    instance._previous_seat = (
+        Ticket.objects
+        .filter(pk=instance.pk)
+        .values_list("flight_id", "row", "seat")
+        .first()
+    )
+
+
+@receiver(post_save, sender=Ticket)
+def occupy_ticket_seat(sender, instance, created, raw, **kwargs):
+    if raw:
+        return
+    previous = getattr(instance, "_previous_seat", None)
+    current = (instance.flight_id, instance.row, instance.seat)
+    if previous == current:
+        return
+    if previous:
+        flight_id, row, seat = previous
+        release_seats(flight_id, [(row, seat)])
+    occupy_seats(instance.flight_id, [(instance.row, instance.seat)])
+
+
+@receiver(post_delete, sender=Ticket)
+def release_ticket_seat(sender, instance, **kwargs):
+    release_seats(instance.flight_id, [(instance.row, instance.seat)])
+
+
+@receiver(post_save, sender=Flight)
+def refresh_indexed_flight(sender, instance, raw, **kwargs):
+    if raw or not connection_index.loaded:
+        return
+    transaction.on_commit(partial(connection_index.refresh, [instance.pk]))
+
+
+@receiver(post_delete, sender=Flight)
+def remove_indexed_flight(sender, instance, **kwargs):
+    if not connection_index.loaded:
+        return
+    transaction.on_commit(partial(connection_index.remove, instance.pk))
+
+
+@receiver(post_save, sender=Route)
+def refresh_indexed_route(sender, instance, created, raw, **kwargs):
+    if raw or created or not connection_index.loaded:
+        return
+    flight_ids = list(instance.flight_route.values_list("id", flat=True))
+    transaction.on_commit(partial(connection_index.refresh, flight_ids))
+
+
+@receiver(post_save, sender=Ticket)
+@receiver(post_delete, sender=Ticket)
+def refresh_ticket_order_summary(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    # After commit: when the whole order is being deleted it is gone by then.
+    transaction.on_commit(
+        partial(refresh_order_summaries, [instance.order_id])
+    )
+
+
+# Flights whose rendering in order summaries shows a field of the instance.
+SUMMARY_FLIGHTS = {
+    Flight: lambda flight: [flight.pk],
+    Route: lambda route: route.flight_route.values_list("id", flat=True),
+    Airport: lambda airport: flights_of_airports([airport.pk]),
+    Airplane: lambda airplane: (
+        airplane.flight_airplane.values_list("id", flat=True)
+    ),
+    AirplaneType: lambda airplane_type: Flight.objects.filter(
+        airplane__airplane_type=airplane_type
+    ).values_list("id", flat=True),
+    Crew: lambda crew: crew.flights_orders.values_list("id", flat=True),
+}
+
+
+def refresh_flight_order_summaries(sender, instance, created, raw, **kwargs):
+    if raw or created:
+        return
+    transaction.on_commit(
+        partial(refresh_flight_summaries, SUMMARY_FLIGHTS[sender](instance))
+    )
+
+
+@receiver(m2m_changed, sender=Flight.crew.through)
+def refresh_crew_order_summaries(sender, instance, action, reverse, pk_set,
+                                 **kwargs):
+    if action not in ("post_add", "post_remove", "pre_clear"):
+        return
+    if not reverse:
+        flight_ids = [instance.pk]
+    elif action == "pre_clear":
+        flight_ids = list(SUMMARY_FLIGHTS[Crew](instance))
+    else:
+        flight_ids = list(pk_set)
+    transaction.on_commit(partial(refresh_flight_summaries, flight_ids))
+
+
+for model in SUMMARY_FLIGHTS:
+    post_save.connect(refresh_flight_order_summaries,
+                      sender=model,
+                      dispatch_uid=f"order-summaries-{model.__name__}")
+
+
+def bump_version_on_commit(sender, using, **kwargs):
+    # Bumped inside the transaction, a concurrent reader could cache the
+    # rows it still sees under the new version.
+    transaction.on_commit(partial(bump_model_version, sender), using=using)
+
+
+for model in (Country, City, Airport, AirplaneType, Route):
+    for signal in (post_save, post_delete):
+        signal.connect(bump_version_on_commit,
+                       sender=model,
+                       dispatch_uid=f"bump-version-{model.__name__}")
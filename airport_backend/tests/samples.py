@@ -0,0 +1,35 @@
+from airport_backend.models import (Flight,
+                                    Route,
+                                    Airplane,
+                                    Airport,
+                                    City,
+                                    Country,
+                                    AirplaneType)
+
+
+def sample_flights():
+    country = Country.objects.create(name="Spain")
+    source = Airport.objects.create(
+        name="Source",
+        closest_big_city=City.objects.create(name="Barcelona", country=country)
+    )
+    destination = Airport.objects.create(
+        name="Destination",
+        closest_big_city=City.objects.create(name="Madrid", country=country)
+    )
+    route = Route.objects.create(source=source,
+                                 destination=destination,
+                                 distance=600)
+    airplane = Airplane.objects.create(
+        name="Plane",
+        rows=10,
+        seats_in_row=3,
+        airplane_type=AirplaneType.objects.create(name="Small")
+    )
+    return [
+        Flight.objects.create(route=route,
+                              airplane=airplane,
+                              departure_time=f"2025-08-1{day}T08:00:00Z",
+                              arrival_time=f"2025-08-1{day}T10:00:00Z")
+        for day in (1, 2)
+    ]
@@ -0,0 +1,254 @@
+import asyncio
+import time
+from datetime import timedelta
+
+from asgiref.sync import sync_to_async
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connections
+from django.db.models import F
+from django.test import AsyncClient, TestCase, TransactionTestCase
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from airport_backend.boards import _cache_key, board_diff, get_board
+from airport_backend.models import Airport, Flight, Route
+from airport_backend.tests.samples import sample_flights
+
+
+# Polled every second, for long enough to see a change.
+STREAMING_BOARDS = {"PAST_MINUTES": 60,
+                    "AHEAD_MINUTES": 720,
+                    "CACHE_TTL": 1,
+                    "STREAM_SECONDS": 3,
+                    "WSGI_STREAMS": 1}
+
+
+def board_url(airport_id):
+    return reverse("airport_backend:airport-board", args=(airport_id,))
+
+
+def board_stream_url(airport_id):
+    return reverse("airport_backend:airport-board-stream", args=(airport_id,))
+
+
+def sample_board_flights():
+    """A flight from Source that left half an hour ago and one from
+    Destination back to Source landing in 75 minutes, next to the 2025
+    flights of ``sample_flights``, far outside the board window."""
+    flights = sample_flights()
+    route = flights[0].route
+    now = timezone.now().replace(microsecond=0)
+    back = Route.objects.create(source=route.destination,
+                                destination=route.source,
+                                distance=600)
+    return [
+        Flight.objects.create(route=route,
+                              airplane=flights[0].airplane,
+                              departure_time=now - timedelta(minutes=30),
+                              arrival_time=now + timedelta(minutes=90)),
+        Flight.objects.create(route=back,
+                              airplane=flights[0].airplane,
+                              departure_time=now - timedelta(minutes=45),
+                              arrival_time=now + timedelta(minutes=75)),
+    ]
+
+
+class TestAirportBoard(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            email="test@test.test", password="testpassword"
+        )
+        self.client.force_authenticate(self.user)
+        self.departure, self.arrival = sample_board_flights()
+        self.airport = self.departure.route.source
+
+    def test_board(self):
+        with self.assertNumQueries(1):
+            res = self.client.get(board_url(self.airport.id))
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual([flight["id"] for flight in res.data["departures"]],
+                         [self.departure.id])
+        self.assertEqual([flight["id"] for flight in res.data["arrivals"]],
+                         [self.arrival.id])
+        self.assertEqual(res.data["departures"][0]["route_destination"],
+                         "Destination")
+        self.assertEqual(res.data["departures"][0]["airplane_name"], "Plane")
+
+        # Cached: no query until the board gets stale.
+        with self.assertNumQueries(0):
+            cached = self.client.get(board_url(self.airport.id))
+        self.assertEqual(cached.data, res.data)
+
+        res = self.client.get(board_url(self.arrival.route.source_id))
+        self.assertEqual([flight["id"] for flight in res.data["departures"]],
+                         [self.arrival.id])
+        self.assertEqual([flight["id"] for flight in res.data["arrivals"]],
+                         [self.departure.id])
+
+    def test_not_modified(self):
+        res = self.client.get(board_url(self.airport.id))
+        res = self.client.get(board_url(self.airport.id),
+                              HTTP_IF_NONE_MATCH=res["ETag"])
+        self.assertEqual(res.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_missing_airport(self):
+        res = self.client.get(board_url(0))
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
+
+        empty = Airport.objects.create(
+            name="Empty", closest_big_city=self.airport.closest_big_city
+        )
+        res = self.client.get(board_url(empty.id))
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data["departures"], [])
+
+    def test_stale_board_is_rebuilt_by_one_worker(self):
+        entry = get_board(self.airport.id)
+        Flight.objects.filter(id=self.departure.id).update(
+            departure_time=timezone.now() - timedelta(days=1)
+        )
+        cache.set(_cache_key(self.airport.id),
+                  {**entry, "fresh_until": time.time() - 1})
+
+        with self.assertNumQueries(1):
+            rebuilt = get_board(self.airport.id)
+        self.assertEqual(rebuilt["board"]["departures"], [])
+        self.assertNotEqual(rebuilt["etag"], entry["etag"])
+
+        # While a rebuild is under way the others serve the stale board.
+        cache.set(_cache_key(self.airport.id),
+                  {**entry, "fresh_until": time.time() - 1})
+        with self.assertNumQueries(0):
+            stale = get_board(self.airport.id)
+        self.assertEqual(stale["etag"], entry["etag"])
+
+    def test_board_diff(self):
+        previous = get_board(self.airport.id)["board"]
+        current = {
+            **previous,
+            "departures": [{**previous["departures"][0],
+                            "airplane_name": "Other"}],
+            "arrivals": [],
+        }
+        self.assertEqual(board_diff(previous, current), {
+            "departures": {"updated": current["departures"], "removed": []},
+            "arrivals": {"updated": [], "removed": [self.arrival.id]},
+        })
+        self.assertEqual(board_diff(previous, previous), {})
+
+
+class TestAirportBoardStream(TransactionTestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+        self.user = get_user_model().objects.create_user(
+            email="test@test.test", password="testpassword"
+        )
+        self.departure, self.arrival = sample_board_flights()
+        self.airport = self.departure.route.source
+        self.headers = {
+            "Authorization": f"Bearer {AccessToken.for_user(self.user)}"
+        }
+
+    async def _stream(self, airport_id):
+        res = await AsyncClient().get(board_stream_url(airport_id),
+                                      headers=self.headers)
+        if not res.streaming:
+            return res, []
+        events = []
+        async for chunk in res.streaming_content:
+            events.append(chunk.decode())
+        return res, events
+
+    def test_stream(self):
+        with self.settings(AIRPORT_BOARDS={"PAST_MINUTES": 60,
+                                           "AHEAD_MINUTES": 720,
+                                           "CACHE_TTL": 0,
+                                           "STREAM_SECONDS": 0}):
+            res, events = asyncio.run(self._stream(self.airport.id))
+        self.assertEqual(res["Content-Type"], "text/event-stream")
+        self.assertEqual(res["Cache-Control"], "no-cache")
+        self.assertEqual(events[0], "retry: 0\n")
+        self.assertTrue(events[1].startswith("event: board\n"))
+        self.assertIn(f'"id":{self.departure.id}', events[1])
+
+    def _move_departure(self):
+        return Flight.objects.filter(id=self.departure.id).update(
+            departure_time=F("departure_time") + timedelta(minutes=5)
+        )
+
+    def _assert_diff(self, events):
+        diffs = [event for event in events if event.startswith("event: diff")]
+        self.assertEqual(len(diffs), 1)
+        self.assertIn(f'"id":{self.departure.id}', diffs[0])
+        self.assertNotIn(f'"id":{self.arrival.id}', diffs[0])
+        # Otherwise nothing but keepalives.
+        self.assertLessEqual(set(events) - set(diffs), {": keepalive\n\n"})
+
+    def test_diff_after_flight_changes(self):
+        async def events():
+            res = await AsyncClient().get(board_stream_url(self.airport.id),
+                                          headers=self.headers)
+            stream = res.streaming_content
+            board = [(await anext(stream)).decode() for _ in range(2)]
+            await sync_to_async(self._move_departure)()
+            # Read to the end, so the stream closes its connections.
+            events = [event.decode() async for event in stream]
+            return board, events
+
+        self.addCleanup(
+            lambda: asyncio.run(sync_to_async(connections.close_all)())
+        )
+        with self.settings(AIRPORT_BOARDS=STREAMING_BOARDS):
+            board, events = asyncio.run(events())
+        self.assertTrue(board[1].startswith("event: board\n"))
+        self._assert_diff(events)
+
+    def test_wsgi_stream_is_sent_as_it_goes(self):
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=self.headers["Authorization"])
+        with self.settings(AIRPORT_BOARDS=STREAMING_BOARDS):
+            res = client.get(board_stream_url(self.airport.id))
+            self.assertFalse(res.is_async)
+            stream = iter(res.streaming_content)
+            self.assertTrue(next(stream).startswith(b"retry: "))
+            self.assertTrue(next(stream).startswith(b"event: board\n"))
+            self._move_departure()
+            events = [event.decode() for event in stream]
+            res.close()
+        self._assert_diff(events)
+
+    def test_wsgi_streams_are_capped(self):
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=self.headers["Authorization"])
+        with self.settings(AIRPORT_BOARDS=STREAMING_BOARDS):
+            first = client.get(board_stream_url(self.airport.id))
+            self.assertEqual(first.status_code, status.HTTP_200_OK)
+            res = client.get(board_stream_url(self.airport.id))
+            self.assertEqual(res.status_code,
+                             status.HTTP_503_SERVICE_UNAVAILABLE)
+            self.assertEqual(res["Retry-After"], "1")
+
+            # Closing the response frees its stream, even unread.
+            first.close()
+            res = client.get(board_stream_url(self.airport.id))
+            self.assertEqual(res.status_code, status.HTTP_200_OK)
+            res.close()
+
+    def test_missing_airport(self):
+        res, events = asyncio.run(self._stream(0))
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_needs_authentication(self):
+        self.headers = {}
+        res, events = asyncio.run(self._stream(self.airport.id))
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
@@ -0,0 +1,172 @@
+import asyncio
+import time
+from unittest import mock
+
+from asgiref.sync import sync_to_async
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection, connections
+from django.test import AsyncClient, TransactionTestCase
+from django.urls import reverse
+from rest_framework_simplejwt.tokens import AccessToken
+
+from rest_framework.test import APIClient
+from rest_framework import status
+from airport_backend.async_db import close_pool, open_pool
+from airport_backend.models import Crew, Order, Ticket
+from airport_backend.throttling import DatabaseRateStore, UserRateThrottle
+from airport_backend.tests.samples import sample_flights
+
+
+ASYNC_FLIGHT_LIST_URL = reverse("airport_backend:async-flight-list")
+FLIGHT_LIST_URL = reverse("airport_backend:flight-list")
+
+
+def availability_url(flight_id):
+    return reverse("airport_backend:async-flight-availability",
+                   args=(flight_id,))
+
+
+def without_crew_order(flights):
+    # The sync list prefetches crew without an ORDER BY.
+    return [{**flight, "crew": sorted(flight["crew"])} for flight in flights]
+
+
+class TestAsyncFlightViews(TransactionTestCase):
+    """The async views read through their own connections, so the data has
+    to be committed: TransactionTestCase instead of TestCase."""
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            email="test@test.test", password="testpassword"
+        )
+        self.flights = sample_flights()
+        self.flights[0].crew.set([
+            Crew.objects.create(first_name="Martha", last_name="Dumych"),
+            Crew.objects.create(first_name="Ivan", last_name="Petrenko"),
+        ])
+        order = Order.objects.create(user=self.user)
+        Ticket.objects.create(flight=self.flights[0], row=2, seat=3,
+                              order=order)
+        self.headers = {
+            "Authorization": f"Bearer {AccessToken.for_user(self.user)}"
+        }
+
+    async def _get(self, url, data=None):
+        return await AsyncClient().get(url, data, headers=self.headers)
+
+    def test_list_matches_sync_list(self):
+        client = APIClient()
+        client.force_authenticate(self.user)
+        for params in ({}, {"page_size": 1}, {"departure_time": "2025-08-12"},
+                       {"source": self.flights[0].route.source_id}):
+            with self.subTest(params):
+                expected = client.get(FLIGHT_LIST_URL, params).json()
+                res = asyncio.run(self._get(ASYNC_FLIGHT_LIST_URL, params))
+                self.assertEqual(res.status_code, status.HTTP_200_OK)
+                data = res.json()
+                self.assertEqual(without_crew_order(data["results"]),
+                                 without_crew_order(expected["results"]))
+                self.assertEqual(data["next"] is None, expected["next"] is None)
+
+        flight = data["results"][0]
+        self.assertEqual(sorted(flight["crew"]),
+                         ["Ivan Petrenko", "Martha Dumych"])
+        self.assertEqual(flight["tickets_available"], 29)
+
+    def test_cursor(self):
+        first = asyncio.run(self._get(ASYNC_FLIGHT_LIST_URL,
+                                      {"page_size": 1})).json()
+        second = asyncio.run(self._get(first["next"])).json()
+        self.assertEqual([flight["id"] for flight in second["results"]],
+                         [self.flights[1].id])
+        self.assertIsNotNone(second["previous"])
+
+    def test_invalid_filters(self):
+        res = asyncio.run(self._get(ASYNC_FLIGHT_LIST_URL, {"tz": "Mars/Base"}))
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_requires_token(self):
+        self.headers = {}
+        res = asyncio.run(self._get(ASYNC_FLIGHT_LIST_URL))
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+        self.headers = {"Authorization": "Bearer nonsense"}
+        res = asyncio.run(self._get(ASYNC_FLIGHT_LIST_URL))
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_principal_is_cached(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+        res = asyncio.run(self._get(ASYNC_FLIGHT_LIST_URL))
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        # As on a worker that did not see the change: the cached principal
+        # serves until it expires.
+        get_user_model().objects.filter(id=self.user.id).update(
+            is_active=False
+        )
+        res = asyncio.run(self._get(ASYNC_FLIGHT_LIST_URL))
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        cache.clear()
+        res = asyncio.run(self._get(ASYNC_FLIGHT_LIST_URL))
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_availability(self):
+        res = asyncio.run(self._get(availability_url(self.flights[0].id)))
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        data = res.json()
+        self.assertEqual(data["tickets_available"], 29)
+        self.assertEqual(data["taken_seats"], [{"row": 2, "seat": 3}])
+        self.assertEqual(data["seat_map"][1], [0, 0, 1])
+
+        res = asyncio.run(self._get(availability_url(0)))
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
+
+    def _connections(self, expected):
+        # A backend leaves pg_stat_activity a moment after its client
+        # disconnects.
+        for _ in range(50):
+            with connection.cursor() as cursor:
+                cursor.execute("SELECT count(*) FROM pg_stat_activity "
+                               "WHERE datname = current_database()")
+                count = cursor.fetchone()[0]
+            if count == expected:
+                break
+            time.sleep(0.02)
+        return count
+
+    def test_connections_are_closed_without_shared_loop(self):
+        # Under WSGI every async view runs on a new event loop.
+        before = self._connections(1)
+        for _ in range(3):
+            res = asyncio.run(self._get(ASYNC_FLIGHT_LIST_URL))
+            self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(self._connections(before), before)
+
+    def test_shared_loop_pool(self):
+        async def requests():
+            pool = await open_pool()
+            try:
+                for _ in range(3):
+                    res = await self._get(ASYNC_FLIGHT_LIST_URL)
+                    self.assertEqual(res.status_code, status.HTTP_200_OK)
+                return len(pool._idle)
+            finally:
+                await close_pool()
+
+        self.assertEqual(asyncio.run(requests()), 1)
+
+    @mock.patch("airport_backend.throttling._store", DatabaseRateStore())
+    @mock.patch.object(UserRateThrottle, "THROTTLE_RATES",
+                       {"anon": "100/day", "user": "2/minute"})
+    def test_throttled_like_sync_views(self):
+        # The database store counts on the sync connection of asgiref's
+        # thread, which the test client does not close after requests.
+        self.addCleanup(
+            lambda: asyncio.run(sync_to_async(connections.close_all)())
+        )
+        for _ in range(2):
+            res = asyncio.run(self._get(ASYNC_FLIGHT_LIST_URL))
+            self.assertEqual(res.status_code, status.HTTP_200_OK)
+        res = asyncio.run(self._get(availability_url(self.flights[0].id)))
+        self.assertEqual(res.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        self.assertIn("Retry-After", res)
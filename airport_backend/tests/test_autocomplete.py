@@ -0,0 +1,167 @@
+import threading
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.test import SimpleTestCase, TransactionTestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from airport_backend.autocomplete import (airport_index,
+                                          build_indexes,
+                                          city_index,
+                                          normalize)
+from airport_backend.models import Airport, City, Country
+
+
+AIRPORT_AUTOCOMPLETE_URL = reverse("airport_backend:airport-autocomplete")
+CITY_AUTOCOMPLETE_URL = reverse("airport_backend:city-autocomplete")
+
+
+class TestNormalize(SimpleTestCase):
+
+    def test_normalize(self):
+        self.assertEqual(normalize("São Paulo-Guarulhos"),
+                         "sao paulo guarulhos")
+        self.assertEqual(normalize("  KBP "), "kbp")
+        self.assertEqual(normalize(None), "")
+
+
+class TestAutocomplete(TransactionTestCase):
+    # The indexes are rebuilt by a thread of their own, which only sees
+    # committed rows.
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            email="test@test.test", password="testpassword"
+        )
+        self.client.force_authenticate(self.user)
+        ukraine = Country.objects.create(name="Ukraine")
+        self.kyiv = City.objects.create(name="Kyiv", country=ukraine)
+        self.lviv = City.objects.create(name="Lviv", country=ukraine)
+        self.boryspil = Airport.objects.create(
+            name="Boryspil International", code="KBP",
+            closest_big_city=self.kyiv
+        )
+        self.zhuliany = Airport.objects.create(
+            name="Kyiv Zhuliany", code="IEV", closest_big_city=self.kyiv
+        )
+        self.danylo = Airport.objects.create(
+            name="Lviv Danylo Halytskyi International", code="LWO",
+            closest_big_city=self.lviv
+        )
+
+    def _fresh(self):
+        # Searches serve the previous index while a rebuild runs.
+        for index in (airport_index, city_index):
+            index.refresh_if_stale()
+            index.wait()
+
+    def _names(self, q, **params):
+        self._fresh()
+        res = self.client.get(AIRPORT_AUTOCOMPLETE_URL, {"q": q, **params})
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        return [airport["name"] for airport in res.data]
+
+    def test_ranking(self):
+        self._fresh()
+        res = self.client.get(AIRPORT_AUTOCOMPLETE_URL, {"q": "kbp"})
+        self.assertEqual(res.data, [{
+            "id": self.boryspil.id,
+            "name": "Boryspil International",
+            "code": "KBP",
+            "city_name": "Kyiv",
+            "country_name": "Ukraine",
+        }])
+        # Name before a city match.
+        self.assertEqual(self._names("kyi"),
+                         ["Kyiv Zhuliany", "Boryspil International"])
+        # Words inside the name.
+        self.assertEqual(self._names("intern"),
+                         ["Boryspil International",
+                          "Lviv Danylo Halytskyi International"])
+        self.assertEqual(self._names("danylo hal"),
+                         ["Lviv Danylo Halytskyi International"])
+        self.assertEqual(self._names("Львів"), [])
+        self.assertEqual(self._names("intern", limit=1),
+                         ["Boryspil International"])
+
+    def test_search_needs_no_query(self):
+        build_indexes()
+        airport_index.wait()
+        with self.assertNumQueries(0):
+            self.assertEqual(len(airport_index.search("kyiv")), 2)
+
+    def test_one_rebuild_at_a_time(self):
+        self._fresh()
+        self.assertIsNone(airport_index.refresh_if_stale())
+        release = threading.Event()
+        rows = airport_index.rows
+
+        def slow_rows():
+            release.wait()
+            return rows()
+
+        with mock.patch.object(airport_index, "rows", slow_rows), \
+                self.settings(AUTOCOMPLETE_INDEX={"TTL": -1}):
+            reloading = airport_index.refresh_if_stale()
+            self.assertIs(airport_index.refresh_if_stale(), reloading)
+            # The previous index is served meanwhile.
+            self.assertEqual(len(airport_index.search("kyiv")), 2)
+            release.set()
+            reloading.join()
+
+    def test_refreshed_on_writes(self):
+        self.assertEqual(self._names("zhu"), ["Kyiv Zhuliany"])
+        self.zhuliany.name = "Igor Sikorsky Kyiv International"
+        self.zhuliany.save()
+        self.assertEqual(self._names("zhu"), [])
+        self.assertEqual(self._names("sikorsky"),
+                         ["Igor Sikorsky Kyiv International"])
+
+        Airport.objects.create(name="Odesa International", code="ODS",
+                               closest_big_city=self.kyiv)
+        self.assertEqual(self._names("ods"), ["Odesa International"])
+
+        self.kyiv.name = "Kiev"
+        self.kyiv.save()
+        self.assertEqual(len(self._names("kiev")), 3)
+
+    def test_uncommitted_write(self):
+        self.assertEqual(self._names("zhu"), ["Kyiv Zhuliany"])
+        with transaction.atomic():
+            self.zhuliany.name = "Igor Sikorsky Kyiv International"
+            self.zhuliany.save()
+            # Versions only move once the write commits.
+            self.assertEqual(self._names("zhu"), ["Kyiv Zhuliany"])
+        self.assertEqual(self._names("zhu"), [])
+        self.assertEqual(self._names("igor"),
+                         ["Igor Sikorsky Kyiv International"])
+
+    def test_reloaded_after_ttl(self):
+        self.assertEqual(self._names("zhu"), ["Kyiv Zhuliany"])
+        # update() sends no signals, as a write on another worker with a
+        # per-process cache would not bump this worker's versions.
+        Airport.objects.filter(id=self.zhuliany.id).update(name="Sikorsky")
+        self.assertEqual(self._names("zhu"), ["Kyiv Zhuliany"])
+        with self.settings(AUTOCOMPLETE_INDEX={"TTL": 0}):
+            self.assertEqual(self._names("zhu"), [])
+
+    def test_validation(self):
+        res = self.client.get(AIRPORT_AUTOCOMPLETE_URL)
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        res = self.client.get(AIRPORT_AUTOCOMPLETE_URL,
+                              {"q": "k", "limit": 100})
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(self._names("--"), [])
+
+    def test_cities(self):
+        self._fresh()
+        res = self.client.get(CITY_AUTOCOMPLETE_URL, {"q": "ukr"})
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data, [
+            {"id": self.kyiv.id, "name": "Kyiv", "country_name": "Ukraine"},
+            {"id": self.lviv.id, "name": "Lviv", "country_name": "Ukraine"},
+        ])
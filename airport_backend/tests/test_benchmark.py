@@ -0,0 +1,102 @@
+import json
+import os
+import tempfile
+from io import StringIO
+
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase
+from django.contrib.auth import get_user_model
+
+from airport_backend.benchmark import compare, percentile
+from airport_backend.models import (AirplaneType,
+                                    Airport,
+                                    Country,
+                                    Crew,
+                                    Flight,
+                                    Order,
+                                    Ticket)
+
+
+DATASET = {"scale": "small", "seed": 7, "countries": 3, "cities": 6,
+           "airports": 8, "routes": 20, "airplanes": 4, "crew": 10,
+           "flights": 50, "users": 5, "orders": 30, "tickets": 45,
+           "batch_size": 20}
+
+
+def generate(**options):
+    call_command("generate_dataset", stdout=StringIO(),
+                 **{**DATASET, **options})
+
+
+class TestGenerateDataset(TestCase):
+
+    def test_counts_and_seat_counters(self):
+        generate()
+
+        self.assertEqual(Airport.objects.count(), 8)
+        self.assertEqual(Flight.objects.count(), 50)
+        self.assertEqual(Order.objects.count(), 30)
+        self.assertGreater(Ticket.objects.count(), 0)
+        for flight in Flight.objects.all():
+            self.assertEqual(flight.seats_sold,
+                             flight.ticket_flight.count())
+
+    def test_seeded(self):
+        def snapshot():
+            return list(Flight.objects.order_by("departure_time").values_list(
+                "route__source__name", "route__distance", "airplane__name",
+                "departure_time", "arrival_time"
+            ))
+
+        generate()
+        first = snapshot()
+        for model in (Country, AirplaneType, Crew, get_user_model()):
+            model.objects.all().delete()
+        generate()
+        self.assertEqual(snapshot(), first)
+
+
+class TestBenchmark(TestCase):
+
+    def setUp(self):
+        generate()
+        self.directory = tempfile.mkdtemp()
+        self.baseline = os.path.join(self.directory, "baseline.json")
+
+    def _benchmark(self, **options):
+        out = StringIO()
+        call_command("benchmark", stdout=out, iterations=3, warmup=1,
+                     host="testserver",
+                     baseline=self.baseline, **options)
+        return out.getvalue()
+
+    def test_save_and_compare(self):
+        output = self._benchmark(save_baseline=True)
+        self.assertIn("orders-create", output)
+        with open(self.baseline) as source:
+            baseline = json.load(source)
+        self.assertEqual(
+            set(baseline),
+            {"flights-list", "flights-list-filtered", "flights-retrieve",
+             "flights-create", "orders-list", "orders-retrieve",
+             "orders-create", "tickets-list", "tickets-retrieve"}
+        )
+        self.assertGreater(baseline["flights-list"]["queries"], 0)
+        self.assertEqual(Order.objects.count(), 30)
+
+        baseline["flights-retrieve"]["queries"] = 0
+        with open(self.baseline, "w") as target:
+            json.dump(baseline, target)
+        with self.assertRaisesMessage(CommandError, "flights-retrieve queries"):
+            self._benchmark(only=["flights-retrieve"])
+
+    def test_compare(self):
+        baseline = {"a": {"p50_ms": 10, "p95_ms": 20, "p99_ms": 30,
+                          "queries": 4, "peak_kib": 100}}
+        results = {"a": {"p50_ms": 13, "p95_ms": 40, "p99_ms": 30,
+                         "queries": 4, "peak_kib": 130}}
+        self.assertEqual(compare(results, baseline),
+                         ["a p95_ms: 40 > 26.0", "a peak_kib: 130 > 125.0"])
+        self.assertEqual(percentile([1, 2, 3, 4], 50), 2)
+        self.assertEqual(percentile([1, 2, 3, 4], 99), 4)
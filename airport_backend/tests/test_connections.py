@@ -0,0 +1,132 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.test import TestCase
+from django.urls import reverse
+from django.contrib.auth import get_user_model
+from django.utils import timezone
+
+from rest_framework.test import APIClient
+from rest_framework import status
+from airport_backend.connections import connection_index
+from airport_backend.models import (Flight,
+                                    Route,
+                                    Airplane,
+                                    Airport,
+                                    City,
+                                    Country,
+                                    AirplaneType)
+
+
+CONNECTIONS_URL = reverse("airport_backend:flight-connections")
+
+
+class TestConnectionSearch(TestCase):
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            email="test@test.test", password="testpassword"
+        )
+        self.client.force_authenticate(self.user)
+
+        country = Country.objects.create(name="Spain")
+        city = City.objects.create(name="Barcelona", country=country)
+        self.a, self.b, self.c, self.d = [
+            Airport.objects.create(name=name, closest_big_city=city)
+            for name in "ABCD"
+        ]
+        self.airplane = Airplane.objects.create(
+            name="Plane",
+            rows=10,
+            seats_in_row=4,
+            airplane_type=AirplaneType.objects.create(name="Small")
+        )
+        self.start = (timezone.now() + timedelta(days=1)).replace(
+            minute=0, second=0, microsecond=0
+        )
+        self.ab = self._flight(self.a, self.b, 500, hours=0, duration=2)
+        self.bc = self._flight(self.b, self.c, 400, hours=3, duration=2)
+        self.bc_tight = self._flight(self.b, self.c, 400, hours=2, duration=1)
+        self.cd = self._flight(self.c, self.d, 300, hours=6, duration=1)
+        self.ac = self._flight(self.a, self.c, 1500, hours=1, duration=3)
+        connection_index.load()
+
+    def _flight(self, source, destination, distance, hours, duration):
+        route, _ = Route.objects.get_or_create(source=source,
+                                               destination=destination,
+                                               defaults={"distance": distance})
+        departure = self.start + timedelta(hours=hours)
+        return Flight.objects.create(
+            route=route,
+            airplane=self.airplane,
+            departure_time=departure,
+            arrival_time=departure + timedelta(hours=duration, minutes=hours),
+        )
+
+    def _search(self, **params):
+        params.setdefault("departure_after", self.start.isoformat())
+        res = self.client.get(CONNECTIONS_URL, params)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        return [[leg["id"] for leg in itinerary["legs"]] for itinerary in res.data]
+
+    def test_direct_and_one_stop(self):
+        itineraries = self._search(source=self.a.id, destination=self.c.id)
+        self.assertIn([self.ac.id], itineraries)
+        self.assertIn([self.ab.id, self.bc.id], itineraries)
+        # 0 minutes on the ground in B is below the default minimum
+        self.assertNotIn([self.ab.id, self.bc_tight.id], itineraries)
+
+    def test_max_legs_and_distance(self):
+        self.assertEqual(
+            self._search(source=self.a.id, destination=self.d.id, max_legs=2),
+            [[self.ac.id, self.cd.id]]
+        )
+        self.assertEqual(
+            self._search(source=self.a.id, destination=self.d.id,
+                         max_legs=3, max_distance=1500),
+            [[self.ab.id, self.bc.id, self.cd.id]]
+        )
+
+    def test_index_follows_flight_changes(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.ac.delete()
+        self.assertNotIn([self.ac.id],
+                         self._search(source=self.a.id,
+                                      destination=self.c.id))
+
+    def test_ordered_and_limited(self):
+        itineraries = self._search(source=self.a.id, destination=self.c.id)
+        self.assertEqual(itineraries, [[self.ac.id], [self.ab.id, self.bc.id]])
+        self.assertEqual(
+            self._search(source=self.a.id, destination=self.c.id, limit=1),
+            [[self.ac.id]]
+        )
+
+    def test_expanded_legs_are_capped(self):
+        # Room for the first legs out of A only.
+        index = settings.CONNECTIONS_INDEX
+        with self.settings(CONNECTIONS_INDEX={**index,
+                                              "MAX_EXPANDED_LEGS": 2}):
+            self.assertEqual(
+                self._search(source=self.a.id, destination=self.d.id,
+                             max_legs=3),
+                []
+            )
+        self.assertEqual(
+            self._search(source=self.a.id, destination=self.d.id, max_legs=3),
+            [[self.ac.id, self.cd.id], [self.ab.id, self.bc.id, self.cd.id]]
+        )
+
+    def test_deleted_leg_drops_itinerary(self):
+        # The index only hears of the delete once it commits.
+        self.bc.delete()
+        self.assertEqual(
+            self._search(source=self.a.id, destination=self.c.id),
+            [[self.ac.id]]
+        )
+
+    def test_invalid_params(self):
+        res = self.client.get(CONNECTIONS_URL, {"source": self.a.id,
+                                                "destination": self.a.id})
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
@@ -0,0 +1,96 @@
+from django.contrib.auth import get_user_model
+from django.core.exceptions import ImproperlyConfigured
+from django.db import connection
+from django.test import SimpleTestCase, TestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from airport_backend.pooled_postgresql.base import DatabaseWrapper
+
+
+DB_POOL_METRICS_URL = reverse("airport_backend:db-pool-metrics")
+
+
+def pooled_wrapper(alias, **settings):
+    settings_dict = {
+        **connection.settings_dict,
+        "ENGINE": "airport_backend.pooled_postgresql",
+        "CONN_MAX_AGE": 0,
+        "CONN_HEALTH_CHECKS": True,
+        "OPTIONS": {"pool": {"min_size": 1, "max_size": 2, "timeout": 5}},
+        **settings,
+    }
+    return DatabaseWrapper(settings_dict, alias=alias)
+
+
+class TestPooledConnections(SimpleTestCase):
+    databases = {"default"}
+
+    def setUp(self):
+        self.wrapper = pooled_wrapper("pool_test")
+        self.addCleanup(self.wrapper.close_pool)
+        self.addCleanup(self.wrapper.close)
+
+    def test_connections_return_to_pool(self):
+        with self.wrapper.cursor() as cursor:
+            cursor.execute("SELECT 1")
+            self.assertEqual(cursor.fetchone(), (1,))
+        pg_connection = self.wrapper.connection
+        self.assertEqual(self.wrapper.pool_stats()["in_use"], 1)
+
+        self.wrapper.close()
+        self.assertIsNone(self.wrapper.connection)
+        stats = self.wrapper.pool_stats()
+        self.assertEqual(stats["in_use"], 0)
+        self.assertEqual(stats["checkouts"], 1)
+        self.assertFalse(pg_connection.closed)
+
+        # The next checkout reuses an idle connection.
+        with self.wrapper.cursor() as cursor:
+            cursor.execute("SELECT 1")
+        self.wrapper.close()
+        stats = self.wrapper.pool_stats()
+        self.assertEqual(stats["checkouts"], 2)
+        self.assertLessEqual(stats["size"], 2)
+        self.assertEqual(stats["idle"], stats["size"])
+
+    def test_needs_conn_max_age_zero(self):
+        wrapper = pooled_wrapper("pool_test_persistent", CONN_MAX_AGE=60)
+        with self.assertRaises(ImproperlyConfigured):
+            wrapper.pool
+
+    def test_without_pool_options(self):
+        wrapper = pooled_wrapper("pool_test_plain", OPTIONS={})
+        self.assertIsNone(wrapper.pool)
+        self.assertIsNone(wrapper.pool_stats())
+        with wrapper.cursor() as cursor:
+            cursor.execute("SELECT 1")
+        wrapper.close()
+
+
+class TestDatabasePoolMetrics(TestCase):
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            email="test@test.test", password="testpassword"
+        )
+
+    def test_metrics_need_admin(self):
+        self.client.force_authenticate(self.user)
+        res = self.client.get(DB_POOL_METRICS_URL)
+        self.assertEqual(res.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_metrics_per_database(self):
+        self.user.is_staff = True
+        self.user.save()
+        self.client.force_authenticate(self.user)
+        res = self.client.get(DB_POOL_METRICS_URL)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(set(res.data), {"default"})
+        # Null unless the suite runs with DB_POOL=true.
+        if connection.settings_dict["OPTIONS"].get("pool"):
+            self.assertEqual(res.data["default"]["in_use"], 1)
+        else:
+            self.assertIsNone(res.data["default"])
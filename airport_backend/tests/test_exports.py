@@ -0,0 +1,92 @@
+import csv
+import io
+import json
+
+from django.test import TestCase
+from django.urls import reverse
+from django.contrib.auth import get_user_model
+
+from rest_framework.test import APIClient
+from rest_framework import status
+from airport_backend.models import Order, Ticket
+from airport_backend.tests.samples import sample_flights
+
+
+FLIGHTS_EXPORT_URL = reverse("airport_backend:flight-export")
+TICKETS_EXPORT_URL = reverse("airport_backend:ticket-export")
+
+
+def manifest_url(flight_id):
+    return reverse("airport_backend:flight-manifest", args=(flight_id,))
+
+
+def content(response):
+    return b"".join(response.streaming_content).decode()
+
+
+class TestExports(TestCase):
+
+    def setUp(self):
+        self.client = APIClient()
+        self.admin = get_user_model().objects.create_user(
+            email="admin@admin.admin",
+            password="admintestpassword",
+            is_staff=True,
+            first_name="Ann",
+        )
+        self.user = get_user_model().objects.create_user(
+            email="test@test.test", password="testpassword"
+        )
+        self.flights = sample_flights()
+        order = Order.objects.create(user=self.admin)
+        Ticket.objects.create(flight=self.flights[0], row=2, seat=1, order=order)
+        Ticket.objects.create(flight=self.flights[0], row=1, seat=3, order=order)
+
+    def test_flights_csv(self):
+        self.client.force_authenticate(self.user)
+        res = self.client.get(FLIGHTS_EXPORT_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res["Content-Type"], "text/csv")
+        rows = list(csv.DictReader(io.StringIO(content(res))))
+        self.assertEqual([int(row["id"]) for row in rows],
+                         [flight.id for flight in self.flights])
+        self.assertEqual(rows[0]["tickets_available"], "28")
+        self.assertEqual(rows[0]["departure_time"], "2025-08-11T08:00:00+00:00")
+
+    def test_flights_ndjson_with_filters(self):
+        self.client.force_authenticate(self.user)
+        res = self.client.get(FLIGHTS_EXPORT_URL,
+                              {"output": "ndjson",
+                               "departure_time": "2025-08-12"})
+
+        rows = [json.loads(line) for line in content(res).splitlines()]
+        self.assertEqual([row["id"] for row in rows], [self.flights[1].id])
+        self.assertEqual(rows[0]["route_source"], "Source")
+
+    def test_unknown_output(self):
+        self.client.force_authenticate(self.user)
+        res = self.client.get(FLIGHTS_EXPORT_URL, {"output": "xml"})
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_manifest_is_admin_only(self):
+        self.client.force_authenticate(self.user)
+        res = self.client.get(manifest_url(self.flights[0].id))
+        self.assertEqual(res.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_manifest(self):
+        self.client.force_authenticate(self.admin)
+        res = self.client.get(manifest_url(self.flights[0].id))
+
+        rows = list(csv.DictReader(io.StringIO(content(res))))
+        self.assertEqual([(row["row"], row["seat"]) for row in rows],
+                         [("1", "3"), ("2", "1")])
+        self.assertEqual(rows[0]["first_name"], "Ann")
+
+    def test_tickets_export(self):
+        self.client.force_authenticate(self.admin)
+        res = self.client.get(TICKETS_EXPORT_URL, {"output": "ndjson"})
+
+        rows = [json.loads(line) for line in content(res).splitlines()]
+        self.assertEqual(len(rows), 2)
+        self.assertEqual(rows[0]["email"], "admin@admin.admin")
@@ -0,0 +1,114 @@
+from django.test import TestCase
+from django.urls import reverse
+from django.contrib.auth import get_user_model
+
+from rest_framework.test import APIClient
+from rest_framework import status
+from airport_backend.fieldsets import parse_paths, related_lookups
+from airport_backend.models import Crew, Order, Ticket
+from airport_backend.serializers import OrderListSerializer
+from airport_backend.tests.samples import sample_flights
+
+
+ORDERS_LIST_URL = reverse("airport_backend:order-list")
+TICKETS_LIST_URL = reverse("airport_backend:ticket-list")
+FLIGHTS_LIST_URL = reverse("airport_backend:flight-list")
+
+
+def flight_detail_url(flight_id):
+    return reverse("airport_backend:flight-detail", args=(flight_id,))
+
+
+class TestParsePaths(TestCase):
+
+    def test_parse(self):
+        self.assertIsNone(parse_paths(None))
+        self.assertEqual(parse_paths(""), {})
+        self.assertEqual(
+            parse_paths("id, tickets.row,tickets.flight.id,,"),
+            {"id": {}, "tickets": {"row": {}, "flight": {"id": {}}}}
+        )
+
+    def test_related_lookups(self):
+        select, prefetch = related_lookups(OrderListSerializer())
+        self.assertEqual(select, [])
+        self.assertIn("tickets__flight__route__source", prefetch)
+        self.assertIn("tickets__flight__crew", prefetch)
+
+        select, prefetch = related_lookups(OrderListSerializer(
+            fields=parse_paths("id,tickets"), expand={}
+        ))
+        self.assertEqual((select, prefetch), ([], ["tickets"]))
+
+
+class TestSparseFieldsets(TestCase):
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            email="test@test.test", password="testpassword", is_staff=True
+        )
+        self.client.force_authenticate(self.user)
+        self.flights = sample_flights()
+        self.flights[0].crew.add(
+            Crew.objects.create(first_name="Martha", last_name="Dumych")
+        )
+        self.order = Order.objects.create(user=self.user)
+        self.ticket = Ticket.objects.create(flight=self.flights[0], row=1,
+                                            seat=2, order=self.order)
+
+    def test_default_shape_is_unchanged(self):
+        res = self.client.get(ORDERS_LIST_URL)
+        ticket = res.data["results"][0]["tickets"][0]
+        self.assertEqual(ticket["flight"]["crew"], ["Martha Dumych"])
+        self.assertEqual(ticket["flight"]["route_source"], "Source")
+
+    def test_order_count_badge_skips_tickets(self):
+        with self.assertNumQueries(1):
+            res = self.client.get(ORDERS_LIST_URL, {"fields": "id"})
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data["results"], [{"id": self.order.id}])
+
+    def test_collapsed_and_expanded(self):
+        with self.assertNumQueries(2):
+            res = self.client.get(ORDERS_LIST_URL, {"expand": ""})
+        self.assertEqual(res.data["results"][0]["tickets"], [self.ticket.id])
+
+        res = self.client.get(ORDERS_LIST_URL, {"fields": "tickets.row,tickets.flight",
+                                                "expand": "tickets"})
+        self.assertEqual(res.data["results"],
+                         [{"tickets": [{"row": 1, "flight": self.flights[0].id}]}])
+
+    def test_nested_fields(self):
+        with self.assertNumQueries(1):
+            res = self.client.get(TICKETS_LIST_URL,
+                                  {"fields": "id,flight.route_source"})
+        self.assertEqual(res.data["results"],
+                         [{"id": self.ticket.id,
+                           "flight": {"route_source": "Source"}}])
+
+    def test_flight_list_projection(self):
+        res = self.client.get(FLIGHTS_LIST_URL, {"fields": "id,crew"})
+        self.assertEqual(res.data["results"], [
+            {"id": self.flights[0].id, "crew": ["Martha Dumych"]},
+            {"id": self.flights[1].id, "crew": []},
+        ])
+        self.assertIsNotNone(
+            self.client.get(FLIGHTS_LIST_URL, {"fields": "crew",
+                                               "page_size": 1}).data["next"]
+        )
+
+    def test_flight_retrieve_expand(self):
+        res = self.client.get(flight_detail_url(self.flights[0].id),
+                              {"fields": "route,airplane",
+                               "expand": "route"})
+        self.assertEqual(res.data["airplane"], self.flights[0].airplane_id)
+        self.assertEqual(res.data["route"]["source_name"], "Source")
+        self.assertEqual(res.data["route"]["source_city"], "Barcelona, Spain")
+
+    def test_unknown_fields(self):
+        res = self.client.get(ORDERS_LIST_URL, {"fields": "id,price",
+                                                "expand": "id"})
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(res.data["fields"], ["Unknown field: price"])
+        self.assertEqual(res.data["expand"], ["Not an expandable field: id"])
@@ -0,0 +1,172 @@
+from datetime import date, datetime, time, timedelta, timezone
+
+from django.test import TestCase
+from django.urls import reverse
+from django.contrib.auth import get_user_model
+
+from rest_framework.test import APIClient
+from rest_framework import status
+from airport_backend.models import Crew, Flight, FlightSchedule, Route
+from airport_backend.schedules import insert_flights, materialize_schedules
+from airport_backend.tests.samples import sample_flights
+
+
+SCHEDULE_LIST_URL = reverse("airport_backend:flightschedule-list")
+MATERIALIZE_URL = reverse("airport_backend:flightschedule-materialize")
+
+
+class TestMaterializeSchedules(TestCase):
+
+    def setUp(self):
+        self.flights = sample_flights()
+        self.schedule = FlightSchedule.objects.create(
+            route=self.flights[0].route,
+            airplane=self.flights[0].airplane,
+            days_of_week="1234567",
+            departure_time=time(10, 0),
+            duration=timedelta(hours=1, minutes=20),
+            timezone="Europe/Madrid",
+            valid_from=date(2025, 8, 10),
+            valid_until=date(2025, 8, 16),
+        )
+        self.schedule.crew.set([
+            Crew.objects.create(first_name="Martha", last_name="Dumych"),
+            Crew.objects.create(first_name="Ivan", last_name="Petrenko"),
+        ])
+
+    def test_materialize_is_idempotent(self):
+        # 10:00 in Madrid is 08:00 UTC, already taken on the 11th and 12th.
+        # schedules, crew, existing flights, savepoint, flights, crew rows,
+        # release savepoint
+        with self.assertNumQueries(7):
+            result = materialize_schedules(days=30, start=date(2025, 8, 1))
+        self.assertEqual(tuple(result), (5, 0, 2))
+
+        flights = self.schedule.flights.order_by("departure_time")
+        self.assertEqual(flights[0].departure_time,
+                         datetime(2025, 8, 10, 8, tzinfo=timezone.utc))
+        self.assertEqual(flights[0].arrival_time,
+                         datetime(2025, 8, 10, 9, 20, tzinfo=timezone.utc))
+        self.assertEqual(Flight.crew.through.objects.count(), 10)
+
+        result = materialize_schedules(days=30, start=date(2025, 8, 1))
+        self.assertEqual(tuple(result), (0, 5, 2))
+        self.assertEqual(Flight.objects.count(), 7)
+
+    def test_rolling_horizon_and_weekdays(self):
+        self.schedule.days_of_week = "37"
+        self.schedule.save()
+
+        result = materialize_schedules(days=3, start=date(2025, 8, 10))
+        self.assertEqual(result.created, 1)
+        result = materialize_schedules(days=3, start=date(2025, 8, 12))
+        self.assertEqual(result.created, 1)
+        self.assertEqual(
+            [flight.departure_time.date() for flight in
+             self.schedule.flights.order_by("departure_time")],
+            [date(2025, 8, 10), date(2025, 8, 13)]
+        )
+
+    def test_same_time_on_other_routes(self):
+        route = self.schedule.route
+        back = Route.objects.create(source=route.destination,
+                                    destination=route.source,
+                                    distance=route.distance)
+        FlightSchedule.objects.create(
+            route=back,
+            airplane=self.schedule.airplane,
+            days_of_week="1234567",
+            departure_time=time(10, 0),
+            duration=timedelta(hours=1, minutes=20),
+            timezone="Europe/Madrid",
+            valid_from=date(2025, 8, 10),
+            valid_until=date(2025, 8, 16),
+        )
+        # A second timetable of the first route clashes with it.
+        FlightSchedule.objects.create(
+            route=route,
+            airplane=self.schedule.airplane,
+            days_of_week="1",
+            departure_time=time(10, 0),
+            duration=timedelta(hours=2),
+            timezone="Europe/Madrid",
+            valid_from=date(2025, 8, 10),
+            valid_until=date(2025, 8, 16),
+        )
+
+        result = materialize_schedules(days=30, start=date(2025, 8, 1))
+        self.assertEqual(tuple(result), (12, 0, 3))
+        self.assertEqual(
+            Flight.objects.filter(
+                departure_time=datetime(2025, 8, 13, 8, tzinfo=timezone.utc)
+            ).count(),
+            2
+        )
+
+    def test_concurrent_insert_is_skipped(self):
+        flight = Flight(route_id=self.schedule.route_id,
+                        airplane_id=self.schedule.airplane_id,
+                        schedule=self.schedule,
+                        departure_time=datetime(2025, 8, 13, 8,
+                                                tzinfo=timezone.utc),
+                        arrival_time=datetime(2025, 8, 13, 9, 20,
+                                              tzinfo=timezone.utc))
+        self.assertEqual(insert_flights([flight]), [flight])
+        self.assertIsNotNone(flight.pk)
+        again = Flight(route_id=flight.route_id,
+                       airplane_id=flight.airplane_id,
+                       departure_time=flight.departure_time,
+                       arrival_time=flight.arrival_time)
+        self.assertEqual(insert_flights([again]), [])
+
+        result = materialize_schedules(days=30, start=date(2025, 8, 1))
+        self.assertEqual(tuple(result), (4, 1, 2))
+
+
+class TestFlightScheduleApi(TestCase):
+
+    def setUp(self):
+        self.client = APIClient()
+        self.admin = get_user_model().objects.create_user(
+            email="admin@admin.admin",
+            password="admintestpassword",
+            is_staff=True
+        )
+        self.user = get_user_model().objects.create_user(
+            email="test@test.test", password="testpassword"
+        )
+        self.flight = sample_flights()[0]
+        self.payload = {
+            "route": self.flight.route_id,
+            "airplane": self.flight.airplane_id,
+            "days_of_week": "15",
+            "departure_time": "10:00",
+            "duration": "01:20:00",
+            "timezone": "Europe/Madrid",
+            "valid_from": "2025-09-01",
+            "valid_until": "2025-09-30",
+        }
+
+    def test_create_and_materialize(self):
+        self.client.force_authenticate(self.admin)
+        res = self.client.post(SCHEDULE_LIST_URL, self.payload)
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+
+        res = self.client.post(MATERIALIZE_URL,
+                               {"start": "2025-09-01", "days": 7})
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data, {"created": 2, "existing": 0, "conflicts": 0})
+
+    def test_invalid_schedule(self):
+        self.client.force_authenticate(self.admin)
+        res = self.client.post(SCHEDULE_LIST_URL,
+                               {**self.payload,
+                                "days_of_week": "08",
+                                "valid_until": "2025-08-01"})
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(set(res.data), {"days_of_week", "valid_until"})
+
+    def test_materialize_is_admin_only(self):
+        self.client.force_authenticate(self.user)
+        res = self.client.post(MATERIALIZE_URL, {})
+        self.assertEqual(res.status_code, status.HTTP_403_FORBIDDEN)
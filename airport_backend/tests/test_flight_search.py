@@ -0,0 +1,88 @@
+from django.test import TestCase
+from django.urls import reverse
+from django.contrib.auth import get_user_model
+
+from rest_framework.test import APIClient
+from rest_framework import status
+from airport_backend.models import (Flight,
+                                    Route,
+                                    Airplane,
+                                    Airport,
+                                    City,
+                                    Country,
+                                    AirplaneType)
+
+
+FLIGHTS_LIST_URL = reverse("airport_backend:flight-list")
+
+
+class TestFlightSearch(TestCase):
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            email="test@test.test", password="testpassword"
+        )
+        self.client.force_authenticate(self.user)
+
+        country = Country.objects.create(name="Ukraine")
+        city = City.objects.create(name="Kyiv", country=country)
+        source = Airport.objects.create(name="A", closest_big_city=city)
+        destination = Airport.objects.create(name="B", closest_big_city=city)
+        route = Route.objects.create(source=source,
+                                     destination=destination,
+                                     distance=500)
+        airplane = Airplane.objects.create(
+            name="Plane",
+            rows=10,
+            seats_in_row=4,
+            airplane_type=AirplaneType.objects.create(name="Small")
+        )
+        self.late = Flight.objects.create(
+            route=route,
+            airplane=airplane,
+            departure_time="2025-08-10T22:30:00Z",
+            arrival_time="2025-08-11T00:30:00Z",
+        )
+        self.morning = Flight.objects.create(
+            route=route,
+            airplane=airplane,
+            departure_time="2025-08-10T08:00:00Z",
+            arrival_time="2025-08-10T10:00:00Z",
+        )
+
+    def _ids(self, params):
+        res = self.client.get(FLIGHTS_LIST_URL, params)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        return [flight["id"] for flight in res.data["results"]]
+
+    def test_departure_date(self):
+        self.assertEqual(self._ids({"departure_time": "2025-08-10"}),
+                         [self.morning.id, self.late.id])
+
+    def test_arrival_date(self):
+        self.assertEqual(self._ids({"arrival_time": "2025-08-11"}),
+                         [self.late.id])
+
+    def test_date_in_time_zone(self):
+        # 22:30 UTC is already August 11th in Kyiv
+        self.assertEqual(
+            self._ids({"departure_time": "2025-08-11", "tz": "Europe/Kyiv"}),
+            [self.late.id]
+        )
+
+    def test_departure_window(self):
+        self.assertEqual(
+            self._ids({"departure_after": "2025-08-10T09:00:00Z",
+                       "departure_before": "2025-08-11T00:00:00Z"}),
+            [self.late.id]
+        )
+
+    def test_invalid_params(self):
+        for params in ({"source": "1,x"},
+                       {"departure_time": "10.08.2025"},
+                       {"tz": "Mars/Olympus"},
+                       {"departure_after": "2025-08-11T00:00:00Z",
+                        "departure_before": "2025-08-10T00:00:00Z"}):
+            res = self.client.get(FLIGHTS_LIST_URL, params)
+            self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
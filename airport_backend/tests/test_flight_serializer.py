@@ -13,6 +13,7 @@ from airport_backend.models import (Flight,
                                     AirplaneType, Crew)
 from airport_backend.serializers import (FlightListSerializer,
                                          FlightRetrieveSerialzier)
+from airport_backend.tests.samples import sample_flights
 
 FLIGHTS_LIST_URL = reverse("airport_backend:flight-list")
 
@@ -80,6 +81,22 @@ class TestAuthenticated(TestCase):
         serializer = FlightListSerializer(flights, many=True)
         self.assertEqual(res.status_code, status.HTTP_200_OK)
         self.assertEqual(res.data["results"], serializer.data)
+
+    def test_list_projection_renders_like_instances(self):
+        flights = sample_flights()
+        flights[0].crew.add(
+            Crew.objects.create(first_name="Martha", last_name="Dumych")
+        )
+        with self.assertNumQueries(1):
+            rows = list(FlightListSerializer.project(
+                Flight.objects.order_by("id")
+            ))
+        self.assertEqual(
+            FlightListSerializer(rows, many=True).data,
+            FlightListSerializer(Flight.objects.order_by("id"), many=True).data
+        )
+        self.assertEqual(rows[0]["crew_names"], ["Martha Dumych"])
+        self.assertEqual(rows[1]["crew_names"], [])
     
 
     def test_create_flight(self):
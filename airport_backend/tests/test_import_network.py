@@ -0,0 +1,157 @@
+import json
+import os
+import tempfile
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase
+
+from airport_backend.models import (Airplane,
+                                    AirplaneType,
+                                    Airport,
+                                    City,
+                                    Country,
+                                    Flight,
+                                    Route)
+
+
+OPENFLIGHTS_AIRPORTS = (
+    '1,"Boryspil International Airport","Kyiv","Ukraine","KBP","UKBB",'
+    '50.345001,30.894699,427,2,"E","Europe/Kiev","airport","OurAirports"\n'
+    '2,"Lviv International Airport","Lviv","Ukraine","LWO","UKLL",'
+    '49.8125,23.9561,1071,2,"E","Europe/Kiev","airport","OurAirports"\n'
+    '3,"Warsaw Chopin Airport","Warsaw","Poland","WAW","EPWA",'
+    '52.165699,20.967100,362,1,"E","Europe/Warsaw","airport","OurAirports"\n'
+    '4,"Unnamed Strip",\\N,"Poland",\\N,\\N,0,0,0,1,"E",\\N,"airport","User"\n'
+)
+OPENFLIGHTS_ROUTES = (
+    "PS,1,KBP,1,LWO,2,,0,738\n"
+    "LO,2,KBP,1,WAW,3,,0,E75\n"
+    "PS,1,KBP,1,WAW,3,Y,0,738\n"
+    "XX,9,KBP,1,JFK,\\N,,0,738\n"
+)
+
+
+class TestImportNetwork(TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        airplane_type = AirplaneType.objects.create(name="Jet")
+        self.airplane = Airplane.objects.create(name="Boeing",
+                                                rows=10,
+                                                seats_in_row=4,
+                                                airplane_type=airplane_type)
+
+    def _file(self, name, content):
+        path = os.path.join(self.directory, name)
+        with open(path, "w", encoding="utf-8") as target:
+            target.write(content)
+        return path
+
+    def _import(self, **options):
+        out = StringIO()
+        call_command("import_network", stdout=out, **options)
+        return out.getvalue()
+
+    def test_openflights_airports_and_routes(self):
+        output = self._import(
+            airports=self._file("airports.dat", OPENFLIGHTS_AIRPORTS),
+            routes=self._file("routes.dat", OPENFLIGHTS_ROUTES),
+            openflights=True,
+        )
+
+        self.assertIn("Airports: 3 imported, 1 skipped", output)
+        self.assertIn("Routes: 2 created, 0 updated, 1 skipped", output)
+        self.assertEqual(set(Country.objects.values_list("name", flat=True)),
+                         {"Ukraine", "Poland"})
+        kyiv = Airport.objects.get(code="KBP")
+        self.assertEqual(kyiv.closest_big_city.name, "Kyiv")
+        route = Route.objects.get(source=kyiv,
+                                  destination__code="LWO")
+        self.assertAlmostEqual(route.distance, 498, delta=5)
+
+    def test_reimport_upserts(self):
+        City.objects.create(name="Kyiv",
+                            country=Country.objects.create(name="Somewhere"))
+        Airport.objects.create(name="Boryspil International Airport",
+                               closest_big_city=City.objects.get(name="Kyiv"))
+        airports = self._file("airports.dat", OPENFLIGHTS_AIRPORTS)
+        self._import(airports=airports, openflights=True)
+        self._import(airports=airports, openflights=True)
+
+        self.assertEqual(Airport.objects.count(), 3)
+        self.assertEqual(City.objects.get(name="Kyiv").country.name, "Ukraine")
+        self.assertEqual(
+            Airport.objects.get(name="Boryspil International Airport").code,
+            "KBP"
+        )
+
+        routes = self._file("routes.csv",
+                            "source,destination,distance\n"
+                            "KBP,LWO,470\n"
+                            "LWO,KBP,470\n")
+        self._import(routes=routes)
+        routes = self._file("routes.csv",
+                            "source,destination,distance\n"
+                            "KBP,LWO,480\n")
+        output = self._import(routes=routes)
+
+        self.assertIn("Routes: 0 created, 1 updated, 0 skipped", output)
+        self.assertEqual(Route.objects.count(), 2)
+        self.assertEqual(Route.objects.get(source__code="KBP").distance, 480)
+
+    def test_invalid_distance_is_skipped(self):
+        self._import(airports=self._file("airports.dat", OPENFLIGHTS_AIRPORTS),
+                     openflights=True)
+        routes = self._file("routes.csv",
+                            "source,destination,distance\n"
+                            "KBP,LWO,far\n"
+                            "KBP,WAW,800\n")
+        err = StringIO()
+        output = self._import(routes=routes, stderr=err)
+
+        self.assertIn("Routes: 1 created, 0 updated, 1 skipped", output)
+        self.assertIn("KBP-LWO: invalid distance 'far'", err.getvalue())
+
+    def _schedules(self):
+        self._import(
+            airports=self._file("airports.dat", OPENFLIGHTS_AIRPORTS),
+            routes=self._file("routes.dat", OPENFLIGHTS_ROUTES),
+            openflights=True,
+        )
+        records = [
+            {"source": "KBP", "destination": "LWO", "airplane": "Boeing",
+             "departure_time": "2025-08-11T08:00:00+03:00",
+             "arrival_time": "2025-08-11T09:10:00+03:00"},
+            {"source": "kbp", "destination": "waw", "airplane": "Boeing",
+             "departure_time": "2025-08-11T10:00:00",
+             "arrival_time": "2025-08-11T11:30:00"},
+            # Same departure as the first flight, on another route.
+            {"source": "KBP", "destination": "WAW", "airplane": "Boeing",
+             "departure_time": "2025-08-11T08:00:00+03:00",
+             "arrival_time": "2025-08-11T09:10:00+03:00"},
+            {"source": "LWO", "destination": "WAW", "airplane": "Boeing",
+             "departure_time": "2025-08-11T12:00:00",
+             "arrival_time": "2025-08-11T13:30:00"},
+        ]
+        return self._file("schedules.jsonl",
+                          "\n".join(json.dumps(record) for record in records))
+
+    def test_schedules_copy(self):
+        schedules = self._schedules()
+        output = self._import(schedules=schedules)
+        self.assertIn("Flights: 3 inserted, 1 skipped", output)
+
+        output = self._import(schedules=schedules)
+        self.assertIn("Flights: 0 inserted, 1 skipped", output)
+        self.assertEqual(Flight.objects.count(), 3)
+        flight = Flight.objects.get(route__destination__code="LWO")
+        self.assertEqual(flight.tickets_available, 40)
+
+    def test_schedules_bulk_create(self):
+        output = self._import(schedules=self._schedules(), no_copy=True)
+        self.assertIn("Flights: 3 inserted, 1 skipped", output)
+
+        output = self._import(schedules=self._schedules(), no_copy=True)
+        self.assertIn("Flights: 0 inserted, 1 skipped", output)
+        self.assertEqual(Flight.objects.count(), 3)
@@ -0,0 +1,183 @@
+import json
+from base64 import urlsafe_b64encode
+from datetime import datetime, timedelta, timezone
+
+from django.test import TestCase
+from django.urls import reverse
+from django.contrib.auth import get_user_model
+
+from rest_framework.test import APIClient
+from rest_framework import status
+from airport_backend.models import (Flight,
+                                    Route,
+                                    Airplane,
+                                    Airport,
+                                    City,
+                                    Country,
+                                    AirplaneType,
+                                    Order)
+
+
+FLIGHTS_LIST_URL = reverse("airport_backend:flight-list")
+ORDERS_LIST_URL = reverse("airport_backend:order-list")
+TICKETS_LIST_URL = reverse("airport_backend:ticket-list")
+
+
+def cursor(position, reverse=0):
+    return urlsafe_b64encode(
+        json.dumps({"p": position, "r": reverse}).encode()
+    ).decode()
+
+
+class TestFlightKeysetPagination(TestCase):
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            email="test@test.test", password="testpassword"
+        )
+        self.client.force_authenticate(self.user)
+
+        country = Country.objects.create(name="Spain")
+        city = City.objects.create(name="Barcelona", country=country)
+        self.source = Airport.objects.create(name="A", closest_big_city=city)
+        other = Airport.objects.create(name="B", closest_big_city=city)
+        route = Route.objects.create(source=self.source,
+                                     destination=other,
+                                     distance=500)
+        back_route = Route.objects.create(source=other,
+                                          destination=self.source,
+                                          distance=500)
+        airplane = Airplane.objects.create(
+            name="Plane",
+            rows=10,
+            seats_in_row=4,
+            airplane_type=AirplaneType.objects.create(name="Small")
+        )
+        start = datetime(2025, 8, 10, 8, tzinfo=timezone.utc)
+        self.flights = []
+        # Created out of departure order, every third one on another route.
+        for hours in (5, 1, 4, 0, 3, 2, 6):
+            departure = start + timedelta(hours=hours)
+            self.flights.append(Flight.objects.create(
+                route=back_route if hours % 3 == 0 else route,
+                airplane=airplane,
+                departure_time=departure,
+                arrival_time=departure + timedelta(minutes=90),
+            ))
+
+    def _walk(self, params):
+        ids = []
+        res = self.client.get(FLIGHTS_LIST_URL, params)
+        while True:
+            self.assertEqual(res.status_code, status.HTTP_200_OK)
+            ids.extend(flight["id"] for flight in res.data["results"])
+            if not res.data["next"]:
+                return ids, res
+            res = self.client.get(res.data["next"])
+
+    def test_walks_all_pages_in_departure_order(self):
+        ids, _ = self._walk({"page_size": 2})
+        expected = [flight.id for flight in
+                    sorted(self.flights, key=lambda f: f.departure_time)]
+        self.assertEqual(ids, expected)
+
+    def test_cursor_keeps_filters(self):
+        ids, _ = self._walk({"page_size": 2, "source": self.source.id})
+        expected = [flight.id for flight in
+                    sorted(self.flights, key=lambda f: f.departure_time)
+                    if flight.route.source_id == self.source.id]
+        self.assertEqual(ids, expected)
+
+    def test_previous_link(self):
+        first = self.client.get(FLIGHTS_LIST_URL, {"page_size": 3})
+        self.assertIsNone(first.data["previous"])
+        second = self.client.get(first.data["next"])
+        back = self.client.get(second.data["previous"])
+        self.assertEqual(back.data["results"], first.data["results"])
+
+    def test_total_is_opt_in(self):
+        res = self.client.get(FLIGHTS_LIST_URL)
+        self.assertNotIn("count", res.data)
+        res = self.client.get(FLIGHTS_LIST_URL, {"with_total": "true"})
+        self.assertIsInstance(res.data["count"], int)
+
+    def test_invalid_cursor(self):
+        res = self.client.get(FLIGHTS_LIST_URL, {"cursor": "garbage"})
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
+        for position in (["notadate", 1], ["2025-08-10T08:00:00Z", "abc"],
+                         [None, 1], [5, [1]]):
+            with self.subTest(position):
+                res = self.client.get(FLIGHTS_LIST_URL,
+                                      {"cursor": cursor(position)})
+                self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
+
+
+class TestOrderKeysetPagination(TestCase):
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            email="test@test.test", password="testpassword"
+        )
+        self.client.force_authenticate(self.user)
+        self.start = datetime(2025, 8, 10, 8, tzinfo=timezone.utc)
+        # Two orders share a timestamp, the id breaks the tie.
+        self.orders = [
+            Order.objects.create(user=self.user,
+                                 created_at=self.start + timedelta(hours=hours))
+            for hours in (3, 0, 2, 2, 5)
+        ]
+        other = get_user_model().objects.create_user(
+            email="other@test.test", password="testpassword"
+        )
+        Order.objects.create(user=other, created_at=self.start)
+
+    def _walk(self, params):
+        ids = []
+        res = self.client.get(ORDERS_LIST_URL, params)
+        while True:
+            self.assertEqual(res.status_code, status.HTTP_200_OK)
+            ids.extend(order["id"] for order in res.data["results"])
+            if not res.data["next"]:
+                return ids
+            res = self.client.get(res.data["next"])
+
+    def _newest_first(self, orders):
+        return [order.id for order in
+                sorted(orders, key=lambda o: (o.created_at, o.id), reverse=True)]
+
+    def test_newest_first(self):
+        self.assertEqual(self._walk({"page_size": 2}),
+                         self._newest_first(self.orders))
+
+    def test_previous_link(self):
+        first = self.client.get(ORDERS_LIST_URL, {"page_size": 2})
+        second = self.client.get(first.data["next"])
+        back = self.client.get(second.data["previous"])
+        self.assertEqual(back.data["results"], first.data["results"])
+
+    def test_invalid_cursor(self):
+        res = self.client.get(ORDERS_LIST_URL,
+                              {"cursor": cursor(["notadate", 1])})
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
+
+        self.user.is_staff = True
+        self.user.save()
+        res = self.client.get(TICKETS_LIST_URL, {"cursor": cursor(["abc"])})
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_time_window(self):
+        ids = self._walk({"page_size": 2,
+                          "since": (self.start + timedelta(hours=2)).isoformat(),
+                          "until": (self.start + timedelta(hours=5)).isoformat()})
+        self.assertEqual(ids, self._newest_first(
+            [order for order in self.orders if order.created_at.hour in (10, 11)]
+        ))
+
+    def test_empty_time_window(self):
+        res = self.client.get(ORDERS_LIST_URL, {
+            "since": self.start.isoformat(),
+            "until": self.start.isoformat(),
+        })
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
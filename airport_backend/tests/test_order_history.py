@@ -0,0 +1,119 @@
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from airport_backend.models import Crew, Order, OrderSummary, Ticket
+from airport_backend.tests.samples import sample_flights
+
+
+ORDERS_LIST_URL = reverse("airport_backend:order-list")
+
+
+def order_detail_url(order_id):
+    return reverse("airport_backend:order-detail", args=(order_id,))
+
+
+class TestOrderHistory(TestCase):
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            email="test@test.test", password="testpassword"
+        )
+        self.client.force_authenticate(self.user)
+        self.flights = sample_flights()
+        self.crew = Crew.objects.create(first_name="Martha", last_name="Dumych")
+        self.flights[0].crew.add(self.crew)
+        with self.captureOnCommitCallbacks(execute=True):
+            res = self.client.post(ORDERS_LIST_URL, {"tickets": [
+                {"flight": self.flights[0].id, "row": 1, "seat": 2},
+                {"flight": self.flights[1].id, "row": 1, "seat": 1},
+            ]}, format="json")
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.order = Order.objects.get(id=res.data["id"])
+
+    def _tickets(self, **params):
+        res = self.client.get(ORDERS_LIST_URL, params)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        return res.data["results"][0]["tickets"]
+
+    def _flight(self, tickets, flight):
+        return next(ticket["flight"] for ticket in tickets
+                    if ticket["flight"]["id"] == flight.id)
+
+    def _from_tickets(self):
+        # Any ?fields= renders from the tickets instead of the summary.
+        return self._tickets(fields="id,created_at,tickets")
+
+    def test_list_is_two_queries(self):
+        self.assertTrue(OrderSummary.objects.filter(order=self.order).exists())
+        # The page of orders, then the seats left on all of its flights.
+        with self.assertNumQueries(2):
+            tickets = self._tickets()
+        self.assertEqual(tickets, self._from_tickets())
+        flight = self._flight(tickets, self.flights[0])
+        self.assertEqual(flight["crew"], ["Martha Dumych"])
+        self.assertEqual(flight["tickets_available"], 29)
+
+    def test_retrieve(self):
+        with self.assertNumQueries(2):
+            res = self.client.get(order_detail_url(self.order.id))
+        self.assertEqual(res.data["user"]["email"], "test@test.test")
+        self.assertEqual(
+            res.data["tickets"],
+            self.client.get(order_detail_url(self.order.id),
+                            {"fields": "tickets"}).data["tickets"]
+        )
+
+    def test_seats_left_are_live(self):
+        other = Order.objects.create(user=self.user)
+        with self.captureOnCommitCallbacks(execute=True):
+            Ticket.objects.create(flight=self.flights[0], row=5, seat=1,
+                                  order=other)
+        res = self.client.get(order_detail_url(self.order.id))
+        flight = self._flight(res.data["tickets"], self.flights[0])
+        self.assertEqual(flight["tickets_available"], 28)
+
+    def test_flight_changes_refresh_summaries(self):
+        source = self.flights[0].route.source
+        with self.captureOnCommitCallbacks(execute=True):
+            source.name = "Renamed"
+            source.save()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.crew.last_name = "Married"
+            self.crew.save()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.flights[1].crew.add(self.crew)
+
+        tickets = self._tickets()
+        self.assertEqual(tickets, self._from_tickets())
+        for flight in self.flights:
+            flight = self._flight(tickets, flight)
+            self.assertEqual(flight["route_source"], "Renamed")
+            self.assertEqual(flight["crew"], ["Martha Married"])
+
+    def test_ticket_changes_refresh_summaries(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.order.tickets.filter(flight=self.flights[1]).delete()
+        self.assertEqual(len(self._tickets()), 1)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.order.delete()
+        self.assertFalse(OrderSummary.objects.exists())
+
+    def test_missing_summary(self):
+        OrderSummary.objects.all().delete()
+        # Rendered from the tickets; reads never write the summary.
+        self.assertEqual(self._tickets(), self._from_tickets())
+        self.assertFalse(OrderSummary.objects.exists())
+
+        OrderSummary.objects.all().delete()
+        call_command("rebuild_order_summaries", "--missing", stdout=StringIO())
+        self.assertEqual(
+            OrderSummary.objects.get(order=self.order).tickets[0]["row"], 1
+        )
@@ -0,0 +1,112 @@
+from django.test import TestCase
+from django.urls import reverse
+from django.contrib.auth import get_user_model
+
+from rest_framework.test import APIClient
+from rest_framework import status
+from airport_backend.models import Order, Ticket
+from airport_backend.seat_map import load_bitmap
+from airport_backend.tests.samples import sample_flights
+
+
+ORDERS_LIST_URL = reverse("airport_backend:order-list")
+
+
+class TestOrderCreate(TestCase):
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            email="test@test.test", password="testpassword"
+        )
+        self.client.force_authenticate(self.user)
+        self.flights = sample_flights()
+
+    def test_group_booking_is_batched(self):
+        tickets = [
+            {"flight": self.flights[0].id, "row": row, "seat": seat}
+            for row in (1, 2, 3) for seat in (1, 2, 3)
+        ]
+        tickets.append({"flight": self.flights[1].id, "row": 4, "seat": 1})
+
+        # flights, hold check, order, ticket insert, per flight the in-place
+        # seat map update and, as the flights have no seat map yet, a lock,
+        # seat map read/rebuild/write and seats_sold update, the order
+        # summary's tickets, flights and insert, and the response's tickets
+        with self.assertNumQueries(22):
+            res = self.client.post(ORDERS_LIST_URL,
+                                   {"tickets": tickets},
+                                   format="json")
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(len(res.data["tickets"]), 10)
+        self.assertEqual(Ticket.objects.filter(order__user=self.user).count(), 10)
+
+    def test_booking_updates_seat_maps_in_place(self):
+        for flight in self.flights:
+            Ticket.objects.create(flight=flight, row=10, seat=3,
+                                  order=Order.objects.create(user=self.user))
+        tickets = [{"flight": flight.id, "row": 1, "seat": 1}
+                   for flight in self.flights]
+
+        # flights, hold check, order, ticket insert, one seat map and
+        # seats_sold update per flight, the order summary and the response
+        with self.assertNumQueries(12):
+            res = self.client.post(ORDERS_LIST_URL,
+                                   {"tickets": tickets},
+                                   format="json")
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        for flight in self.flights:
+            flight.refresh_from_db()
+            self.assertEqual(flight.seats_sold, 2)
+            self.assertTrue(load_bitmap(flight).is_taken(1, 1))
+
+    def test_same_seat_on_another_flight(self):
+        order = Order.objects.create(user=self.user)
+        Ticket.objects.create(flight=self.flights[0], row=2, seat=2, order=order)
+        res = self.client.post(
+            ORDERS_LIST_URL,
+            {"tickets": [{"flight": self.flights[1].id, "row": 2, "seat": 2}]},
+            format="json"
+        )
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+
+    def test_seat_out_of_cabin(self):
+        res = self.client.post(
+            ORDERS_LIST_URL,
+            {"tickets": [{"flight": self.flights[0].id, "row": 11, "seat": 1}]},
+            format="json"
+        )
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_unknown_flight(self):
+        res = self.client.post(
+            ORDERS_LIST_URL,
+            {"tickets": [{"flight": 0, "row": 1, "seat": 1}]},
+            format="json"
+        )
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("flight", res.data["tickets"][0])
+
+    def test_seat_ordered_twice(self):
+        ticket = {"flight": self.flights[0].id, "row": 1, "seat": 1}
+        res = self.client.post(ORDERS_LIST_URL,
+                               {"tickets": [ticket, ticket]},
+                               format="json")
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(Order.objects.exists())
+
+    def test_seat_already_taken(self):
+        order = Order.objects.create(user=self.user)
+        Ticket.objects.create(flight=self.flights[0], row=2, seat=2, order=order)
+
+        res = self.client.post(
+            ORDERS_LIST_URL,
+            {"tickets": [{"flight": self.flights[0].id, "row": 2, "seat": 2}]},
+            format="json"
+        )
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(res.data["tickets"],
+                         [f"Seat 2/2 on flight {self.flights[0].id} "
+                          f"is already taken"])
+        self.assertEqual(Order.objects.count(), 1)
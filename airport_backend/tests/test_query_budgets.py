@@ -0,0 +1,123 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework_simplejwt.tokens import AccessToken
+
+from rest_framework.test import APIClient
+from rest_framework import status
+from airport_backend.dataset import DatasetGenerator
+from airport_backend.models import (AirplaneType,
+                                    Airplane,
+                                    Airport,
+                                    City,
+                                    Country,
+                                    Crew,
+                                    Flight,
+                                    Order,
+                                    Route,
+                                    Ticket)
+from airport_backend.views import FlightViewSet
+from airport_backend.query_budget import (Budget,
+                                          QueryBudgetExceeded,
+                                          QueryCounter)
+
+
+COUNTS = {"countries": 3, "cities": 6, "airports": 8, "routes": 20,
+          "airplanes": 4, "crew": 10, "flights": 30, "users": 3,
+          "orders": 20, "tickets": 40}
+
+QUERY_BUDGETS = {
+    "ENABLED": True,
+    "SAMPLE_RATE": 1.0,
+    "RAISE": True,
+    "SERVER_TIMING": True,
+    "DEFAULT": {"queries": 20, "db_ms": None},
+}
+
+ENDPOINTS = (
+    ("crew", Crew),
+    ("airplanetype", AirplaneType),
+    ("airplane", Airplane),
+    ("airport", Airport),
+    ("route", Route),
+    ("flight", Flight),
+    ("country", Country),
+    ("city", City),
+    ("ticket", Ticket),
+)
+
+
+@override_settings(QUERY_BUDGETS=QUERY_BUDGETS)
+class TestQueryBudgets(TestCase):
+    """Every list and retrieve endpoint stays within its declared budget
+    on a dataset with many related rows, so N+1 queries fail here."""
+
+    @classmethod
+    def setUpTestData(cls):
+        DatasetGenerator(COUNTS, seed=3).generate()
+        cls.admin = get_user_model().objects.create_user(
+            email="admin@admin.admin",
+            password="admintestpassword",
+            is_staff=True
+        )
+
+    def setUp(self):
+        cache.clear()
+
+    def _client(self, user):
+        client = APIClient()
+        client.credentials(
+            HTTP_AUTHORIZATION=f"Bearer {AccessToken.for_user(user)}"
+        )
+        return client
+
+    def test_list_and_retrieve(self):
+        client = self._client(self.admin)
+        for basename, model in ENDPOINTS:
+            with self.subTest(basename):
+                res = client.get(reverse(f"airport_backend:{basename}-list"))
+                self.assertEqual(res.status_code, status.HTTP_200_OK)
+                self.assertIn("Server-Timing", res)
+                instance = model.objects.order_by("id").first()
+                res = client.get(reverse(f"airport_backend:{basename}-detail",
+                                         args=(instance.id,)))
+                self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+    def test_orders(self):
+        order = Order.objects.filter(tickets__isnull=False).first()
+        client = self._client(order.user)
+        res = client.get(reverse("airport_backend:order-list"))
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        res = client.get(reverse("airport_backend:order-detail",
+                                 args=(order.id,)))
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+    def test_over_budget_raises(self):
+        budgets = FlightViewSet.query_budgets
+        FlightViewSet.query_budgets = {**budgets, "list": Budget(1)}
+        try:
+            with self.assertRaisesMessage(QueryBudgetExceeded,
+                                          "FlightViewSet.list over budget"):
+                self._client(self.admin).get(
+                    reverse("airport_backend:flight-list")
+                )
+        finally:
+            FlightViewSet.query_budgets = budgets
+
+    def test_over_budget_is_logged(self):
+        client = self._client(self.admin)
+        with self.settings(QUERY_BUDGETS={**QUERY_BUDGETS,
+                                          "RAISE": False,
+                                          "DEFAULT": {"queries": 0}}):
+            with self.assertLogs("airport_backend.query_budget", "WARNING"):
+                client.get(reverse("user:manage_user"))
+
+    def test_counter(self):
+        counter = QueryCounter()
+        with connection.execute_wrapper(counter):
+            list(Country.objects.all())
+            Country.objects.count()
+        self.assertEqual(counter.queries, 2)
+        self.assertGreater(counter.db_ms, 0)
@@ -0,0 +1,79 @@
+from django.core.cache import cache
+from django.test import SimpleTestCase, TestCase
+from django.urls import reverse
+from django.contrib.auth import get_user_model
+
+from rest_framework.test import APIClient
+from rest_framework import status
+from airport_backend.checks import check_shared_cache
+from airport_backend.models import City, Country
+
+
+COUNTRY_LIST_URL = reverse("airport_backend:country-list")
+CITY_LIST_URL = reverse("airport_backend:city-list")
+
+
+class TestReferenceDataCache(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            email="test@test.test", password="testpassword"
+        )
+        self.client.force_authenticate(self.user)
+        self.country = Country.objects.create(name="Spain")
+        City.objects.create(name="Madrid", country=self.country)
+
+    def test_repeated_list_skips_database(self):
+        first = self.client.get(CITY_LIST_URL)
+        with self.assertNumQueries(0):
+            second = self.client.get(CITY_LIST_URL)
+
+        self.assertEqual(second.status_code, status.HTTP_200_OK)
+        self.assertEqual(second.data, first.data)
+        self.assertEqual(second["ETag"], first["ETag"])
+
+    def test_if_none_match_returns_not_modified(self):
+        first = self.client.get(COUNTRY_LIST_URL)
+        res = self.client.get(COUNTRY_LIST_URL,
+                              HTTP_IF_NONE_MATCH=first["ETag"])
+
+        self.assertEqual(res.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(res["ETag"], first["ETag"])
+
+    def test_write_invalidates_dependent_endpoints(self):
+        first = self.client.get(CITY_LIST_URL)
+        with self.captureOnCommitCallbacks() as callbacks:
+            self.country.name = "Kingdom of Spain"
+            self.country.save()
+            # Not committed yet: the version is still the old one.
+            res = self.client.get(CITY_LIST_URL,
+                                  HTTP_IF_NONE_MATCH=first["ETag"])
+            self.assertEqual(res.status_code, status.HTTP_304_NOT_MODIFIED)
+        for callback in callbacks:
+            callback()
+
+        res = self.client.get(CITY_LIST_URL,
+                              HTTP_IF_NONE_MATCH=first["ETag"])
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(res["ETag"], first["ETag"])
+        self.assertEqual(res.data["results"][0]["country_name"],
+                         "Kingdom of Spain")
+
+
+class TestSharedCacheCheck(SimpleTestCase):
+
+    def test_several_workers_need_a_shared_cache(self):
+        self.assertEqual(check_shared_cache(None), [])
+        with self.settings(WEB_CONCURRENCY=4):
+            errors = check_shared_cache(None)
+            self.assertEqual([error.id for error in errors],
+                             ["airport_backend.E001"])
+            redis = {"default": {
+                "BACKEND": "django.core.cache.backends.redis.RedisCache",
+                "LOCATION": "redis://localhost:6379",
+            }}
+            with self.settings(CACHES=redis):
+                self.assertEqual(check_shared_cache(None), [])
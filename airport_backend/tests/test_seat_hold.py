@@ -0,0 +1,119 @@
+from datetime import timedelta
+
+from django.test import TestCase
+from django.urls import reverse
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.utils import timezone
+
+from rest_framework.test import APIClient
+from rest_framework import status
+from airport_backend.holds import LocMemHoldStore, SeatsUnavailable
+from airport_backend.models import SeatHold, Ticket
+from airport_backend.tests.samples import sample_flights
+
+
+ORDERS_LIST_URL = reverse("airport_backend:order-list")
+
+
+def hold_url(flight_id):
+    return reverse("airport_backend:flight-hold", args=(flight_id,))
+
+
+class TestLocMemHoldStore(TestCase):
+
+    def test_hold_conflicts_and_release(self):
+        store = LocMemHoldStore()
+        hold = store.hold(1, [(1, 1, 1), (1, 1, 2)], timedelta(minutes=5))
+
+        with self.assertRaises(SeatsUnavailable) as error:
+            store.hold(2, [(1, 1, 2), (1, 1, 3)], timedelta(minutes=5))
+        self.assertEqual(error.exception.seats, [(1, 1, 2)])
+        self.assertEqual(store.conflicts([(1, 1, 1)], 2), [(1, 1, 1)])
+        self.assertEqual(store.get(hold.token, 1), [(1, 1, 1), (1, 1, 2)])
+
+        store.release(hold.token)
+        self.assertEqual(store.conflicts([(1, 1, 1)], 2), [])
+
+    def test_expired_holds(self):
+        store = LocMemHoldStore()
+        hold = store.hold(1, [(1, 1, 1)], timedelta(seconds=-1))
+        self.assertEqual(store.get(hold.token, 1), [])
+        store.hold(2, [(1, 1, 1)], timedelta(minutes=5))
+        self.assertEqual(store.sweep(), 1)
+
+
+class TestSeatHoldApi(TestCase):
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            email="test@test.test", password="testpassword"
+        )
+        self.other = get_user_model().objects.create_user(
+            email="other@test.test", password="testpassword"
+        )
+        self.client.force_authenticate(self.user)
+        self.flight = sample_flights()[0]
+
+    def test_hold_and_convert_to_order(self):
+        res = self.client.post(hold_url(self.flight.id),
+                               {"seats": [{"row": 1, "seat": 1},
+                                          {"row": 1, "seat": 2}]},
+                               format="json")
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            order = self.client.post(ORDERS_LIST_URL,
+                                     {"hold": res.data["hold"]},
+                                     format="json")
+
+        self.assertEqual(order.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(
+            sorted(Ticket.objects.values_list("row", "seat")),
+            [(1, 1), (1, 2)]
+        )
+        self.assertFalse(SeatHold.objects.exists())
+
+    def test_held_seat_is_unavailable_for_others(self):
+        self.client.post(hold_url(self.flight.id),
+                         {"seats": [{"row": 2, "seat": 3}]},
+                         format="json")
+
+        other = APIClient()
+        other.force_authenticate(self.other)
+        res = other.post(hold_url(self.flight.id),
+                         {"seats": [{"row": 2, "seat": 3}]},
+                         format="json")
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+        res = other.post(
+            ORDERS_LIST_URL,
+            {"tickets": [{"flight": self.flight.id, "row": 2, "seat": 3}]},
+            format="json"
+        )
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_release_hold(self):
+        res = self.client.post(hold_url(self.flight.id),
+                               {"seats": [{"row": 2, "seat": 3}]},
+                               format="json")
+        res = self.client.delete(
+            f"{hold_url(self.flight.id)}?hold={res.data['hold']}"
+        )
+        self.assertEqual(res.status_code, status.HTTP_204_NO_CONTENT)
+        self.assertFalse(SeatHold.objects.exists())
+
+    def test_sweep_expired_holds(self):
+        SeatHold.objects.create(flight=self.flight, row=1, seat=1,
+                                user=self.other,
+                                token="5c9e7c38-4d4a-4c4f-9d53-1b5c3f0b2a10",
+                                expires_at=timezone.now() - timedelta(seconds=1))
+        res = self.client.post(hold_url(self.flight.id),
+                               {"seats": [{"row": 1, "seat": 1}]},
+                               format="json")
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+
+        SeatHold.objects.update(expires_at=timezone.now())
+        call_command("sweep_seat_holds", stdout=open("/dev/null", "w"))
+        self.assertFalse(SeatHold.objects.exists())
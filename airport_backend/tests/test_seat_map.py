@@ -0,0 +1,167 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase, SimpleTestCase
+from django.urls import reverse
+from django.contrib.auth import get_user_model
+
+from rest_framework.test import APIClient
+from rest_framework import status
+from airport_backend.models import (Flight,
+                                    FlightSeatMap,
+                                    Route,
+                                    Airplane,
+                                    Airport,
+                                    City,
+                                    Country,
+                                    AirplaneType,
+                                    Order,
+                                    Ticket)
+from airport_backend.seat_map import SeatBitmap, load_bitmap
+
+
+FLIGHTS_LIST_URL = reverse("airport_backend:flight-list")
+
+
+def sample_flight(**params) -> Flight:
+    country = Country.objects.create(name="Spain")
+    source = Airport.objects.create(
+        name="Source",
+        closest_big_city=City.objects.create(name="Barcelona", country=country)
+    )
+    destination = Airport.objects.create(
+        name="Destination",
+        closest_big_city=City.objects.create(name="Madrid", country=country)
+    )
+    defaults = {
+        "route": Route.objects.create(source=source,
+                                      destination=destination,
+                                      distance=600),
+        "airplane": Airplane.objects.create(
+            name="Plane",
+            rows=3,
+            seats_in_row=4,
+            airplane_type=AirplaneType.objects.create(name="Small")
+        ),
+        "departure_time": "2025-08-10T08:00:00Z",
+        "arrival_time": "2025-08-10T12:30:00Z"
+    }
+    defaults.update(params)
+    return Flight.objects.create(**defaults)
+
+
+def detail_flight_url(flight_id):
+    return reverse("airport_backend:flight-detail", args=(flight_id,))
+
+
+class TestSeatBitmap(SimpleTestCase):
+
+    def test_take_and_release(self):
+        bitmap = SeatBitmap(rows=3, seats_in_row=5)
+        self.assertEqual(len(bitmap.data), 2)
+
+        bitmap.take(1, 1)
+        bitmap.take(3, 5)
+        self.assertTrue(bitmap.is_taken(3, 5))
+        self.assertFalse(bitmap.is_taken(2, 1))
+        self.assertEqual(bitmap.count(), 2)
+        self.assertEqual(bitmap.taken_seats(), [(1, 1), (3, 5)])
+
+        bitmap.release(1, 1)
+        self.assertEqual(bitmap.taken_seats(), [(3, 5)])
+        self.assertEqual(bitmap.grid()[2], [0, 0, 0, 0, 1])
+
+    def test_out_of_cabin_seat(self):
+        bitmap = SeatBitmap(rows=2, seats_in_row=2)
+        with self.assertRaises(ValueError):
+            bitmap.take(3, 1)
+
+
+class TestSeatMapMaintenance(TestCase):
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            email="test@test.test", password="testpassword"
+        )
+        self.client.force_authenticate(self.user)
+        self.flight = sample_flight()
+        self.order = Order.objects.create(user=self.user)
+
+    def test_ticket_create_and_delete_update_bitmap(self):
+        ticket = Ticket.objects.create(row=2, seat=3,
+                                       flight=self.flight,
+                                       order=self.order)
+        seat_map = FlightSeatMap.objects.get(flight=self.flight)
+        bitmap = SeatBitmap(3, 4, seat_map.bitmap)
+        self.assertEqual(bitmap.taken_seats(), [(2, 3)])
+
+        ticket.delete()
+        seat_map.refresh_from_db()
+        self.assertEqual(SeatBitmap(3, 4, seat_map.bitmap).count(), 0)
+
+    def test_ticket_move_updates_bitmap(self):
+        ticket = Ticket.objects.create(row=1, seat=1,
+                                       flight=self.flight,
+                                       order=self.order)
+        ticket.row = 3
+        ticket.save()
+        flight = Flight.objects.select_related("airplane", "seat_map").get(
+            pk=self.flight.pk
+        )
+        self.assertEqual(load_bitmap(flight).taken_seats(), [(3, 1)])
+
+    def test_retrieve_serves_seat_map(self):
+        Ticket.objects.create(row=1, seat=2,
+                              flight=self.flight,
+                              order=self.order)
+        res = self.client.get(detail_flight_url(self.flight.id))
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data["taken_seats"], [{"row": 1, "seat": 2}])
+        self.assertEqual(res.data["seat_map"],
+                         [[0, 1, 0, 0], [0, 0, 0, 0], [0, 0, 0, 0]])
+
+    def test_list_tickets_available(self):
+        Ticket.objects.create(row=1, seat=2,
+                              flight=self.flight,
+                              order=self.order)
+        res = self.client.get(FLIGHTS_LIST_URL)
+
+        self.assertEqual(res.data["results"][0]["tickets_available"], 11)
+
+    def test_seats_sold_follows_tickets(self):
+        ticket = Ticket.objects.create(row=1, seat=2,
+                                       flight=self.flight,
+                                       order=self.order)
+        self.flight.refresh_from_db()
+        self.assertEqual(self.flight.seats_sold, 1)
+
+        ticket.delete()
+        self.flight.refresh_from_db()
+        self.assertEqual(self.flight.seats_sold, 0)
+
+    def test_stale_flight_save_keeps_seats_sold(self):
+        stale = Flight.objects.get(pk=self.flight.pk)
+        Ticket.objects.create(row=1, seat=2,
+                              flight=self.flight,
+                              order=self.order)
+        stale.arrival_time = "2025-08-10T13:00:00Z"
+        stale.save()
+
+        self.flight.refresh_from_db()
+        self.assertEqual(self.flight.seats_sold, 1)
+
+    def test_repair_seat_counters(self):
+        Ticket.objects.create(row=1, seat=2,
+                              flight=self.flight,
+                              order=self.order)
+        Flight.objects.update(seats_sold=7)
+        FlightSeatMap.objects.all().delete()
+
+        call_command("repair_seat_counters", stdout=StringIO())
+
+        self.flight.refresh_from_db()
+        self.assertEqual(self.flight.seats_sold, 1)
+        bitmap = SeatBitmap(3, 4, FlightSeatMap.objects.get().bitmap)
+        self.assertEqual(bitmap.taken_seats(), [(1, 2)])
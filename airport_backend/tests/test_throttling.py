@@ -0,0 +1,95 @@
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+
+from rest_framework.test import APIClient
+from rest_framework import status
+from airport_backend.models import RateCounter
+from airport_backend.throttling import (CacheRateStore,
+                                        DatabaseRateStore,
+                                        ScopedRateThrottle,
+                                        window_end)
+
+
+ORDERS_LIST_URL = reverse("airport_backend:order-list")
+THROTTLE_METRICS_URL = reverse("airport_backend:throttle-metrics")
+RATES = {"anon": "100/day", "user": "1000/day",
+         "orders": "2/hour", "login": "1/day"}
+
+
+class TestRateStores(TestCase):
+
+    def setUp(self):
+        cache.clear()
+
+    def test_window_end(self):
+        self.assertEqual(window_end(60, now=119.5), 120)
+        self.assertEqual(window_end(60, now=120), 180)
+
+    def test_counts(self):
+        for store in (CacheRateStore(), DatabaseRateStore()):
+            with self.subTest(type(store).__name__):
+                self.assertEqual(store.hit("throttle_a", 60).count, 1)
+                self.assertEqual(store.hit("throttle_a", 60).count, 2)
+                count, reset_at = store.hit("throttle_b", 60)
+                self.assertEqual(count, 1)
+                self.assertEqual(reset_at, window_end(60))
+
+    def test_database_window_restarts(self):
+        store = DatabaseRateStore()
+        store.hit("throttle_a", 60)
+        store.hit("throttle_a", 60)
+        RateCounter.objects.filter(key="throttle_a").update(expires_at=60)
+        self.assertEqual(store.stats(), {"counters": 0})
+        self.assertEqual(store.hit("throttle_a", 60).count, 1)
+        self.assertEqual(RateCounter.objects.count(), 1)
+
+        RateCounter.objects.update(expires_at=60)
+        self.assertEqual(store.sweep(), 1)
+
+
+@mock.patch("airport_backend.throttling._store", DatabaseRateStore())
+@mock.patch.object(ScopedRateThrottle, "THROTTLE_RATES", RATES)
+class TestScopedThrottles(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            email="test@test.test", password="testpassword", is_staff=True
+        )
+
+    def test_order_create_scope(self):
+        self.client.force_authenticate(self.user)
+        for _ in range(2):
+            res = self.client.post(ORDERS_LIST_URL, {}, format="json")
+            self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        res = self.client.post(ORDERS_LIST_URL, {}, format="json")
+        self.assertEqual(res.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        self.assertIn("Retry-After", res)
+
+        # Other actions of the viewset are not in the scope.
+        res = self.client.get(ORDERS_LIST_URL)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+        res = self.client.get(THROTTLE_METRICS_URL)
+        self.assertEqual(res.data["store"],
+                         "airport_backend.throttling.DatabaseRateStore")
+        self.assertGreaterEqual(res.data["scopes"]["orders"]["throttled"], 1)
+
+    def test_login_scope(self):
+        payload = {"email": "test@test.test", "password": "wrong"}
+        res = self.client.post(reverse("token_obtain_pair"), payload)
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+        res = self.client.post(reverse("token_obtain_pair"), payload)
+        self.assertEqual(res.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+
+    def test_metrics_need_admin(self):
+        self.user.is_staff = False
+        self.user.save()
+        self.client.force_authenticate(self.user)
+        res = self.client.get(THROTTLE_METRICS_URL)
+        self.assertEqual(res.status_code, status.HTTP_403_FORBIDDEN)
@@ -0,0 +1,134 @@
+import io
+import os
+import tempfile
+from concurrent.futures import Future
+
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.contrib.auth import get_user_model
+from PIL import Image
+
+from rest_framework.test import APIClient
+from rest_framework import status
+from airport_backend.models import City, Country, Crew
+from airport_backend.thumbnails import (_rendered,
+                                        build_thumbnails,
+                                        thumbnail_name)
+
+
+CREW_LIST_URL = reverse("airport_backend:crew-list")
+CITY_LIST_URL = reverse("airport_backend:city-list")
+MEDIA_ROOT = tempfile.mkdtemp()
+THUMBNAILS = {"WORKERS": 0, "SIZES": {"small": 160, "medium": 480}}
+
+
+def upload_image_url(crew_id, basename="crew"):
+    return reverse(f"airport_backend:{basename}-upload-image", args=(crew_id,))
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT, THUMBNAILS=THUMBNAILS)
+class TestThumbnails(TestCase):
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            email="admin@admin.admin",
+            password="admintestpassword",
+            is_staff=True
+        )
+        self.client.force_authenticate(self.user)
+        self.crew = Crew.objects.create(first_name="Martha",
+                                        last_name="Dumych")
+
+    def _upload(self, url=None, execute=True):
+        exif = Image.Exif()
+        exif[0x010F] = "Camera maker"
+        image = Image.new("RGBA", (1200, 600), (10, 20, 30, 255))
+        upload = io.BytesIO()
+        image.save(upload, "PNG", exif=exif)
+        upload.seek(0)
+        upload.name = "photo.png"
+        with self.captureOnCommitCallbacks(execute=execute):
+            return self.client.post(url or upload_image_url(self.crew.id),
+                                    {"image": upload},
+                                    format="multipart")
+
+    def test_upload_renders_thumbnails(self):
+        res = self._upload()
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.crew.refresh_from_db()
+
+        path = os.path.join(MEDIA_ROOT,
+                            thumbnail_name(self.crew.image.name, "small", "jpeg"))
+        with Image.open(path) as thumbnail:
+            self.assertEqual(thumbnail.format, "JPEG")
+            self.assertEqual(thumbnail.size, (160, 80))
+            self.assertNotIn("exif", thumbnail.info)
+        path = os.path.join(MEDIA_ROOT,
+                            thumbnail_name(self.crew.image.name, "medium", "webp"))
+        with Image.open(path) as thumbnail:
+            self.assertEqual(thumbnail.format, "WEBP")
+            self.assertEqual(thumbnail.size, (480, 240))
+            self.assertNotIn("exif", thumbnail.info)
+
+    def test_list_exposes_thumbnail_urls(self):
+        self._upload()
+        res = self.client.get(CREW_LIST_URL)
+
+        thumbnails = res.data["results"][0]["thumbnails"]
+        self.assertEqual(set(thumbnails), {"small", "medium"})
+        self.assertTrue(thumbnails["small"]["webp"].endswith("/small.webp"))
+
+    def test_crew_without_image(self):
+        res = self.client.get(CREW_LIST_URL)
+        self.assertIsNone(res.data["results"][0]["thumbnails"])
+
+    def test_urls_only_for_recorded_thumbnails(self):
+        # Rendering has not finished yet.
+        self._upload(execute=False)
+        self.crew.refresh_from_db()
+        self.assertEqual(self.crew.thumbnail_sizes, [])
+        with self.assertNumQueries(2):
+            res = self.client.get(CREW_LIST_URL)
+        self.assertEqual(res.data["results"][0]["thumbnails"], {})
+
+        build_thumbnails(Crew, self.crew.id, self.crew.image.name)
+        self.crew.refresh_from_db()
+        self.assertEqual(self.crew.thumbnail_sizes, ["small", "medium"])
+
+        # Rendered for an image replaced since: not recorded.
+        with self.assertLogs("airport_backend.thumbnails", "ERROR"):
+            build_thumbnails(Crew, self.crew.id, "uploads/other.png")
+        self.crew.refresh_from_db()
+        self.assertEqual(self.crew.thumbnail_sizes, ["small", "medium"])
+
+    def test_recording_retires_cached_city_list(self):
+        city = City.objects.create(name="Kyiv",
+                                   country=Country.objects.create(name="UA"))
+        self._upload(upload_image_url(city.id, "city"), execute=False)
+        city.refresh_from_db()
+        res = self.client.get(CITY_LIST_URL)
+        self.assertEqual(res.data["results"][0]["thumbnails"], {})
+
+        with self.captureOnCommitCallbacks(execute=True):
+            build_thumbnails(City, city.id, city.image.name)
+        res = self.client.get(CITY_LIST_URL)
+        self.assertEqual(set(res.data["results"][0]["thumbnails"]),
+                         {"small", "medium"})
+
+    def test_failed_render_is_logged(self):
+        path = os.path.join(MEDIA_ROOT, "broken.png")
+        with open(path, "wb") as broken:
+            broken.write(b"not an image")
+        self.crew.image = "broken.png"
+        self.crew.save()
+        with self.assertLogs("airport_backend.thumbnails", "ERROR"):
+            build_thumbnails(Crew, self.crew.id, "broken.png")
+
+        future = Future()
+        future.set_exception(OSError("disk full"))
+        with self.assertLogs("airport_backend.thumbnails", "ERROR") as logs:
+            _rendered(Crew, self.crew.id, "broken.png", future)
+        self.assertIn("broken.png", logs.output[0])
+        self.crew.refresh_from_db()
+        self.assertEqual(self.crew.thumbnail_sizes, [])
@@ -0,0 +1,188 @@
+import logging
+import threading
+import time
+from collections import Counter, namedtuple
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection
+from django.utils.module_loading import import_string
+from rest_framework import throttling
+
+from airport_backend.models import RateCounter
+
+
+logger = logging.getLogger(__name__)
+
+Hit = namedtuple("Hit", ("count", "reset_at"))
+
+
+def window_end(duration, now=None):
+    """Unix time the fixed ``duration``-second window containing ``now``
+    ends."""
+    now = time.time() if now is None else now
+    return (int(now) // duration + 1) * duration
+
+
+class BaseRateStore:
+    """Fixed-window request counters.
+
+    ``hit`` counts one request for ``key`` in the current ``duration``-second
+    window and returns the count so far with the end of the window; it is a
+    single atomic update whatever the limit, instead of rewriting a list of
+    timestamps like DRF's throttles.
+    """
+
+    def hit(self, key, duration):
+        raise NotImplementedError
+
+    def stats(self):
+        return {}
+
+    def sweep(self):
+        """Drop counters of ended windows and return how many were removed."""
+        return 0
+
+
+class CacheRateStore(BaseRateStore):
+    """Counters in the default cache: ``add`` then ``incr``, atomic on
+    memcached and Redis. Only shared by workers that share the cache."""
+
+    def hit(self, key, duration):
+        reset_at = window_end(duration)
+        key = f"{key}:{reset_at}"
+        timeout = reset_at - int(time.time()) + 1
+        cache.add(key, 0, timeout=timeout)
+        try:
+            count = cache.incr(key)
+        except ValueError:
+            # Evicted between add and incr.
+            cache.add(key, 1, timeout=timeout)
+            count = 1
+        return Hit(count, reset_at)
+
+
+class DatabaseRateStore(BaseRateStore):
+    """Counters in the UNLOGGED ``RateCounter`` table, shared by all
+    workers: one upsert per request, restarting the count when the stored
+    window has ended."""
+
+    def hit(self, key, duration):
+        reset_at = window_end(duration)
+        table = connection.ops.quote_name(RateCounter._meta.db_table)
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"INSERT INTO {table} AS counter (key, hits, expires_at) "
+                f"VALUES (%s, 1, %s) "
+                f"ON CONFLICT (key) DO UPDATE SET "
+                f"hits = CASE WHEN counter.expires_at = EXCLUDED.expires_at "
+                f"THEN counter.hits + 1 ELSE 1 END, "
+                f"expires_at = EXCLUDED.expires_at "
+                f"RETURNING hits",
+                [key, reset_at]
+            )
+            return Hit(cursor.fetchone()[0], reset_at)
+
+    def stats(self):
+        return {"counters": RateCounter.objects.filter(
+            expires_at__gt=int(time.time())
+        ).count()}
+
+    def sweep(self):
+        deleted, _ = RateCounter.objects.filter(
+            expires_at__lte=int(time.time())
+        ).delete()
+        return deleted
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_rate_store():
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = import_string(settings.THROTTLING["STORE"])()
+    return _store
+
+
+_decisions = Counter()
+_decisions_lock = threading.Lock()
+
+
+def record_decision(scope, allowed):
+    with _decisions_lock:
+        _decisions[(scope, allowed)] += 1
+
+
+def throttle_metrics():
+    """Allowed and throttled requests per scope since this worker started."""
+    with _decisions_lock:
+        decisions = dict(_decisions)
+    metrics = {}
+    for (scope, allowed), count in sorted(decisions.items()):
+        scope_metrics = metrics.setdefault(scope, {"allowed": 0,
+                                                   "throttled": 0})
+        scope_metrics["allowed" if allowed else "throttled"] = count
+    return metrics
+
+
+class FixedWindowRateThrottle(throttling.SimpleRateThrottle):
+    """``SimpleRateThrottle`` counting in the configured rate store."""
+
+    def allow_request(self, request, view):
+        if self.rate is None:
+            return True
+        self.key = self.get_cache_key(request, view)
+        if self.key is None:
+            return True
+        self.count, self.reset_at = get_rate_store().hit(self.key,
+                                                         self.duration)
+        allowed = self.count <= self.num_requests
+        record_decision(self.scope, allowed)
+        if not allowed:
+            logger.info("Throttled %s: %d requests, rate %s",
+                        self.key, self.count, self.rate)
+        return allowed
+
+    def wait(self):
+        return max(self.reset_at - time.time(), 0)
+
+
+class AnonRateThrottle(throttling.AnonRateThrottle, FixedWindowRateThrottle):
+    pass
+
+
+class UserRateThrottle(throttling.UserRateThrottle, FixedWindowRateThrottle):
+    pass
+
+
+class ScopedRateThrottle(FixedWindowRateThrottle):
+    """Stricter limits for the views that declare a scope: ``throttle_scopes``
+    keyed by action (like ``query_budgets``) or ``throttle_scope`` for the
+    whole view. Requests are counted per user, or per address when
+    anonymous."""
+
+    def __init__(self):
+        # The rate depends on the view, see allow_request.
+        pass
+
+    def allow_request(self, request, view):
+        action = getattr(view, "action", None) or request.method.lower()
+        self.scope = (getattr(view, "throttle_scopes", None) or {}).get(
+            action, getattr(view, "throttle_scope", None)
+        )
+        if not self.scope:
+            return True
+        self.rate = self.get_rate()
+        self.num_requests, self.duration = self.parse_rate(self.rate)
+        return super().allow_request(request, view)
+
+    def get_cache_key(self, request, view):
+        if request.user and request.user.is_authenticated:
+            ident = request.user.pk
+        else:
+            ident = self.get_ident(request)
+        return self.cache_format % {"scope": self.scope, "ident": ident}
@@ -0,0 +1,146 @@
+import logging
+import os
+import posixpath
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.db import close_old_connections, transaction
+from PIL import Image, ImageOps
+
+from airport_backend.response_cache import bump_model_version
+
+
+logger = logging.getLogger(__name__)
+
+FORMATS = {
+    "webp": ("WEBP", {"quality": 80, "method": 4}),
+    "jpeg": ("JPEG", {"quality": 82, "optimize": True, "progressive": True}),
+}
+
+
+def thumbnail_name(name, size, extension):
+    """``uploads/images/crew/a.png`` -> ``uploads/images/crew/thumbs/a/small.webp``"""
+    directory, filename = posixpath.split(name)
+    stem, _ = posixpath.splitext(filename)
+    return posixpath.join(directory, "thumbs", stem, f"{size}.{extension}")
+
+
+def render_thumbnails(source_path, targets):
+    """Write every ``(path, max_side, extension)`` in ``targets``.
+
+    Runs in a worker process. Images are only re-encoded from pixels, so
+    EXIF/XMP and other metadata of the upload never reach the renditions.
+    """
+    with Image.open(source_path) as original:
+        original = ImageOps.exif_transpose(original)
+        for path, max_side, extension in targets:
+            image = original.copy()
+            image.info = {}
+            image.thumbnail((max_side, max_side), Image.Resampling.LANCZOS)
+            image_format, options = FORMATS[extension]
+            if image_format == "JPEG" and image.mode != "RGB":
+                image = image.convert("RGB")
+            elif image.mode not in ("RGB", "RGBA"):
+                image = image.convert("RGBA")
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            temporary = f"{path}.tmp"
+            image.save(temporary, image_format, **options)
+            os.replace(temporary, path)
+    return len(targets)
+
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def _get_executor():
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ProcessPoolExecutor(
+                    max_workers=settings.THUMBNAILS["WORKERS"]
+                )
+    return _executor
+
+
+def thumbnail_targets(name):
+    return [
+        (default_storage.path(thumbnail_name(name, size, extension)),
+         max_side,
+         extension)
+        for size, max_side in settings.THUMBNAILS["SIZES"].items()
+        for extension in FORMATS
+    ]
+
+
+def record_thumbnails(model, pk, name):
+    """Note on the row the sizes rendered for its image ``name``, unless a
+    newer upload replaced it, and retire the responses cached without
+    them."""
+    sizes = list(settings.THUMBNAILS["SIZES"])
+    if model.objects.filter(pk=pk, image=name).update(thumbnail_sizes=sizes):
+        transaction.on_commit(partial(bump_model_version, model))
+
+
+def _rendered(model, pk, name, future):
+    # Runs in the executor's thread of this process.
+    error = future.exception()
+    if error is not None:
+        logger.error("Rendering thumbnails of %s failed", name,
+                     exc_info=error)
+        return
+    try:
+        record_thumbnails(model, pk, name)
+    except Exception:
+        logger.exception("Recording thumbnails of %s failed", name)
+    finally:
+        close_old_connections()
+
+
+def build_thumbnails(model, pk, name):
+    """Render the thumbnails of the image ``name`` of row ``pk`` in the
+    worker pool, or inline when ``THUMBNAILS["WORKERS"]`` is 0, and record
+    them once written. Failures are logged and record nothing."""
+    if settings.THUMBNAILS["WORKERS"]:
+        future = _get_executor().submit(render_thumbnails,
+                                        default_storage.path(name),
+                                        thumbnail_targets(name))
+        future.add_done_callback(partial(_rendered, model, pk, name))
+        return future
+    try:
+        render_thumbnails(default_storage.path(name), thumbnail_targets(name))
+    except Exception:
+        logger.exception("Rendering thumbnails of %s failed", name)
+        return
+    record_thumbnails(model, pk, name)
+
+
+def queue_thumbnails(instance):
+    """Render thumbnails of the just saved image of ``instance`` once the
+    save commits; the new image has none until then."""
+    if instance.image:
+        model, pk, name = type(instance), instance.pk, instance.image.name
+        model.objects.filter(pk=pk).update(thumbnail_sizes=[])
+        transaction.on_commit(lambda: build_thumbnails(model, pk, name))
+
+
+def thumbnail_urls(instance, request=None):
+    """URLs of the renditions recorded for the image of ``instance``."""
+    if not instance.image:
+        return None
+    urls = {}
+    for size in settings.THUMBNAILS["SIZES"]:
+        if size not in instance.thumbnail_sizes:
+            continue
+        for extension in FORMATS:
+            url = default_storage.url(
+                thumbnail_name(instance.image.name, size, extension)
+            )
+            urls.setdefault(size, {})[extension] = (
+                request.build_absolute_uri(url) if request else url
+            )
+    return urls
@@ -5,10 +5,16 @@ from airport_backend.views import (AirplaneTypeViewSet,
                                    AirportViewSet,
                                    RouteViewSet,
                                    FlightViewSet,
+                                   FlightScheduleViewSet,
                                    OrderViewSet,
                                    TicketViewSet,
                                    CountryViewSet,
-                                   CityViewSet)
+                                   CityViewSet,
+                                   ThrottleMetricsView,
+                                   DatabasePoolMetricsView)
+from airport_backend.async_views import (airport_board_stream,
+                                         flight_availability,
+                                         flight_list)
 from rest_framework import routers
 
 app_name = "airport_backend"
@@ -20,10 +26,24 @@ router.register("airplanes", AirplaneViewSet)
 router.register("airports", AirportViewSet)
 router.register("routes", RouteViewSet)
 router.register("flights", FlightViewSet)
+router.register("flight_schedules", FlightScheduleViewSet)
 router.register("orders", OrderViewSet)
 router.register("tickets", TicketViewSet)
 router.register("countries", CountryViewSet)
 router.register("cities", CityViewSet)
 urlpatterns = [
+    path("async/flights/", flight_list, name="async-flight-list"),
+    path("async/flights/<int:pk>/availability/",
+         flight_availability,
+         name="async-flight-availability"),
+    path("airports/<int:pk>/board/stream/",
+         airport_board_stream,
+         name="airport-board-stream"),
+    path("metrics/throttling/",
+         ThrottleMetricsView.as_view(),
+         name="throttle-metrics"),
+    path("metrics/db-pool/",
+         DatabasePoolMetricsView.as_view(),
+         name="db-pool-metrics"),
     path("", include(router.urls))
 ]
\ No newline at end of file
@@ -5,16 +5,20 @@ from airport_backend.models import (Crew,
                                     Airport,
                                     Route,
                                     Flight,
+                                    FlightSchedule,
                                     Order,
                                     Ticket,
                                     Country,
                                     City)
-from airport_backend.pagination import SmallClassesPagination, HugeClassesPagination
+from airport_backend.pagination import (SmallClassesPagination,
+                                        FlightKeysetPagination,
+                                        IdKeysetPagination,
+                                        NewestFirstKeysetPagination)
 from django.contrib.auth import get_user_model
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework import status
-from datetime import datetime
+import uuid
 from airport_backend.serializers import (CrewSerializer,
                                          AirplaneTypeSerializer,
                                          AirplaneSerializer,
@@ -42,21 +46,78 @@ from airport_backend.serializers import (CrewSerializer,
                                          CityImageSerializer,
                                          CityRetreiveSerializer,
                                          AirportListSerializer,
-                                         AirportRetreiveSerializer)
+                                         AirportRetreiveSerializer,
+                                         SeatHoldSerializer,
+                                         ConnectionSearchSerializer,
+                                         ConnectionSerializer,
+                                         FlightSearchSerializer,
+                                         OrderSearchSerializer,
+                                         AirportBoardSerializer,
+                                         AutocompleteSearchSerializer,
+                                         AirportAutocompleteSerializer,
+                                         CityAutocompleteSerializer,
+                                         FlightScheduleSerializer,
+                                         FlightScheduleListSerializer,
+                                         MaterializeSchedulesSerializer)
+from airport_backend.connections import connection_index
+from airport_backend.autocomplete import airport_index, city_index
+from airport_backend.response_cache import VersionedCacheMixin
+from airport_backend.thumbnails import queue_thumbnails
+from airport_backend.exports import (EXPORT_FORMATS,
+                                     FLIGHT_COLUMNS,
+                                     TICKET_COLUMNS,
+                                     MANIFEST_COLUMNS,
+                                     annotate_flight_export,
+                                     export_response)
+from rest_framework.exceptions import NotFound, ValidationError
+from django.utils.cache import parse_etags
+from airport_backend.boards import get_board
+from airport_backend.holds import get_hold_store
+from airport_backend.schedules import materialize_schedules
+from airport_backend.fieldsets import FIELDSET_PARAMETERS, SparseFieldsetsViewMixin
+from airport_backend.query_budget import Budget
+from airport_backend.order_history import (attach_tickets_left,
+                                           with_history,
+                                           write_order_summary)
+from airport_backend.throttling import get_rate_store, throttle_metrics
+from django.db import connections as db_connections
 from rest_framework import viewsets
+from rest_framework.views import APIView
 from airport_backend.permission import (IsAdminOrIfAuthenticatedReadOnly, 
                                         OnlyAdminPermnissions,
                                         IsAuthenticated)
-from django.db.models import F, Count
-from drf_spectacular.utils import extend_schema, OpenApiParameter
+from drf_spectacular.utils import (extend_schema,
+                                   extend_schema_view,
+                                   OpenApiParameter)
 from drf_spectacular.types import OpenApiTypes
 
 
+EXPORT_OUTPUT_PARAMETER = OpenApiParameter(
+    "output",
+    type=OpenApiTypes.STR,
+    enum=list(EXPORT_FORMATS),
+    description="Export format, csv by default (ex. ?output=ndjson)",
+)
+
+
+def _export_output(request):
+    output = request.query_params.get("output", "csv")
+    if output not in EXPORT_FORMATS:
+        raise ValidationError(
+            {"output": [f"Must be one of: {', '.join(EXPORT_FORMATS)}"]}
+        )
+    return output
+
+
 class CrewModelViewSet(viewsets.ModelViewSet):
     serializer_class = CrewSerializer
     queryset = Crew.objects.all()
     pagination_class = SmallClassesPagination
     permission_classes = (IsAdminOrIfAuthenticatedReadOnly,)
+    query_budgets = {
+        "list": Budget(3, 50),
+        "retrieve": Budget(2, 20),
+    }
 
     def get_serializer_class(self):
         if self.action == "list":
@@ -75,23 +136,35 @@ class CrewModelViewSet(viewsets.ModelViewSet):
         crew = self.get_object()
         serializer = CrewImageSerializer(crew, data=request.data)
         if serializer.is_valid():
-            serializer.save()
+            instance = serializer.save()
+            queue_thumbnails(instance)
             return Response(serializer.data, status=status.HTTP_200_OK)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 
-class CountryViewSet(viewsets.ModelViewSet):
+class CountryViewSet(VersionedCacheMixin, viewsets.ModelViewSet):
     serializer_class = CountrySerializer
     queryset = Country.objects.all()
     pagination_class = SmallClassesPagination
     permission_classes = (IsAdminOrIfAuthenticatedReadOnly,)
+    cache_models = (Country,)
+    query_budgets = {
+        "list": Budget(3, 50),
+        "retrieve": Budget(2, 20),
+    }
 
 
-class CityViewSet(viewsets.ModelViewSet):
+class CityViewSet(VersionedCacheMixin, viewsets.ModelViewSet):
     serializer_class = CitySerializer
     queryset = City.objects.all()
     pagination_class = SmallClassesPagination
     permission_classes = (IsAdminOrIfAuthenticatedReadOnly,)
+    cache_models = (City, Country)
+    query_budgets = {
+        "list": Budget(3, 50),
+        "retrieve": Budget(2, 20),
+        "autocomplete": Budget(2, 20),
+    }
 
     def get_serializer_class(self):
         if self.action == "list":
@@ -103,6 +176,24 @@ class CityViewSet(viewsets.ModelViewSet):
         return CitySerializer
     
 
+    @extend_schema(
+        parameters=[AutocompleteSearchSerializer],
+        responses=CityAutocompleteSerializer(many=True),
+    )
+    @action(
+        methods={"GET"},
+        detail=False,
+        url_path="autocomplete",
+    )
+    def autocomplete(self, request):
+        """Cities whose name, or a word of it, or country starts with ``q``,
+        from an in-process index."""
+        search = AutocompleteSearchSerializer(data=request.query_params)
+        search.is_valid(raise_exception=True)
+        matches = city_index.search(search.validated_data["q"],
+                                    limit=search.validated_data["limit"])
+        return Response(CityAutocompleteSerializer(matches, many=True).data)
+
     @action(
         methods={"POST"},
         detail=True,
@@ -113,7 +204,8 @@ class CityViewSet(viewsets.ModelViewSet):
         city = self.get_object()
         serializer = CityImageSerializer(city, data=request.data)
         if serializer.is_valid():
-            serializer.save()
+            instance = serializer.save()
+            queue_thumbnails(instance)
             return Response(serializer.data, status=status.HTTP_200_OK)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
     
@@ -124,11 +216,16 @@ class CityViewSet(viewsets.ModelViewSet):
         return queryset
 
 
-class AirplaneTypeViewSet(viewsets.ModelViewSet):
+class AirplaneTypeViewSet(VersionedCacheMixin, viewsets.ModelViewSet):
     serializer_class = AirplaneTypeSerializer
     queryset = AirplaneType.objects.all()
     pagination_class = SmallClassesPagination
     permission_classes = (IsAdminOrIfAuthenticatedReadOnly,)
+    cache_models = (AirplaneType,)
+    query_budgets = {
+        "list": Budget(3, 50),
+        "retrieve": Budget(2, 20),
+    }
 
 
 class AirplaneViewSet(viewsets.ModelViewSet):
@@ -136,6 +233,10 @@ class AirplaneViewSet(viewsets.ModelViewSet):
     queryset = Airplane.objects.all()
     pagination_class = SmallClassesPagination
     permission_classes = (IsAdminOrIfAuthenticatedReadOnly,)
+    query_budgets = {
+        "list": Budget(3, 50),
+        "retrieve": Budget(2, 20),
+    }
 
     def get_serializer_class(self):
         if self.action == "list":
@@ -156,7 +257,8 @@ class AirplaneViewSet(viewsets.ModelViewSet):
         airplane = self.get_object()
         serializer = AirplaneImageSerializer(airplane, data=request.data)
         if serializer.is_valid():
-            serializer.save()
+            instance = serializer.save()
+            queue_thumbnails(instance)
             return Response(serializer.data, status=status.HTTP_200_OK)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
@@ -167,11 +269,18 @@ class AirplaneViewSet(viewsets.ModelViewSet):
         return queryset
 
 
-class AirportViewSet(viewsets.ModelViewSet):
+class AirportViewSet(VersionedCacheMixin, viewsets.ModelViewSet):
     serializer_class = AirportSerializer
     queryset = Airport.objects.all()
     pagination_class = SmallClassesPagination
     permission_classes = (IsAdminOrIfAuthenticatedReadOnly,)
+    cache_models = (Airport, City, Country)
+    query_budgets = {
+        "list": Budget(3, 50),
+        "retrieve": Budget(2, 20),
+        "board": Budget(3, 50),
+        "autocomplete": Budget(2, 20),
+    }
 
     def get_serializer_class(self):
         if self.action == "list":
@@ -186,12 +295,63 @@ class AirportViewSet(viewsets.ModelViewSet):
             queryset = queryset.select_related("closest_big_city")
         return queryset
 
-
-class RouteViewSet(viewsets.ModelViewSet):
+    @extend_schema(
+        parameters=[AutocompleteSearchSerializer],
+        responses=AirportAutocompleteSerializer(many=True),
+    )
+    @action(
+        methods={"GET"},
+        detail=False,
+        url_path="autocomplete",
+    )
+    def autocomplete(self, request):
+        """Airports whose code, name, or a word of it, or city starts with
+        ``q``, best matches first, from an in-process index: no query
+        besides authentication."""
+        search = AutocompleteSearchSerializer(data=request.query_params)
+        search.is_valid(raise_exception=True)
+        matches = airport_index.search(search.validated_data["q"],
+                                       limit=search.validated_data["limit"])
+        return Response(AirportAutocompleteSerializer(matches, many=True).data)
+
+    @extend_schema(responses=AirportBoardSerializer)
+    @action(
+        methods=["GET"],
+        detail=True,
+        url_path="board",
+    )
+    def board(self, request, pk=None):
+        """Departures and arrivals around now, cached for a few seconds and
+        shared by every client of the airport. Live updates are streamed as
+        Server-Sent Events from ``board/stream/``."""
+        try:
+            entry = get_board(int(pk))
+        except ValueError:
+            raise NotFound()
+        if entry["board"] is None:
+            raise NotFound()
+        if entry["etag"] in parse_etags(request.headers.get("If-None-Match", "")):
+            return Response(status=status.HTTP_304_NOT_MODIFIED,
+                            headers={"ETag": entry["etag"]})
+        return Response(entry["board"], headers={"ETag": entry["etag"]})
+
+
+@extend_schema_view(
+    list=extend_schema(parameters=FIELDSET_PARAMETERS),
+    retrieve=extend_schema(parameters=FIELDSET_PARAMETERS),
+)
+class RouteViewSet(SparseFieldsetsViewMixin,
+                   VersionedCacheMixin,
+                   viewsets.ModelViewSet):
     serializer_class = RouteSerializer
     queryset = Route.objects.select_related("source", "destination")
     pagination_class = SmallClassesPagination
     permission_classes = (IsAdminOrIfAuthenticatedReadOnly,)
+    cache_models = (Route, Airport, City, Country)
+    query_budgets = {
+        "list": Budget(3, 50),
+        "retrieve": Budget(2, 20),
+    }
 
     def get_serializer_class(self):
         if self.action == "list":
@@ -200,8 +360,58 @@ class RouteViewSet(viewsets.ModelViewSet):
             return RouteRetrieveSerializer
         return RouteSerializer
 
+    def get_queryset(self):
+        queryset = self.queryset
+        if self.action in self.fieldsets_actions:
+            queryset = self.join_requested(queryset)
+        return queryset
+
+
+class FlightScheduleViewSet(viewsets.ModelViewSet):
+    serializer_class = FlightScheduleSerializer
+    queryset = FlightSchedule.objects.all()
+    pagination_class = SmallClassesPagination
+    permission_classes = (IsAdminOrIfAuthenticatedReadOnly,)
+    query_budgets = {
+        "list": Budget(3, 50),
+        "retrieve": Budget(2, 20),
+        "materialize": Budget(10),
+    }
+
+    def get_serializer_class(self):
+        if self.action == "list":
+            return FlightScheduleListSerializer
+        if self.action == "materialize":
+            return MaterializeSchedulesSerializer
+        return FlightScheduleSerializer
+
+    def get_queryset(self):
+        queryset = self.queryset
+        if self.action == "list":
+            queryset = queryset.select_related(
+                "route__source",
+                "route__destination",
+                "airplane"
+            ).prefetch_related("crew")
+        return queryset
 
-class FlightViewSet(viewsets.ModelViewSet):
+    @action(
+            methods={"POST"},
+            detail=False,
+            permission_classes=(OnlyAdminPermnissions,),
+    )
+    def materialize(self, request):
+        """Create the flights of all schedules over the next ``days`` days"""
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        result = materialize_schedules(**serializer.validated_data)
+        return Response(result._asdict(), status=status.HTTP_200_OK)
+
+
+@extend_schema_view(
+    retrieve=extend_schema(parameters=FIELDSET_PARAMETERS),
+)
+class FlightViewSet(SparseFieldsetsViewMixin, viewsets.ModelViewSet):
     serializer_class = FlightSerializer
     queryset = (
         Flight.objects
@@ -214,8 +424,16 @@ class FlightViewSet(viewsets.ModelViewSet):
         # prefetch the M2M “crew” in one extra query
         .prefetch_related("crew")
     )
-    pagination_class = HugeClassesPagination
+    pagination_class = FlightKeysetPagination
     permission_classes = (IsAdminOrIfAuthenticatedReadOnly,)
+    query_budgets = {
+        "list": Budget(3, 100),
+        "retrieve": Budget(8, 50),
+        "create": Budget(10, 50),
+        "connections": Budget(3, 100),
+        "hold": Budget(10, 50),
+        "release_hold": Budget(5, 20),
+    }
 
     def get_serializer_class(self):
         if self.action == "list":
@@ -225,52 +443,26 @@ class FlightViewSet(viewsets.ModelViewSet):
         return FlightSerializer
     
 
-    @staticmethod
-    def _params_to_ints(qs):
-        return [int(str_id) for str_id in qs.split(",")]
-    
-
     def get_queryset(self):
         queryset = self.queryset
-        source = self.request.query_params.get("source")
-        destination = self.request.query_params.get("destination")
-        departure_time = self.request.query_params.get("departure_time")
-        arrival_time = self.request.query_params.get("arrival_time")
-
-        if source and destination:
-            source_ids = self._params_to_ints(source)
-            destination_ids = self._params_to_ints(destination)
-            queryset =  queryset.filter(
-                route__source__id__in=source_ids,
-                route__destination__id__in=destination_ids
-            )
-
-        if source:
-            source_ids = self._params_to_ints(source)
-            queryset =  queryset.filter(route__source__id__in=source_ids)
-
-        if destination:
-            destination_ids = self._params_to_ints(destination)
-            queryset =  queryset.filter(route__destination__id__in=destination_ids)
-        
-        if departure_time:
-            date = datetime.strptime(date, "%Y-%m-%d").date()
-            queryset = queryset.filter(departure_time__date=date)
-        
-        if arrival_time:
-            arrival_time = datetime.strptime(date, "%Y-%m-%d").date()
-            queryset = queryset.filter(arrival_time__date=date)
-
-        if self.action in("list", "retrieve"):
-            queryset = queryset.select_related(
-            "route__source",
-            "route__destination",
-            "airplane__airplane_type",
-        ).prefetch_related(
-                "crew"
-                ).annotate(
-                    tickets_available=(F("airplane__rows") * F("airplane__seats_in_row")) - Count("ticket_flight")
-                    )
+
+        if self.action in ("list", "export"):
+            search = FlightSearchSerializer(data=self.request.query_params)
+            search.is_valid(raise_exception=True)
+            queryset = search.filter_queryset(queryset)
+
+        if self.action in ("hold", "release_hold"):
+            queryset = queryset.select_related("airplane", "seat_map")
+
+        if self.action == "list":
+            # Plain rows instead of model instances; tickets_available comes
+            # from the stored Flight.seats_sold, so listing never touches the
+            # ticket table.
+            return FlightListSerializer.project(queryset,
+                                                self.get_serializer().fields)
+
+        if self.action == "retrieve":
+            queryset = self.join_requested(queryset)
         return queryset
     
     @extend_schema(
@@ -303,39 +495,221 @@ class FlightViewSet(viewsets.ModelViewSet):
                     "(ex. ?arrival_time=2022-10-23)"
                 ),
             ),
+            *[
+                OpenApiParameter(
+                    f"{prefix}_{bound}",
+                    type=OpenApiTypes.DATETIME,
+                    description=(
+                        f"Only flights with {prefix} time "
+                        f"{'at or after' if bound == 'after' else 'before'} "
+                        f"the given moment (ex. ?{prefix}_{bound}=2022-10-23T08:00)"
+                    ),
+                )
+                for prefix in ("departure", "arrival")
+                for bound in ("after", "before")
+            ],
+            *FIELDSET_PARAMETERS,
+            OpenApiParameter(
+                "tz",
+                type=OpenApiTypes.STR,
+                description=(
+                    "Time zone for dates and naive times, defaults to UTC "
+                    "(ex. ?tz=Europe/Kyiv)"
+                ),
+            ),
         ]
     )
     def list(self, request, *args, **kwargs):
         return super().list(request, *args, **kwargs)
 
+    @extend_schema(
+        parameters=[ConnectionSearchSerializer],
+        responses=ConnectionSerializer(many=True),
+    )
+    @action(
+        methods={"GET"},
+        detail=False,
+        url_path="connections",
+    )
+    def connections(self, request):
+        search = ConnectionSearchSerializer(data=request.query_params)
+        search.is_valid(raise_exception=True)
+        itineraries = connection_index.search(
+            search.validated_data["source"],
+            search.validated_data["destination"],
+            search.validated_data["departure_after"],
+            search.validated_data["departure_before"],
+            max_legs=search.validated_data["max_legs"],
+            min_connection=search.validated_data["min_connection"],
+            max_connection=search.validated_data["max_connection"],
+            max_distance=search.validated_data.get("max_distance"),
+            limit=search.validated_data["limit"],
+        )
+        flights = self.queryset.in_bulk(
+            {leg.flight_id for itinerary in itineraries
+             for leg in itinerary.legs}
+        )
+        # Itineraries with a flight deleted since the index read it are
+        # broken: drop them whole.
+        connections = [
+            {
+                "departure_time": itinerary.legs[0].departure_time,
+                "arrival_time": itinerary.legs[-1].arrival_time,
+                "total_distance": itinerary.distance,
+                "legs": [flights[leg.flight_id] for leg in itinerary.legs],
+            }
+            for itinerary in itineraries
+            if all(leg.flight_id in flights for leg in itinerary.legs)
+        ]
+        return Response(ConnectionSerializer(connections, many=True).data)
+
+    @extend_schema(
+        parameters=[EXPORT_OUTPUT_PARAMETER],
+        responses={(200, "text/csv"): OpenApiTypes.STR,
+                   (200, "application/x-ndjson"): OpenApiTypes.STR},
+    )
+    @action(
+        methods={"GET"},
+        detail=False,
+        url_path="export",
+    )
+    def export(self, request):
+        output = _export_output(request)
+        return export_response(annotate_flight_export(self.get_queryset()),
+                               FLIGHT_COLUMNS,
+                               output,
+                               "flights")
 
-class TicketViewSet(viewsets.ModelViewSet):
+    @extend_schema(
+        parameters=[EXPORT_OUTPUT_PARAMETER],
+        responses={(200, "text/csv"): OpenApiTypes.STR,
+                   (200, "application/x-ndjson"): OpenApiTypes.STR},
+    )
+    @action(
+        methods={"GET"},
+        detail=True,
+        permission_classes=(OnlyAdminPermnissions,),
+        url_path="manifest",
+    )
+    def manifest(self, request, pk=None):
+        output = _export_output(request)
+        flight = self.get_object()
+        tickets = Ticket.objects.filter(flight=flight).order_by("row", "seat")
+        return export_response(tickets,
+                               MANIFEST_COLUMNS,
+                               output,
+                               f"manifest-{flight.id}")
+
+    @extend_schema(request=SeatHoldSerializer, responses=SeatHoldSerializer)
+    @action(
+        methods={"POST"},
+        detail=True,
+        permission_classes=(IsAuthenticated,),
+        url_path="hold",
+    )
+    def hold(self, request, pk=None):
+        flight = self.get_object()
+        serializer = SeatHoldSerializer(
+            data=request.data,
+            context={"request": request, "flight": flight}
+        )
+        serializer.is_valid(raise_exception=True)
+        serializer.save()
+        return Response(serializer.data, status=status.HTTP_201_CREATED)
+
+    @extend_schema(parameters=[
+        OpenApiParameter(
+            "hold",
+            type=OpenApiTypes.UUID,
+            description="Token of the hold to release (ex. ?hold=<uuid>)",
+        ),
+    ])
+    @hold.mapping.delete
+    def release_hold(self, request, pk=None):
+        store = get_hold_store()
+        try:
+            token = uuid.UUID(request.query_params.get("hold", ""))
+        except ValueError:
+            return Response({"hold": ["Must be a valid UUID."]},
+                            status=status.HTTP_400_BAD_REQUEST)
+        if store.get(token, request.user.id):
+            store.release(token)
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+
+@extend_schema_view(
+    list=extend_schema(parameters=FIELDSET_PARAMETERS),
+    retrieve=extend_schema(parameters=FIELDSET_PARAMETERS),
+)
+class TicketViewSet(SparseFieldsetsViewMixin, viewsets.ModelViewSet):
     serializer_class = TicketSerializer
     queryset = Ticket.objects.all()
-    pagination_class = HugeClassesPagination
+    pagination_class = IdKeysetPagination
     permission_classes = (OnlyAdminPermnissions,)
+    query_budgets = {
+        "list": Budget(3, 100),
+        "retrieve": Budget(2, 20),
+    }
 
 
     def get_serializer_class(self):
         if self.action == "list":
             return TicketListSerializer
         return TicketSerializer
+
+    @extend_schema(
+        parameters=[EXPORT_OUTPUT_PARAMETER],
+        responses={(200, "text/csv"): OpenApiTypes.STR,
+                   (200, "application/x-ndjson"): OpenApiTypes.STR},
+    )
+    @action(
+        methods={"GET"},
+        detail=False,
+        url_path="export",
+    )
+    def export(self, request):
+        output = _export_output(request)
+        return export_response(self.queryset.order_by("id"),
+                               TICKET_COLUMNS,
+                               output,
+                               "tickets")
     
     def get_queryset(self):
         queryset = self.queryset
-        if self.action == "list":
-            queryset = queryset.select_related("flight__airplane__airplane_type",
-                                               "flight__route__source",
-                                               "flight__route__destination"
-                                               ).prefetch_related("flight__crew",)
+        if self.action in self.fieldsets_actions:
+            queryset = self.join_requested(queryset)
         return queryset
 
 
-class OrderViewSet(viewsets.ModelViewSet):
+@extend_schema_view(
+    list=extend_schema(parameters=[
+        OpenApiParameter(
+            "since",
+            type=OpenApiTypes.DATETIME,
+            description=("Only orders created at or after the given moment "
+                         "(ex. ?since=2025-08-01T00:00)"),
+        ),
+        OpenApiParameter(
+            "until",
+            type=OpenApiTypes.DATETIME,
+            description=("Only orders created before the given moment "
+                         "(ex. ?until=2025-09-01T00:00)"),
+        ),
+        *FIELDSET_PARAMETERS,
+    ]),
+    retrieve=extend_schema(parameters=FIELDSET_PARAMETERS),
+)
+class OrderViewSet(SparseFieldsetsViewMixin, viewsets.ModelViewSet):
     serializer_class = OrderSerializer
     queryset = Order.objects.all()
-    pagination_class = HugeClassesPagination
+    pagination_class = NewestFirstKeysetPagination
     permission_classes = (IsAuthenticated,)
+    throttle_scopes = {"create": "orders"}
+    query_budgets = {
+        "list": Budget(10, 100),
+        "retrieve": Budget(10, 50),
+        "create": Budget(25, 100),
+    }
 
 
     def get_serializer_class(self):
@@ -346,13 +720,58 @@ class OrderViewSet(viewsets.ModelViewSet):
         return OrderSerializer
     
     def get_queryset(self):
-        queryset = self.queryset.filter(user = self.request.user)
-        if self.action in ("list", "retrieve"):
-            queryset = queryset.select_related("user", ).prefetch_related("tickets__flight__airplane__airplane_type",
-                                                                        "tickets__flight__crew",
-                                                                        "tickets__flight__route__source",
-                                                                        "tickets__flight__route__destination")
+        queryset = self.queryset.filter(user_id=self.request.user.id)
+        if self.action == "list":
+            search = OrderSearchSerializer(data=self.request.query_params)
+            search.is_valid(raise_exception=True)
+            queryset = search.filter_queryset(queryset)
+        if self.action in self.fieldsets_actions:
+            if self.get_fieldsets() == (None, None):
+                # The default shape is read from the order summaries.
+                if self.action == "retrieve":
+                    queryset = queryset.select_related("user")
+                return with_history(queryset)
+            queryset = self.join_requested(queryset)
         return queryset
     
+    def paginate_queryset(self, queryset):
+        page = super().paginate_queryset(queryset)
+        if page is not None:
+            attach_tickets_left(page)
+        return page
+
+    def get_object(self):
+        order = super().get_object()
+        attach_tickets_left([order])
+        return order
+
     def perform_create(self, serializer):
-        serializer.save(user=self.request.user)
+        write_order_summary(serializer.save(user_id=self.request.user.id))
+
+
+class ThrottleMetricsView(APIView):
+    """Throttle decisions of this worker per scope, and the rate store."""
+    permission_classes = (OnlyAdminPermnissions,)
+
+    @extend_schema(responses=OpenApiTypes.OBJECT)
+    def get(self, request):
+        store = get_rate_store()
+        return Response({
+            "store": f"{type(store).__module__}.{type(store).__name__}",
+            **store.stats(),
+            "scopes": throttle_metrics(),
+        })
+
+
+class DatabasePoolMetricsView(APIView):
+    """Connection pool usage of this worker per database alias, ``null``
+    for the databases that are not pooled."""
+    permission_classes = (OnlyAdminPermnissions,)
+
+    @extend_schema(responses=OpenApiTypes.OBJECT)
+    def get(self, request):
+        return Response({
+            conn.alias: (conn.pool_stats() if hasattr(conn, "pool_stats")
+                         else None)
+            for conn in db_connections.all()
+        })
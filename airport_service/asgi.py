@@ -13,4 +13,16 @@ from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'airport_service.settings')
 
-application = get_asgi_application()
+django_application = get_asgi_application()
+
+from airport_backend.async_db import lifespan  # noqa: E402
+from airport_backend.autocomplete import build_indexes  # noqa: E402
+
+build_indexes()
+
+
+async def application(scope, receive, send):
+    if scope["type"] == "lifespan":
+        await lifespan(receive, send)
+    else:
+        await django_application(scope, receive, send)
@@ -52,6 +52,7 @@ AUTH_USER_MODEL = "user.User"
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'airport_backend.query_budget.QueryBudgetMiddleware',
     'debug_toolbar.middleware.DebugToolbarMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -85,29 +86,58 @@ WSGI_APPLICATION = 'airport_service.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/4.2/ref/settings/#databases
 
+# Worker processes serving the app (gunicorn/uvicorn --workers); runserver
+# is one. Several workers need a shared cache, see airport_backend/checks.py.
+WEB_CONCURRENCY = int(os.getenv("WEB_CONCURRENCY", 1))
+
+DB_POOL = os.getenv("DB_POOL", "false") == "true"
+
 DATABASES = {
     'default': {
-        "ENGINE": "django.db.backends.postgresql",
+        "ENGINE": ("airport_backend.pooled_postgresql" if DB_POOL
+                   else "django.db.backends.postgresql"),
         "NAME": os.getenv("POSTGRES_DB"),
         "USER": os.getenv("POSTGRES_USER"),
         "PASSWORD": os.getenv("POSTGRES_PASSWORD"),
         "HOST": os.getenv("POSTGRES_HOST"),
         "PORT": os.getenv("POSTGRES_PORT"),
+        # Pooled connections are returned to the pool after each request
+        # instead of being kept open by Django.
+        "CONN_MAX_AGE": 0 if DB_POOL else int(os.getenv("DB_CONN_MAX_AGE", 0)),
+        # With the pool: ping every connection before handing it out.
+        "CONN_HEALTH_CHECKS": os.getenv("DB_HEALTH_CHECKS", "true") == "true",
+        "OPTIONS": {
+            "pool": {
+                "min_size": int(os.getenv("DB_POOL_MIN_SIZE", 2)),
+                # Per worker process: DB_POOL_MAX_SIZE, or the connections
+                # the server allows us split between WEB_CONCURRENCY workers.
+                "max_size": int(os.getenv("DB_POOL_MAX_SIZE", 0)) or max(
+                    int(os.getenv("DB_MAX_CONNECTIONS", 40))
+                    // WEB_CONCURRENCY,
+                    1
+                ),
+                "timeout": float(os.getenv("DB_POOL_TIMEOUT", 10)),
+                "max_idle": float(os.getenv("DB_POOL_MAX_IDLE", 300)),
+            },
+        } if DB_POOL else {},
     }
 }
 
 REST_FRAMEWORK = {
     "DEFAULT_SCHEMA_CLASS": "drf_spectacular.openapi.AutoSchema",
     "DEFAULT_THROTTLE_CLASSES": [
-    "rest_framework.throttling.AnonRateThrottle",
-    "rest_framework.throttling.UserRateThrottle"
+    "airport_backend.throttling.AnonRateThrottle",
+    "airport_backend.throttling.UserRateThrottle",
+    "airport_backend.throttling.ScopedRateThrottle",
     ],
     "DEFAULT_THROTTLE_RATES": {
         "anon": "100/day",
-        "user": "1000/day"
+        "user": "1000/day",
+        "orders": "30/hour",
+        "login": "10/minute",
     },
     "DEFAULT_AUTHENTICATION_CLASSES": (
- 	"rest_framework_simplejwt.authentication.JWTAuthentication",
+ 	"user.authentication.CachedJWTAuthentication",
     )
 
 }
@@ -116,7 +146,71 @@ REST_FRAMEWORK = {
 SIMPLE_JWT = {
 	"ACCESS_TOKEN_LIFETIME": timedelta(days=1),
 	"REFRESH_TOKEN_LIFETIME": timedelta(days=7),
-	"ROTATE_REFRESH_TOKENS": True
+	"ROTATE_REFRESH_TOKENS": True,
+	"TOKEN_OBTAIN_SERIALIZER": "user.serializers.PrincipalTokenObtainPairSerializer",
+}
+
+THROTTLING = {
+    # Counters in the default cache, shared by the workers like the rest of
+    # it (see CACHES); airport_backend.throttling.DatabaseRateStore keeps
+    # them in Postgres instead, at one write per request and throttle.
+    "STORE": os.getenv("THROTTLE_STORE",
+                       "airport_backend.throttling.CacheRateStore"),
+}
+
+# Seconds the principal claims of a token, or a user looked up for a token
+# without them, are trusted before the user row is read again.
+AUTH_PRINCIPAL_CACHE_TTL = int(os.getenv("AUTH_PRINCIPAL_CACHE_TTL", 60))
+
+SEAT_HOLDS = {
+    "BACKEND": os.getenv("SEAT_HOLD_BACKEND",
+                         "airport_backend.holds.DatabaseHoldStore"),
+    "TTL": int(os.getenv("SEAT_HOLD_TTL", 600)),
+}
+
+# Reference data versions and responses, airport boards, throttle counters
+# and auth markers live here: with WEB_CONCURRENCY > 1 it must be shared,
+# e.g. CACHE_BACKEND=django.core.cache.backends.redis.RedisCache and
+# CACHE_LOCATION=redis://redis:6379.
+CACHES = {
+    "default": {
+        "BACKEND": os.getenv("CACHE_BACKEND",
+                             "django.core.cache.backends.locmem.LocMemCache"),
+        "LOCATION": os.getenv("CACHE_LOCATION", ""),
+    }
+}
+
+REFERENCE_CACHE_TIMEOUT = int(os.getenv("REFERENCE_CACHE_TIMEOUT", 3600))
+
+EXPORT_CHUNK_SIZE = int(os.getenv("EXPORT_CHUNK_SIZE", 2000))
+
+CONNECTIONS_INDEX = {
+    "TTL": int(os.getenv("CONNECTIONS_INDEX_TTL", 300)),
+    # Legs one search may look at before returning what it found.
+    "MAX_EXPANDED_LEGS": int(os.getenv("CONNECTIONS_MAX_EXPANDED_LEGS",
+                                       20000)),
+}
+
+AUTOCOMPLETE_INDEX = {
+    "TTL": int(os.getenv("AUTOCOMPLETE_INDEX_TTL", 300)),
+}
+
+ASYNC_DATABASE = {
+    "POOL_SIZE": int(os.getenv("ASYNC_DB_POOL_SIZE", 10)),
+    "MAX_IDLE": int(os.getenv("ASYNC_DB_MAX_IDLE", 30)),
+}
+
+QUERY_BUDGETS = {
+    "ENABLED": os.getenv("QUERY_BUDGETS_ENABLED", "true") == "true",
+    "SAMPLE_RATE": float(os.getenv("QUERY_BUDGET_SAMPLE_RATE", 1.0)),
+    "RAISE": os.getenv("QUERY_BUDGET_RAISE", "false") == "true",
+    "SERVER_TIMING": os.getenv("QUERY_BUDGET_SERVER_TIMING", "false") == "true",
+    "DEFAULT": {"queries": 20, "db_ms": 250},
+}
+
+FLIGHT_SCHEDULES = {
+    "HORIZON_DAYS": int(os.getenv("FLIGHT_SCHEDULE_HORIZON_DAYS", 90)),
+    "BATCH_SIZE": 1000,
 }
 
 
@@ -164,6 +258,29 @@ MEDIA_URL = "/media/"
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
+# Uploaded images are re-encoded into these sizes (longest side, px) by a
+# pool of WORKERS processes; 0 renders them in the request thread.
+THUMBNAILS = {
+    "WORKERS": int(os.getenv("THUMBNAIL_WORKERS", 2)),
+    "SIZES": {
+        "small": 160,
+        "medium": 480,
+        "large": 1024,
+    },
+}
+
 INTERNAL_IPS = [
     "127.0.0.1",
-]
\ No newline at end of file
+]
+# Airport boards: flights from BOARD_PAST_MINUTES ago to BOARD_AHEAD_MINUTES
+# ahead, rebuilt at most every BOARD_CACHE_TTL seconds per airport.
+AIRPORT_BOARDS = {
+    "PAST_MINUTES": int(os.getenv("BOARD_PAST_MINUTES", 60)),
+    "AHEAD_MINUTES": int(os.getenv("BOARD_AHEAD_MINUTES", 720)),
+    "CACHE_TTL": int(os.getenv("BOARD_CACHE_TTL", 5)),
+    # Streams end after this many seconds; EventSource reconnects.
+    "STREAM_SECONDS": int(os.getenv("BOARD_STREAM_SECONDS", 300)),
+    # Streams a WSGI worker serves at once, each holding a thread; 0 serves
+    # them only through the ASGI application.
+    "WSGI_STREAMS": int(os.getenv("BOARD_WSGI_STREAMS", 4)),
+}
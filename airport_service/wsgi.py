@@ -14,3 +14,7 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'airport_service.settings')
 
 application = get_wsgi_application()
+
+from airport_backend.autocomplete import build_indexes  # noqa: E402
+
+build_indexes()
@@ -0,0 +1,131 @@
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from django.utils.functional import cached_property
+from drf_spectacular.contrib.rest_framework_simplejwt import SimpleJWTScheme
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.models import TokenUser
+from rest_framework_simplejwt.settings import api_settings
+
+
+PRINCIPAL_CLAIMS = ("email", "is_staff")
+# When the claims above were read from the user row.
+CLAIMS_AT_CLAIM = "claims_at"
+
+
+def _principal_key(user_id):
+    return f"auth:principal:{user_id}"
+
+
+def changed_key(user_id):
+    return f"auth:changed:{user_id}"
+
+
+def principal_claims(user):
+    """Claims added to issued tokens so requests can be authenticated
+    without reading the user row."""
+    claims = {claim: getattr(user, claim) for claim in PRINCIPAL_CLAIMS}
+    claims[CLAIMS_AT_CLAIM] = time.time()
+    return claims
+
+
+def invalidate_principal(user_id):
+    """Distrust the claims of tokens issued before now and drop the cached
+    principal, so the next request reads the user row again."""
+    timeout = api_settings.REFRESH_TOKEN_LIFETIME.total_seconds()
+    cache.set(changed_key(user_id), time.time(), timeout=timeout)
+    cache.delete(_principal_key(user_id))
+
+
+@receiver(post_save, sender=settings.AUTH_USER_MODEL)
+@receiver(post_delete, sender=settings.AUTH_USER_MODEL)
+def user_changed(sender, instance, update_fields=None, **kwargs):
+    if update_fields is not None and set(update_fields) <= {"last_login"}:
+        return
+    invalidate_principal(instance.pk)
+
+
+class Principal(TokenUser):
+    """The authenticated user as permissions see it: id, email and
+    ``is_staff``, built from claims instead of a database row. Views that
+    need the row load it by ``request.user.id``."""
+
+    @cached_property
+    def email(self):
+        return self.token.get("email", "")
+
+
+def claims_principal(validated_token, changed_at):
+    """Return the principal carried by the token's claims, or ``None`` when
+    it has none, they were read before the user changed at ``changed_at``
+    or more than ``AUTH_PRINCIPAL_CACHE_TTL`` seconds ago."""
+    user_id = validated_token.get(api_settings.USER_ID_CLAIM)
+    claims_at = validated_token.get(CLAIMS_AT_CLAIM)
+    trusted_since = max(changed_at or 0,
+                        time.time() - settings.AUTH_PRINCIPAL_CACHE_TTL)
+    if user_id is None or claims_at is None or claims_at <= trusted_since:
+        return None
+    return Principal({
+        api_settings.USER_ID_CLAIM: user_id,
+        **{claim: validated_token.get(claim) for claim in PRINCIPAL_CLAIMS},
+    })
+
+
+def principal_keys(user_id):
+    """Cache keys of the user's change marker and cached principal, read
+    together for ``cached_principal``."""
+    return changed_key(user_id), _principal_key(user_id)
+
+
+def cached_principal(validated_token, changed_at, cached_claims):
+    """The principal of the token's claims, else of the ``cached_claims``
+    of the user; ``None`` when the user row has to be read."""
+    principal = claims_principal(validated_token, changed_at)
+    if principal is None and cached_claims is not None:
+        principal = Principal(cached_claims)
+    return principal
+
+
+def row_claims(user_id, values):
+    """Claims to cache for the user from its ``PRINCIPAL_CLAIMS`` values,
+    in that order."""
+    return {api_settings.USER_ID_CLAIM: user_id,
+            **dict(zip(PRINCIPAL_CLAIMS, values))}
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """``JWTAuthentication`` without the per-request user query.
+
+    Tokens issued with ``principal_claims`` are trusted for
+    ``AUTH_PRINCIPAL_CACHE_TTL`` seconds, unless the user is saved or
+    deleted after they were issued. Other tokens, and stale ones, use a
+    principal cached for as long and read from the database (active users
+    only) on a miss. The change markers and cached principals live in the
+    default cache: with a per-process cache, a change reaches the other
+    workers once their claims and principals expire, so within that TTL.
+    """
+
+    def get_user(self, validated_token):
+        user_id = validated_token.get(api_settings.USER_ID_CLAIM)
+        if user_id is None:
+            return super().get_user(validated_token)
+        changed, cached = principal_keys(user_id)
+        entries = cache.get_many([changed, cached])
+        principal = cached_principal(validated_token,
+                                     entries.get(changed),
+                                     entries.get(cached))
+        if principal is None:
+            user = super().get_user(validated_token)
+            claims = row_claims(user_id, [getattr(user, claim)
+                                          for claim in PRINCIPAL_CLAIMS])
+            cache.set(cached, claims,
+                      timeout=settings.AUTH_PRINCIPAL_CACHE_TTL)
+            principal = Principal(claims)
+        return principal
+
+
+class CachedJWTScheme(SimpleJWTScheme):
+    target_class = CachedJWTAuthentication
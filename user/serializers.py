@@ -2,6 +2,9 @@ from rest_framework import serializers
 from django.contrib.auth import get_user_model
 from django.contrib.auth import authenticate
 from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
+
+from user.authentication import principal_claims
 
 
 class UserSerializer(serializers.ModelSerializer):
@@ -70,4 +73,16 @@ class AuthTokenSerializer(serializers.Serializer):
             raise serializers.ValidationError(msg, code='authorization')
 
         attrs['user'] = user
-        return attrs
\ No newline at end of file
+        return attrs
+
+
+class PrincipalTokenObtainPairSerializer(TokenObtainPairSerializer):
+    """Issues tokens carrying the claims ``CachedJWTAuthentication`` builds
+    its principal from; refreshed access tokens copy them."""
+
+    @classmethod
+    def get_token(cls, user):
+        token = super().get_token(user)
+        for claim, value in principal_claims(user).items():
+            token[claim] = value
+        return token
@@ -1,3 +1,97 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
 from django.test import TestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
 
-# Create your tests here.
+from user.authentication import Principal
+
+
+FLIGHTS_LIST_URL = reverse("airport_backend:flight-list")
+MANAGE_USER_URL = reverse("user:manage_user")
+
+
+class TestCachedJWTAuthentication(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.user = get_user_model().objects.create_user(
+            email="test@test.test", password="testpassword"
+        )
+        self.client = APIClient()
+
+    def _login(self):
+        res = self.client.post(reverse("token_obtain_pair"),
+                               {"email": "test@test.test",
+                                "password": "testpassword"})
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        return res.data
+
+    def _bearer(self, token):
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {token}")
+
+    def test_claims_skip_user_query(self):
+        self._bearer(self._login()["access"])
+        # Only the flight list itself.
+        with self.assertNumQueries(1):
+            res = self.client.get(FLIGHTS_LIST_URL)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertIsInstance(res.wsgi_request.user, Principal)
+        self.assertEqual(res.wsgi_request.user.email, "test@test.test")
+
+    def test_refreshed_token_keeps_claims(self):
+        refresh = self._login()["refresh"]
+        res = self.client.post(reverse("token_refresh"), {"refresh": refresh})
+        self._bearer(res.data["access"])
+        with self.assertNumQueries(1):
+            self.client.get(FLIGHTS_LIST_URL)
+
+    def test_claims_expire(self):
+        self._bearer(self._login()["access"])
+        # As on a worker that did not see the change in its own cache.
+        get_user_model().objects.filter(id=self.user.id).update(is_staff=True)
+        with self.assertNumQueries(1):
+            res = self.client.get(FLIGHTS_LIST_URL)
+        self.assertFalse(res.wsgi_request.user.is_staff)
+
+        with self.settings(AUTH_PRINCIPAL_CACHE_TTL=0):
+            with self.assertNumQueries(2):
+                res = self.client.get(FLIGHTS_LIST_URL)
+        self.assertTrue(res.wsgi_request.user.is_staff)
+
+        get_user_model().objects.filter(id=self.user.id).update(
+            is_active=False
+        )
+        with self.settings(AUTH_PRINCIPAL_CACHE_TTL=0):
+            res = self.client.get(FLIGHTS_LIST_URL)
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_token_without_claims_is_cached(self):
+        self._bearer(AccessToken.for_user(self.user))
+        with self.assertNumQueries(2):
+            self.client.get(FLIGHTS_LIST_URL)
+        with self.assertNumQueries(1):
+            res = self.client.get(FLIGHTS_LIST_URL)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+    def test_deactivation_invalidates(self):
+        self._bearer(self._login()["access"])
+        self.user.is_active = False
+        self.user.save()
+        res = self.client.get(FLIGHTS_LIST_URL)
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_update_through_manage_user_view(self):
+        self._bearer(self._login()["access"])
+        res = self.client.patch(MANAGE_USER_URL, {"email": "new@test.test"})
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data["email"], "new@test.test")
+
+        # The claims are stale now: the row is read once, then cached.
+        with self.assertNumQueries(2):
+            res = self.client.get(FLIGHTS_LIST_URL)
+        self.assertEqual(res.wsgi_request.user.email, "new@test.test")
+        with self.assertNumQueries(1):
+            self.client.get(FLIGHTS_LIST_URL)
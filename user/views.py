@@ -1,3 +1,4 @@
+from django.contrib.auth import get_user_model
 from django.shortcuts import render
 from rest_framework import generics
 from user.serializers import UserSerializer, AuthTokenSerializer
@@ -5,6 +6,8 @@ from rest_framework.settings import api_settings
 from rest_framework.authtoken.views import ObtainAuthToken
 from rest_framework.authentication import TokenAuthentication
 from rest_framework.permissions import IsAuthenticated
+from rest_framework_simplejwt.views import TokenObtainPairView
+from airport_backend.throttling import ScopedRateThrottle
 
 
 class CreateUserView(generics.CreateAPIView):
@@ -14,6 +17,12 @@ class CreateUserView(generics.CreateAPIView):
 class LoginUserView(ObtainAuthToken):
     renderer_classes = api_settings.DEFAULT_RENDERER_CLASSES
     serializer_class = AuthTokenSerializer
+    throttle_classes = (ScopedRateThrottle,)
+    throttle_scope = "login"
+
+
+class LoginTokenView(TokenObtainPairView):
+    throttle_scope = "login"
 
 
 
@@ -22,4 +31,5 @@ class ManageUserView(generics.RetrieveUpdateAPIView):
     permission_classes = (IsAuthenticated,)
 
     def get_object(self):
-        return self.request.user
\ No newline at end of file
+        # request.user is a token principal; saving the row invalidates it.
+        return get_user_model().objects.get(pk=self.request.user.pk)
\ No newline at end of file